@@ -0,0 +1,79 @@
+from collections import namedtuple
+from query import AWAITING_PAYMENT, index_for
+from ratings import NEUTRAL_RATING
+
+PROMISE_MINUTES = 60  # longest ETA we accept an order with
+WAITLIST_LIMIT = 20  # orders allowed to wait for an agent at once
+
+ACCEPT = "accept"
+QUEUE = "queue"
+REJECT = "reject"
+
+Decision = namedtuple("Decision", ["action", "agent", "eta", "retry_after"])
+
+class AdmissionController:
+    """Decides whether a delivery order can be served within the promise window.
+
+    Capacity is read from the order index: each agent's undelivered orders and
+    the number of orders still waiting in the kitchen. An order is accepted
+    when its ETA on the least busy agent fits the promise window, otherwise it
+    waits in a bounded waiting list (data["waitlist"]) until an agent frees up,
+    and once that list is full it is rejected with a retry-after hint.
+    """
+
+    def __init__(self, estimator, promise_minutes=PROMISE_MINUTES, waitlist_limit=WAITLIST_LIMIT,
+                 restaurant_id=None, storage=None):
+        self.estimator = estimator
+        self.promise_minutes = promise_minutes
+        self.waitlist_limit = waitlist_limit
+        self.restaurant_id = restaurant_id  # whose data file the data passed in was read from
+        self.storage = storage
+
+    def agent_loads(self, data, logged_in_agents):
+        """Undelivered order count per agent; logged-in agents if any, else everyone"""
+        index = index_for(data, self.restaurant_id, self.storage)
+        roster = [agent for agent in data["delivery_agents"] if agent in logged_in_agents]
+        return {agent: len(index.by_agent(agent, active=True))
+                for agent in roster or data["delivery_agents"]}
+
+    @staticmethod
+    def preference(agent, located=(), ratings=None):
+        """Sort key among equally loaded agents: located first, then the best recently rated"""
+        return agent not in located, -(ratings or {}).get(agent, NEUTRAL_RATING)
+
+    @classmethod
+    def pick_agent(cls, loads, located=(), ratings=None):
+        """Agent with the fewest undelivered orders; ties go to located, then better rated agents"""
+        return min(loads, key=lambda agent: (loads[agent], cls.preference(agent, located, ratings))) if loads else None
+
+    def decide(self, data, items, logged_in_agents, when, located=(), ratings=None):
+        loads = self.agent_loads(data, logged_in_agents)
+        agent = self.pick_agent(loads, located, ratings)
+        eta = self.estimator.estimate(
+            items, agent,
+            agent_backlog=loads.get(agent, 0),
+            kitchen_queue=len(index_for(data, self.restaurant_id, self.storage).by_status_ids.get("Pending", ())),
+            hour=when.hour)
+        if agent and eta <= self.promise_minutes:
+            return Decision(ACCEPT, agent, eta, None)
+        if len(data.get("waitlist", [])) < self.waitlist_limit:
+            return Decision(QUEUE, None, eta, None)
+        return Decision(REJECT, None, eta, max(1, eta - self.promise_minutes))
+
+    def dispatch(self, data, logged_in_agents, located=(), ratings=None):
+        """Hand waiting orders to idle agents; returns the orders assigned"""
+        waitlist = data.get("waitlist", [])
+        if not waitlist:
+            return []
+        index = index_for(data, self.restaurant_id, self.storage)
+        loads = self.agent_loads(data, logged_in_agents)
+        idle = sorted((agent for agent, load in loads.items() if load == 0),
+                      key=lambda agent: self.preference(agent, located, ratings))
+        assigned = []
+        while waitlist and idle:
+            order = index.get(waitlist.pop(0))
+            if order is None or order["status"] not in ("Pending", AWAITING_PAYMENT):
+                continue
+            index.set_agent(order, idle.pop(0))
+            assigned.append(order)
+        return assigned
@@ -0,0 +1,138 @@
+import heapq
+import time
+from datetime import datetime, timedelta
+from output import console, group, is_plain, make_table
+from query import TIME_FORMAT, index_for
+from snapshot import read_snapshot
+from utils import data_version
+
+
+REFRESH_SECONDS = 2
+MAX_ROWS = 25
+
+class Dashboard:
+    """Auto-refreshing view of in-flight orders for the restaurant manager.
+
+    The data file is only re-read when its mtime/size changes. Rows are cached
+    per order and rebuilt only when that order's status or agent changes, and at
+    most max_rows rows are rendered, so each refresh stays cheap with thousands
+    of orders in flight.
+    """
+
+    def __init__(self, refresh_seconds=REFRESH_SECONDS, max_rows=MAX_ROWS, sweeper=None,
+                 restaurant_id=None, notifier=None, storage=None):
+        self.restaurant_id = restaurant_id
+        self.storage = storage
+        self.refresh_seconds = refresh_seconds
+        self.sweeper = sweeper
+        self.notifier = notifier
+        self.max_rows = max_rows
+        self.version = None
+        self.rows = {}  # order id -> (signature, deadline, cells)
+        self.status_counts = {}
+        self.agents = []
+        self.agent_load = {}
+
+    def poll(self):
+        """Reload state if the data file changed; returns True if it did"""
+        version = data_version(self.restaurant_id, self.storage)
+        if version == self.version:
+            return False
+        self.version = version
+        data = read_snapshot(self.restaurant_id, self.storage)
+        if self.sweeper:
+            self.sweeper.sync(data["orders"])
+        self.update(data)
+        return True
+
+    def update(self, data):
+        index = index_for(data, self.restaurant_id, self.storage)
+        self.status_counts = {status: len(ids) for status, ids in index.by_status_ids.items() if ids}
+        self.agents = data["delivery_agents"]
+        self.agent_load = {}
+
+        rows = {}
+        for order_id in index.active_ids:
+            order = index.get(order_id)
+            agent = order["delivery_agent"]
+            self.agent_load[agent] = self.agent_load.get(agent, 0) + 1
+            signature = (order["status"], agent)
+            cached = self.rows.get(order_id)
+            if cached and cached[0] == signature:
+                rows[order_id] = cached
+                continue
+            deadline = None
+            if order.get("order_time"):
+                placed = datetime.strptime(order["order_time"], TIME_FORMAT)
+                deadline = placed + timedelta(minutes=order["expected_delivery_time"])
+            cells = (str(order_id), order["customer"], order["status"], agent, order.get("order_time") or "-")
+            rows[order_id] = (signature, deadline, cells)
+        self.rows = rows
+
+    def late_ids(self, now=None):
+        if self.sweeper:
+            return [order_id for order_id in self.sweeper.late if order_id in self.rows]
+        now = now or datetime.now()
+        return [order_id for order_id, (_, deadline, _) in self.rows.items()
+                if deadline and deadline < now]
+
+    def render(self, now=None):
+        now = now or datetime.now()
+        late = set(self.late_ids(now))
+
+        summary = make_table("Orders by Status")
+        summary.add_column("Status", style="cyan")
+        summary.add_column("Count", justify="right", style="green")
+        for status, count in sorted(self.status_counts.items()):
+            summary.add_row(status, str(count))
+        summary.add_row("[bold red]Late[/bold red]", f"[bold red]{len(late)}[/bold red]")
+        if self.notifier:
+            report = self.notifier.report()
+            summary.caption = (f"notifications: {report['queued']} queued (oldest {report['oldest_seconds']:.1f}s), "
+                               f"{report['sent']} sent, lag {report['mean_lag']:.1f}s avg")
+
+        agents = make_table("Agent Utilization")
+        agents.add_column("Agent", style="cyan")
+        agents.add_column("Active Orders", justify="right", style="green")
+        busy = 0
+        for agent in self.agents:
+            load = self.agent_load.get(agent, 0)
+            busy += load > 0
+            agents.add_row(agent.capitalize(), str(load))
+        if self.agents:
+            agents.caption = f"{busy}/{len(self.agents)} agents busy"
+
+        orders = make_table("In-flight Orders")
+        for header in ("ID", "Customer", "Status", "Agent", "Placed", "Due In"):
+            orders.add_column(header, justify="center", style="cyan")
+        # Late orders first, then oldest first
+        shown = heapq.nsmallest(self.max_rows, self.rows, key=lambda order_id: (order_id not in late, order_id))
+        for order_id in shown:
+            _, deadline, cells = self.rows[order_id]
+            due = "-"
+            if deadline is not None:
+                minutes = int((deadline - now).total_seconds() // 60)
+                due = f"{minutes} mins" if minutes >= 0 else f"{-minutes} mins late"
+            style = "bold red" if order_id in late else None
+            orders.add_row(*cells, due, style=style)
+        if len(self.rows) > self.max_rows:
+            orders.caption = f"showing {self.max_rows} of {len(self.rows)}"
+
+        return group(summary, agents, orders)
+
+    def run(self):
+        self.poll()
+        if is_plain():
+            # No live refresh in plain text mode; print the current state once
+            console.print(self.render())
+            return
+        from rich.live import Live
+        console.print("[bold blue]Live dashboard - press Ctrl+C to return.[/bold blue]")
+        try:
+            with Live(self.render(), console=console.rich, auto_refresh=False) as live:
+                while True:
+                    time.sleep(self.refresh_seconds)
+                    self.poll()
+                    live.update(self.render(), refresh=True)
+        except KeyboardInterrupt:
+            pass
@@ -1,24 +1,60 @@
-from rich.console import Console
+from datetime import datetime
+from admission import AdmissionController
+from eta import EtaEstimator
+from location import LocationTracker
+from oplog import recorded
+from output import console
+from payments import apply_ledger
+from query import AWAITING_PAYMENT, FINAL_STATUSES, index_for
+from restaurant import orders_table
+from snapshot import read_snapshot
 from utils import read_json, write_json
 
-console = Console()
+
+# Each delivery status and the only status it may move to next
+NEXT_STATUS = {"Pending": "Picked Up", "Picked Up": "Out for Delivery", "Out for Delivery": "Delivered"}
+STATUSES = {status.lower(): status for status in NEXT_STATUS.values()}  # typed status -> stored spelling
+# What an agent is told when the status typed is not the one the order must move to next
+WRONG_STEP = {"Picked Up": "You must pick up this order first.",
+              "Out for Delivery": "This order must be marked as 'Out for Delivery' before it can be delivered.",
+              "Delivered": "This order is already out for delivery and must be marked as 'Delivered' next."}
+LOCATION_FRESH_SECONDS = 120  # pings older than this no longer count as a known position
+WORKLIST_COLUMNS = ["id", "customer", "items", "status", "next_status", "expected_delivery_time", "order_time"]
+
+def next_status(status):
+    """Status an order moves to next, also for statuses saved in another case; None if it moves no further"""
+    return NEXT_STATUS.get(STATUSES.get(status.lower(), status))
 
 class DeliveryManager:
-    def __init__(self):
+    def __init__(self, sweeper=None, estimator=None, restaurant_id=None, locations=None, outbox=None,
+                 feedback=None, storage=None):
         self.logged_in_agents = set()
-
+        self.outbox = outbox
+        self.feedback = feedback
+        self.locations = locations or LocationTracker()
+        self.sweeper = sweeper
+        self.estimator = estimator or EtaEstimator()
+        self.restaurant_id = restaurant_id
+        self.storage = storage
+        self.admission = AdmissionController(self.estimator, restaurant_id=restaurant_id, storage=storage)
+
+    @recorded("login")
     def signup_login(self):
-        data = read_json()
+        data = read_json(self.restaurant_id, self.storage)
         agent_name = input("Enter your name (Delivery Agent): ").strip().lower()
-        if agent_name not in data["delivery_agents"]:
+        is_new = agent_name not in data["delivery_agents"]
+        if is_new:
             data["delivery_agents"].append(agent_name)
-            write_json(data)
         self.logged_in_agents.add(agent_name)
+        if self.dispatch_waitlist(data) or is_new:
+            apply_ledger(data, self.restaurant_id, self.storage)  # keep payments settled since data was read
+            write_json(data, self.restaurant_id, storage=self.storage)
         console.print(f"[bold green]Welcome, {agent_name.capitalize()}! You are now logged in.[/bold green]")
         return agent_name
 
+    @recorded("status")
     def update_order_status(self, agent_name):
-        data = read_json()
+        data = read_json(self.restaurant_id, self.storage)
         orders = data["orders"]
         if not orders:
             console.print("[bold red]No orders available for delivery.[/bold red]")
@@ -30,51 +66,180 @@ class DeliveryManager:
             console.print("[bold red]Invalid Order ID. Please enter a number.[/bold red]")
             return
 
-        for order in orders:
-            if order["id"] == order_id:
-                if order["type"] == "Takeaway":
-                    console.print("[bold yellow]This is a takeaway order and is already completed.[/bold yellow]")
-                    return
-
-                if order["delivery_agent"] != agent_name:
-                    console.print(f"[bold red]This order is assigned to {order['delivery_agent'].capitalize()}.[/bold red]")
-                    return
+        index = index_for(data, self.restaurant_id, self.storage)
+        order = index.get(order_id)
+        if not order:
+            console.print("[bold red]Order not found![/bold red]")
+            return
 
-                if order["status"] == "Delivered":
-                    console.print(f"[bold yellow]Order {order_id} has already been delivered and cannot be updated.[/bold yellow]")
-                    return
+        if order["type"] == "Takeaway":
+            console.print("[bold yellow]This is a takeaway order and is already completed.[/bold yellow]")
+            return
 
-                console.print(f"[bold blue]Current status: {order['status']}[/bold blue]")
+        if order["delivery_agent"] != agent_name:
+            console.print(f"[bold red]This order is assigned to {order['delivery_agent'].capitalize()}.[/bold red]")
+            return
 
-                while True:
-                    new_status = input("Enter new status (Picked Up / Out for Delivery / Delivered): ").strip().lower()
+        if order["status"] == "Delivered":
+            console.print(f"[bold yellow]Order {order_id} has already been delivered and cannot be updated.[/bold yellow]")
+            return
 
-                    if order["status"] == "Pending" and new_status != "picked up":
-                        console.print("[bold red]You must pick up this order first.[/bold red]")
-                        continue
+        if order["status"] == AWAITING_PAYMENT:
+            console.print(f"[bold yellow]Order {order_id} is waiting for its payment and cannot be picked up yet.[/bold yellow]")
+            return
 
-                    if order["status"] == "Picked Up" and new_status != "out for delivery":
-                        console.print("[bold red]This order must be marked as 'Out for Delivery' before it can be delivered.[/bold red]")
-                        continue
+        expected = next_status(order["status"])
+        if order["status"] in FINAL_STATUSES or expected is None:
+            console.print(f"[bold yellow]Order {order_id} is '{order['status']}' and cannot be updated.[/bold yellow]")
+            return
 
-                    if order["status"] == "Out for Delivery" and new_status != "delivered":
-                        console.print("[bold red]This order is already out for delivery and must be marked as 'Delivered' next.[/bold red]")
-                        continue
+        console.print(f"[bold blue]Current status: {order['status']}[/bold blue]")
 
-                    # Ensure proper capitalization for status words
-                    order["status"] = ' '.join(word.capitalize() for word in new_status.split())
-                    console.print(f"[bold green]Order {order_id} status updated to '{order['status']}' by {agent_name.capitalize()}.[/bold green]")
-                    write_json(data)  # Save changes after updating status
-                    return
+        while True:
+            new_status = input("Enter new status (Picked Up / Out for Delivery / Delivered): ").strip().lower()
+            # Store the status as spelt in NEXT_STATUS, whatever case it was typed in
+            status = STATUSES.get(' '.join(new_status.split()))
+            if status is None:
+                console.print("[bold red]Invalid status.[/bold red]")
+                continue
+            if status != expected:
+                console.print(f"[bold red]{WRONG_STEP[expected]}[/bold red]")
+                continue
+            self.commit_transitions(data, [order], status, agent_name)
+            return
 
-        console.print("[bold red]Order not found![/bold red]")
+    def commit_transitions(self, data, orders, status, agent_name):
+        """Move already validated orders to status and save them in one write"""
+        index = index_for(data, self.restaurant_id, self.storage)
+        for order in orders:
+            index.set_status(order, status)
+            self.record_status_time(order)
+            console.print(f"[bold green]Order {order['id']} status updated to '{status}' by {agent_name.capitalize()}.[/bold green]")
+        if status == "Delivered":
+            self.dispatch_waitlist(data)
+        apply_ledger(data, self.restaurant_id, self.storage)  # keep payments settled since data was read
+        write_json(data, self.restaurant_id, storage=self.storage)  # Save changes after updating status
+        if self.outbox is not None:
+            for order in orders:
+                self.outbox.notify(order)
+        if self.sweeper and status == "Delivered":
+            for order in orders:
+                self.sweeper.cancel(order["id"])
+
+    def worklist(self, agent_name, data=None):
+        """The agent's undelivered orders by id, each with its next step"""
+        data = data or read_snapshot(self.restaurant_id, self.storage)
+        orders = index_for(data, self.restaurant_id, self.storage).by_agent(agent_name, active=True)
+        if not orders:
+            console.print("[bold yellow]You have no orders to deliver.[/bold yellow]")
+            return []
+        rows = [dict(order, next_status=next_status(order["status"]) or "-") for order in orders]
+        console.print(orders_table(rows, f"Worklist for {agent_name.capitalize()}", WORKLIST_COLUMNS))
+        return orders
+
+    @recorded("batch_status")
+    def batch_update_status(self, agent_name):
+        """Apply one status transition to several of the agent's orders at once.
+
+        Every selected order must be the agent's and must be allowed to move to
+        the new status; otherwise nothing is changed. All changes are saved with
+        a single write.
+        """
+        data = read_json(self.restaurant_id, self.storage)
+        orders = self.worklist(agent_name, data)
+        if not orders:
+            return
+        selection = input("Enter Order IDs to update (comma-separated, or 'all'): ").strip().lower()
+        new_status = STATUSES.get(' '.join(input(
+            "Enter new status (Picked Up / Out for Delivery / Delivered): ").lower().split()))
+        if new_status is None:
+            console.print("[bold red]Invalid status.[/bold red]")
+            return
 
-    def assign_delivery_agent(self, order):
-        data = read_json()
-        for agent in data["delivery_agents"]:
-            if agent not in self.logged_in_agents:
-                continue
-            if not any(o["delivery_agent"] == agent and o["status"] != "Delivered" for o in data["orders"]):
-                order["delivery_agent"] = agent
+        if selection == "all":
+            selected = [order for order in orders if next_status(order["status"]) == new_status]
+        else:
+            try:
+                order_ids = list(dict.fromkeys(int(part) for part in selection.split(",") if part.strip()))
+            except ValueError:
+                console.print("[bold red]Invalid Order ID. Please enter numbers separated by commas.[/bold red]")
+                return
+            worklist = {order["id"]: order for order in orders}
+            problems = []
+            for order_id in order_ids:
+                order = worklist.get(order_id)
+                if order is None:
+                    problems.append(f"{order_id} is not in your worklist")
+                elif order["status"] == AWAITING_PAYMENT:
+                    problems.append(f"{order_id} is waiting for its payment")
+                elif next_status(order["status"]) != new_status:
+                    problems.append(f"{order_id} is '{order['status']}' and must be marked "
+                                    f"'{next_status(order['status']) or '-'}' next")
+            if problems:
+                console.print(f"[bold red]No orders were updated: {'; '.join(problems)}.[/bold red]")
                 return
-        order["delivery_agent"] = "bob"
+            selected = [worklist[order_id] for order_id in order_ids]
+
+        if not selected:
+            console.print(f"[bold yellow]None of your orders can be marked '{new_status}' now.[/bold yellow]")
+            return
+        self.commit_transitions(data, selected, new_status, agent_name)
+
+    def record_status_time(self, order):
+        """Timestamp pick up and delivery so ETAs can learn from them"""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if order["status"] == "Picked Up":
+            order["picked_up_time"] = now
+        elif order["status"] == "Delivered":
+            order["delivered_time"] = now
+            self.estimator.observe(order)
+
+    def my_orders(self, agent_name):
+        data = read_snapshot(self.restaurant_id, self.storage)
+        orders = index_for(data, self.restaurant_id, self.storage).by_agent(agent_name)
+        if not orders:
+            console.print("[bold yellow]No orders are assigned to you.[/bold yellow]")
+            return
+        console.print(orders_table(orders, f"Orders for {agent_name.capitalize()}"))
+
+    @recorded("location")
+    def share_location(self, agent_name):
+        """Record a location ping typed in by the agent; pings are never saved to the data file"""
+        try:
+            lat, lon = (float(part) for part in input("Enter your location (lat, lon): ").split(","))
+        except ValueError:
+            console.print("[bold red]Invalid location. Enter latitude and longitude separated by a comma.[/bold red]")
+            return
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            console.print("[bold red]Invalid location. Latitude must be within ±90 and longitude within ±180.[/bold red]")
+            return
+        self.locations.ingest(agent_name, lat, lon)
+        console.print(f"[bold green]Location updated to ({lat:.5f}, {lon:.5f}).[/bold green]")
+
+    def located_agents(self):
+        """Agents that have sent a location recently"""
+        return self.locations.seen_within(LOCATION_FRESH_SECONDS)
+
+    def agent_ratings(self):
+        """Recent delivery rating per rated agent, read from the aggregates"""
+        return self.feedback.agent_ratings() if self.feedback else {}
+
+    def admit(self, data, items, when):
+        """Admission decision for a new delivery order with these items"""
+        return self.admission.decide(data, items, self.logged_in_agents, when, self.located_agents(),
+                                     self.agent_ratings())
+
+    def dispatch_waitlist(self, data):
+        """Assign waiting orders to idle agents; returns True if any were assigned"""
+        assigned = self.admission.dispatch(data, self.logged_in_agents, self.located_agents(), self.agent_ratings())
+        for order in assigned:
+            console.print(f"[bold green]Waiting order {order['id']} assigned to {order['delivery_agent'].capitalize()}.[/bold green]")
+        return bool(assigned)
+
+    def assign_delivery_agent(self, order, data=None):
+        """Assign an idle agent, or the least busy one if everyone is busy"""
+        data = data or read_json(self.restaurant_id, self.storage)
+        agent = self.admission.pick_agent(self.admission.agent_loads(data, self.logged_in_agents),
+                                          self.located_agents(), self.agent_ratings())
+        if agent:
+            order["delivery_agent"] = agent
@@ -0,0 +1,92 @@
+import math
+from sweeper import parse_order_time
+
+PREP_PRIOR = 10.0  # minutes from order to pick up, before any history
+LEG_PRIOR = 15.0  # minutes from pick up to delivery, before any history
+KITCHEN_STATIONS = 4  # orders the kitchen prepares in parallel
+
+class RunningStat:
+    """Count, mean and variance of a stream of values (Welford), O(1) per value"""
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+def _minutes(start, end):
+    return (parse_order_time(end) - parse_order_time(start)).total_seconds() / 60
+
+def _mean(stats, key, fallback):
+    stat = stats.get(key)
+    return stat.mean if stat and stat.count else fallback
+
+class EtaEstimator:
+    """Delivery time estimates learned from completed deliveries.
+
+    Keeps running statistics of the kitchen leg (order to pick up) per item, the
+    delivery leg (pick up to delivered) per agent and the total time per hour of
+    day. Each delivered order updates them in O(1) and an estimate costs
+    O(items), so it can be recomputed for every active order on each refresh.
+    """
+
+    def __init__(self):
+        self.prep = {}
+        self.legs = {}
+        self.hours = {}
+        self.all_prep = RunningStat()
+        self.all_legs = RunningStat()
+        self.all_total = RunningStat()
+
+    @classmethod
+    def from_orders(cls, orders):
+        estimator = cls()
+        for order in orders:
+            estimator.observe(order)
+        return estimator
+
+    def observe(self, order):
+        """Learn from an order once it has pick up and delivery timestamps.
+
+        Orders whose timestamps run backwards or take no time at all (clock
+        changes, hand-edited data) are skipped rather than skewing the means.
+        """
+        if not order.get("picked_up_time") or not order.get("delivered_time"):
+            return
+        prep = _minutes(order["order_time"], order["picked_up_time"])
+        leg = _minutes(order["picked_up_time"], order["delivered_time"])
+        if prep < 0 or leg < 0 or prep + leg <= 0:
+            return
+        for item in set(order["items"]):
+            self.prep.setdefault(item, RunningStat()).add(prep)
+        self.legs.setdefault(order["delivery_agent"], RunningStat()).add(leg)
+        self.hours.setdefault(parse_order_time(order["order_time"]).hour, RunningStat()).add(prep + leg)
+        self.all_prep.add(prep)
+        self.all_legs.add(leg)
+        self.all_total.add(prep + leg)
+
+    def estimate(self, items, agent=None, agent_backlog=0, kitchen_queue=0, hour=None):
+        """Minutes until delivery for a new order.
+
+        agent_backlog is the number of undelivered orders the agent already
+        holds and kitchen_queue the number of orders waiting to be picked up.
+        """
+        overall_prep = self.all_prep.mean if self.all_prep.count else PREP_PRIOR
+        overall_leg = self.all_legs.mean if self.all_legs.count else LEG_PRIOR
+        prep = max((_mean(self.prep, item, overall_prep) for item in items), default=overall_prep)
+        leg = _mean(self.legs, agent, overall_leg)
+        minutes = kitchen_queue * overall_prep / KITCHEN_STATIONS + prep + agent_backlog * leg + leg
+        if hour is not None and self.all_total.count and self.all_total.mean > 0:
+            # Scale by how busy this hour of day has been compared to overall
+            minutes *= _mean(self.hours, hour, self.all_total.mean) / self.all_total.mean
+        return max(1, math.ceil(minutes))
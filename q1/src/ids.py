@@ -0,0 +1,39 @@
+import threading
+from utils import sidecar_path, locked_update
+
+BLOCK_SIZE = 1000
+
+class IdAllocator:
+    """Hands out order ids from blocks reserved in a shared id file.
+
+    A block of block_size ids is reserved with one small locked update of the
+    id file (data.json.ids by default); ids are then assigned locally with no
+    further storage access. Ids are unique across processes and sessions. Ids
+    left unused in a block when a process exits are simply skipped.
+    """
+
+    def __init__(self, block_size=BLOCK_SIZE, path=None, restaurant_id=None, storage=None):
+        self.block_size = block_size
+        self.path = path
+        self.restaurant_id = restaurant_id
+        self.storage = storage
+        self._next = 0
+        self._end = 0
+        self._lock = threading.Lock()
+
+    def reserve(self, floor=0):
+        """Reserve a fresh block; floor seeds the counter for existing data"""
+        def take(high_water):
+            start = max(high_water or 0, floor)
+            return start + self.block_size, start
+
+        start = locked_update(self.path or sidecar_path("ids", self.restaurant_id), take, storage=self.storage)
+        self._next, self._end = start, start + self.block_size
+
+    def next_id(self, floor=0):
+        with self._lock:
+            if self._next >= self._end:
+                self.reserve(floor)
+            order_id = self._next
+            self._next += 1
+            return order_id
@@ -0,0 +1,110 @@
+import math
+import time
+from array import array
+from collections import namedtuple
+
+PING_HISTORY = 32  # positions kept per agent
+EARTH_RADIUS_KM = 6371.0
+
+Position = namedtuple("Position", ["lat", "lon", "timestamp"])
+
+def distance_km(lat1, lon1, lat2, lon2):
+    """Great-circle (haversine) distance between two coordinates"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+class PingBuffer:
+    """The last capacity pings of one agent in a fixed-size ring.
+
+    Latitude, longitude and timestamp live in three preallocated float arrays,
+    so adding a ping overwrites one slot in each and never allocates.
+    """
+    __slots__ = ("capacity", "lats", "lons", "times", "head", "count")
+
+    def __init__(self, capacity=PING_HISTORY):
+        self.capacity = capacity
+        self.lats = array("d", [0.0]) * capacity
+        self.lons = array("d", [0.0]) * capacity
+        self.times = array("d", [0.0]) * capacity
+        self.head = 0  # slot the next ping goes into
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def add(self, lat, lon, timestamp):
+        head = self.head
+        self.lats[head] = lat
+        self.lons[head] = lon
+        self.times[head] = timestamp
+        self.head = (head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def _slots(self):
+        """Slot numbers from oldest to newest"""
+        start = (self.head - self.count) % self.capacity
+        return [(start + offset) % self.capacity for offset in range(self.count)]
+
+    def latest(self):
+        if not self.count:
+            return None
+        slot = (self.head - 1) % self.capacity
+        return Position(self.lats[slot], self.lons[slot], self.times[slot])
+
+    def positions(self):
+        """Buffered positions, oldest first"""
+        return [Position(self.lats[slot], self.lons[slot], self.times[slot]) for slot in self._slots()]
+
+    def speed_kmh(self):
+        """Average speed over the buffered path; None until two pings apart in time"""
+        slots = self._slots()
+        if len(slots) < 2:
+            return None
+        hours = (self.times[slots[-1]] - self.times[slots[0]]) / 3600
+        if hours <= 0:
+            return None
+        path = sum(distance_km(self.lats[a], self.lons[a], self.lats[b], self.lons[b])
+                   for a, b in zip(slots, slots[1:]))
+        return path / hours
+
+class LocationTracker:
+    """Latest positions of delivery agents, fed by their location pings.
+
+    Pings only ever live in memory: each agent has a PingBuffer holding its
+    last history pings, and nothing is written to the data file. Tracking and
+    dispatch read latest() and speed_kmh().
+    """
+
+    def __init__(self, history=PING_HISTORY, clock=time.time):
+        self.history = history
+        self.clock = clock
+        self.buffers = {}
+
+    def ingest(self, agent, lat, lon, timestamp=None):
+        buffer = self.buffers.get(agent)
+        if buffer is None:
+            buffer = self.buffers[agent] = PingBuffer(self.history)
+        buffer.add(lat, lon, self.clock() if timestamp is None else timestamp)
+
+    def ingest_many(self, pings):
+        """Ingest (agent, lat, lon, timestamp) tuples, e.g. a batch from a gateway"""
+        for agent, lat, lon, timestamp in pings:
+            self.ingest(agent, lat, lon, timestamp)
+
+    def latest(self, agent):
+        buffer = self.buffers.get(agent)
+        return buffer.latest() if buffer else None
+
+    def speed_kmh(self, agent):
+        buffer = self.buffers.get(agent)
+        return buffer.speed_kmh() if buffer else None
+
+    def seen_within(self, seconds, now=None):
+        """Agents whose last ping is at most seconds old"""
+        cutoff = (self.clock() if now is None else now) - seconds
+        return {agent for agent, buffer in self.buffers.items()
+                if buffer.count and buffer.latest().timestamp >= cutoff}
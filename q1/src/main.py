@@ -1,14 +1,64 @@
-from rich.console import Console
+import argparse
+from functools import cached_property
+from dashboard import Dashboard
+from eta import EtaEstimator
+from location import LocationTracker
+from notifications import NotificationDispatcher, Outbox
+from oplog import close_log, open_log
 from order import OrderManager
+from output import console, set_plain
+from payments import PaymentProcessor
 from delivery import DeliveryManager
 from restaurant import RestaurantManager
+from restaurants import admin_menu, select_restaurant
+from sweeper import DeadlineSweeper
+from storage import FileStorage
+from utils import read_json
 
-console = Console()
+class RestaurantServices:
+    """Managers and background workers for one restaurant, created on first use.
 
-def main():
-    order_manager = OrderManager()
-    delivery_manager = DeliveryManager()
-    restaurant_manager = RestaurantManager()
+    Each manager exists once per restaurant and is shared by every menu, so
+    logged-in agents, caches and location pings are seen by all of them.
+    """
+
+    def __init__(self, restaurant_id, storage=None):
+        self.restaurant_id = restaurant_id
+        self.storage = storage
+        orders = read_json(restaurant_id, storage)["orders"]
+        self.sweeper = DeadlineSweeper()
+        self.sweeper.sync(orders)
+        self.sweeper.start()
+        self.estimator = EtaEstimator.from_orders(orders)
+        self.locations = LocationTracker()
+        self.outbox = Outbox()
+        self.notifier = NotificationDispatcher(self.outbox)
+        self.notifier.start()
+        self.restaurant_manager = RestaurantManager(restaurant_id, storage)
+        self.delivery_manager = DeliveryManager(self.sweeper, self.estimator, restaurant_id, self.locations,
+                                                self.outbox, self.restaurant_manager.feedback, storage)
+        self.payments = PaymentProcessor(restaurant_id, stock=self.restaurant_manager.stock, storage=storage)
+        self.order_manager = OrderManager(self.sweeper, self.estimator, restaurant_id,
+                                          delivery_manager=self.delivery_manager,
+                                          restaurant_manager=self.restaurant_manager,
+                                          payments=self.payments, storage=storage)
+        self.payments.resume()
+
+    @cached_property
+    def dashboard(self):
+        return Dashboard(sweeper=self.sweeper, restaurant_id=self.restaurant_id, notifier=self.notifier,
+                         storage=self.storage)
+
+def main(plain=False, storage=None):
+    if plain:
+        set_plain()
+    services = {}
+
+    def services_for_selected_restaurant():
+        restaurant_id = select_restaurant(storage)
+        if restaurant_id and restaurant_id not in services:
+            services[restaurant_id] = RestaurantServices(restaurant_id, storage)
+        return services.get(restaurant_id)
 
     while True:
         console.print("\n[bold cyan]=== Online Food Delivery System ===[/bold cyan]")
@@ -16,17 +66,26 @@ def main():
         console.print("[yellow]1.[/yellow] Customer")
         console.print("[yellow]2.[/yellow] Company Manager")
         console.print("[yellow]3.[/yellow] Delivery Agent")
-        console.print("[yellow]4.[/yellow] Exit")
+        console.print("[yellow]4.[/yellow] Admin")
+        console.print("[yellow]5.[/yellow] Exit")
 
         role = input("\nSelect your role: ").strip().lower()
 
+        current = services_for_selected_restaurant() if role in ("1", "2", "3") else None
+        if role in ("1", "2", "3") and not current:
+            continue
+
         if role == "1":  # Customer
+            order_manager = current.order_manager
+            restaurant_manager = current.restaurant_manager
             while True:
                 console.print("\n[bold magenta]=== Customer Menu ===[/bold magenta]")
                 console.print("[yellow]1.[/yellow] View Menu")
                 console.print("[yellow]2.[/yellow] Place Order")
                 console.print("[yellow]3.[/yellow] Track Order")
-                console.print("[yellow]4.[/yellow] Back to Main Menu")
+                console.print("[yellow]4.[/yellow] My Orders")
+                console.print("[yellow]5.[/yellow] Rate Order")
+                console.print("[yellow]6.[/yellow] Back to Main Menu")
 
                 choice = input("\nSelect an option: ").strip().lower()
                 if choice == "1":
@@ -36,16 +95,26 @@ def main():
                 elif choice == "3":
                     order_manager.track_order()
                 elif choice == "4":
+                    order_manager.my_orders()
+                elif choice == "5":
+                    order_manager.rate_order()
+                elif choice == "6":
                     break
                 else:
                     console.print("[bold red]Invalid option. Please try again.[/bold red]")
 
         elif role == "2":  # Restaurant Manager
+            restaurant_manager = current.restaurant_manager
+            dashboard = current.dashboard
             while True:
                 console.print("\n[bold magenta]=== Restaurant Manager Menu ===[/bold magenta]")
                 console.print("[yellow]1.[/yellow] Edit Menu")
                 console.print("[yellow]2.[/yellow] View Orders")
-                console.print("[yellow]3.[/yellow] Back to Main Menu")
+                console.print("[yellow]3.[/yellow] View Orders by Status")
+                console.print("[yellow]4.[/yellow] Live Dashboard")
+                console.print("[yellow]5.[/yellow] View Ratings")
+                console.print("[yellow]6.[/yellow] Search Orders")
+                console.print("[yellow]7.[/yellow] Back to Main Menu")
 
                 choice = input("\nSelect an option: ").strip().lower()
                 if choice == "1":
@@ -53,36 +122,75 @@ def main():
                 elif choice == "2":
                     restaurant_manager.view_orders()  # Remove orders parameter
                 elif choice == "3":
+                    restaurant_manager.filter_orders()
+                elif choice == "4":
+                    dashboard.run()
+                elif choice == "5":
+                    restaurant_manager.view_ratings()
+                elif choice == "6":
+                    restaurant_manager.search_orders()
+                elif choice == "7":
                     break
                 else:
                     console.print("[bold red]Invalid option. Please try again.[/bold red]")
 
         elif role == "3":  # Delivery Agent
+            delivery_manager = current.delivery_manager
             agent_name = None
             while True:
                 console.print("\n[bold magenta]=== Delivery Agent Menu ===[/bold magenta]")
                 console.print("[yellow]1.[/yellow] Login/Signup")
                 console.print("[yellow]2.[/yellow] Update Order Status")
-                console.print("[yellow]3.[/yellow] Back to Main Menu")
+                console.print("[yellow]3.[/yellow] My Orders")
+                console.print("[yellow]4.[/yellow] Worklist")
+                console.print("[yellow]5.[/yellow] Batch Update Status")
+                console.print("[yellow]6.[/yellow] Share Location")
+                console.print("[yellow]7.[/yellow] Back to Main Menu")
 
                 choice = input("\nSelect an option: ").strip().lower()
                 if choice == "1":
                     agent_name = delivery_manager.signup_login()
-                elif choice == "2":
-                    if agent_name:
+                elif choice in ("2", "3", "4", "5", "6"):
+                    if not agent_name:
+                        console.print("[bold red]You must login/signup first.[/bold red]")
+                    elif choice == "2":
                         delivery_manager.update_order_status(agent_name)  # Remove orders parameter
+                    elif choice == "3":
+                        delivery_manager.my_orders(agent_name)
+                    elif choice == "4":
+                        delivery_manager.worklist(agent_name)
+                    elif choice == "5":
+                        delivery_manager.batch_update_status(agent_name)
                     else:
-                        console.print("[bold red]You must login/signup first.[/bold red]")
-                elif choice == "3":
+                        delivery_manager.share_location(agent_name)
+                elif choice == "7":
                     break
                 else:
                     console.print("[bold red]Invalid option. Please try again.[/bold red]")
 
         elif role == "4":
+            admin_menu(storage)
+
+        elif role == "5":
             console.print("[bold green]Exiting application...[/bold green]")
+            for restaurant in services.values():
+                restaurant.sweeper.stop()
+                restaurant.payments.shutdown()  # let payments in flight settle
+                restaurant.notifier.stop()
             break
         else:
             console.print("[bold red]Invalid selection. Please enter a valid option.[/bold red]")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Online Food Delivery System")
+    parser.add_argument("--plain", action="store_true", help="plain text output without colours or boxes")
+    parser.add_argument("--data-dir", help="keep data.json and its companion files in this directory")
+    parser.add_argument("--log-ops", metavar="PATH", help="append every command that changes data to this "
+                                                          "operations log (replay it with src/oplog.py)")
+    args = parser.parse_args()
+    if args.log_ops:
+        open_log(args.log_ops)
+    try:
+        main(args.plain, FileStorage(args.data_dir) if args.data_dir else None)
+    finally:
+        close_log()
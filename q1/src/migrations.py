@@ -0,0 +1,96 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+SCHEMA_VERSION = 1  # version of the data file and of each order written by this code
+SCHEMA_KEY = "schema_version"  # on the data file and on every order; not shown in order tables
+
+def _fill_order_times(order):
+    """v1: takeaway orders gain expected_delivery_time and order_time (None), placed as on delivery orders"""
+    if "expected_delivery_time" in order and "order_time" in order:
+        return order
+    migrated = {}
+    for key, value in order.items():
+        migrated[key] = value
+        if key == "delivery_agent":
+            migrated["expected_delivery_time"] = order.get("expected_delivery_time")
+            migrated["order_time"] = order.get("order_time")
+    migrated.setdefault("expected_delivery_time", None)
+    migrated.setdefault("order_time", None)
+    return migrated
+
+MIGRATIONS = [_fill_order_times]  # MIGRATIONS[n] upgrades an order from version n to n + 1
+
+def migrate_order(order):
+    """The order at SCHEMA_VERSION; orders already there (or newer) come back unchanged"""
+    version = order.get(SCHEMA_KEY, 0)
+    if version >= SCHEMA_VERSION:
+        return order
+    for step in MIGRATIONS[version:]:
+        order = step(order)
+    order[SCHEMA_KEY] = SCHEMA_VERSION
+    return order
+
+def upgrade(data):
+    """Migrate the orders of freshly read data in place; returns whether anything changed.
+
+    A data file stamped with SCHEMA_VERSION only holds current orders, so it
+    is not scanned at all. An older one has each order checked and only those
+    behind are migrated; orders from a half-finished earlier upgrade are left as they are.
+    """
+    if "orders" not in data or data.get(SCHEMA_KEY, 0) >= SCHEMA_VERSION:
+        return False
+    orders = data["orders"]
+    for position, order in enumerate(orders):
+        if order.get(SCHEMA_KEY, 0) < SCHEMA_VERSION:
+            orders[position] = migrate_order(order)
+    data[SCHEMA_KEY] = SCHEMA_VERSION
+    return True
+
+class WriteBack:
+    """Saves migrated data files from a background thread.
+
+    Readers migrate what they read (see upgrade) and carry on; the next write
+    by any manager stores the migrated orders with it. For a data file that is
+    only read, one compare-and-swap write here upgrades it, so a large history
+    is migrated without a separate stop-the-world step. A write that loses to
+    another writer is dropped once the winner's file is already current.
+    """
+
+    def __init__(self):
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(1, thread_name_prefix="migrations")
+
+    def schedule(self, storage, name):
+        key = (storage, name)
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+        self._pool.submit(self._write, storage, name)
+
+    def _write(self, storage, name):
+        try:
+            while True:
+                version = storage.version(name)
+                try:
+                    data = storage.load(name)
+                except (OSError, ValueError):
+                    return  # gone or unreadable; the next read recovers it and schedules again
+                if not upgrade(data) or storage.save(name, data, expected_version=version):
+                    return
+        finally:
+            with self._lock:
+                self._pending.discard((storage, name))
+
+    def flush(self):
+        """Wait for every write scheduled so far"""
+        self._pool.submit(lambda: None).result()
+
+_write_back = WriteBack()
+
+def schedule_write_back(storage, name):
+    _write_back.schedule(storage, name)
+
+def flush():
+    _write_back.flush()
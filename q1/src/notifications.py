@@ -0,0 +1,218 @@
+import heapq
+import random
+import threading
+import time
+from collections import deque, namedtuple
+
+TICK_SECONDS = 1
+BATCH_LIMIT = 200  # notifications taken from the outbox per tick
+RATE_PER_SECOND = 20  # batches handed to the sink per second
+RETRIES = 3  # further attempts for a batch the sink failed to send
+RETRY_DELAY = 1.0  # seconds before the first retry; doubles on each further one
+
+LATE = "Running Late"  # not a status; sent once when a delivery passes its expected time
+
+# What the customer is told about each major status change, and on which channels
+MESSAGES = {
+    "Pending": "Order {id} is confirmed.",
+    "Picked Up": "Order {id} has been picked up by {agent}.",
+    "Out for Delivery": "Order {id} is out for delivery.",
+    "Delivered": "Order {id} has been delivered. Enjoy your meal!",
+    "Payment Failed": "Payment for order {id} did not go through, so the order was cancelled.",
+    LATE: "Order {id} is running late. Sorry for the wait!",
+}
+CHANNELS = {
+    "Pending": ("push",),
+    "Picked Up": ("push",),
+    "Out for Delivery": ("push", "sms"),
+    "Delivered": ("push", "sms"),
+    "Payment Failed": ("push", "sms"),
+    LATE: ("push",),
+}
+
+Notification = namedtuple("Notification", ["recipient", "channel", "order_id", "text", "created", "attempts"])
+
+class SinkError(Exception):
+    pass
+
+class StubSink:
+    """Local stand-in for the push and SMS providers; keeps what it was asked to send.
+
+    Each send takes latency seconds and fails with probability failure_rate.
+    """
+
+    def __init__(self, latency=0.0, failure_rate=0.0, seed=None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.sent = []  # (recipient, channel, texts)
+        self._lock = threading.Lock()
+
+    def send(self, recipient, channel, texts):
+        time.sleep(self.latency)
+        with self._lock:
+            if self.random.random() < self.failure_rate:
+                raise SinkError(f"{channel} to {recipient} failed")
+            self.sent.append((recipient, channel, list(texts)))
+
+class Outbox:
+    """Notifications waiting to be sent.
+
+    Enqueuing is an append under a lock, so a status change pays nothing for
+    delivery. New notifications wait in FIFO order; ones being retried wait in
+    a heap keyed by when they may be sent again.
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._queue = deque()
+        self._retries = []  # (not before, sequence, notification)
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._queue) + len(self._retries)
+
+    def notify(self, order, status=None):
+        """Queue the customer's notifications for an order's new status; returns how many"""
+        status = status or order["status"]
+        if status not in MESSAGES:
+            return 0
+        text = MESSAGES[status].format(id=order["id"], agent=order["delivery_agent"].capitalize())
+        now = self.clock()
+        notifications = [Notification(order["customer"], channel, order["id"], text, now, 0)
+                         for channel in CHANNELS[status]]
+        with self._lock:
+            self._queue.extend(notifications)
+        return len(notifications)
+
+    def take(self, limit, now=None):
+        """Up to limit notifications that may be sent now, retries first"""
+        now = self.clock() if now is None else now
+        taken = []
+        with self._lock:
+            while self._retries and self._retries[0][0] <= now and len(taken) < limit:
+                taken.append(heapq.heappop(self._retries)[2])
+            while self._queue and len(taken) < limit:
+                taken.append(self._queue.popleft())
+        return taken
+
+    def restore(self, notifications):
+        """Put untried notifications back at the front, in their original order"""
+        with self._lock:
+            self._queue.extendleft(reversed(notifications))
+
+    def retry(self, notifications, not_before):
+        with self._lock:
+            for notification in notifications:
+                self._sequence += 1
+                heapq.heappush(self._retries, (not_before, self._sequence,
+                                               notification._replace(attempts=notification.attempts + 1)))
+
+    def oldest(self):
+        """Creation time of the oldest queued notification, or None if the outbox is empty"""
+        with self._lock:
+            times = [self._queue[0].created] if self._queue else []
+            times.extend(notification.created for _, _, notification in self._retries)
+        return min(times) if times else None
+
+class NotificationDispatcher:
+    """Sends queued notifications in batches on a background thread.
+
+    Each tick takes up to batch_limit notifications and groups them per
+    recipient and channel, so a customer gets one push and one SMS however many
+    of their orders moved. A token bucket limits the sink to rate_per_second
+    batches; groups left without a token go back to the front of the outbox
+    for the next tick. A batch the sink fails to send is retried with
+    exponential backoff up to retries times, then dropped and counted as failed.
+    """
+
+    def __init__(self, outbox, sink=None, tick_seconds=TICK_SECONDS, batch_limit=BATCH_LIMIT,
+                 rate_per_second=RATE_PER_SECOND, retries=RETRIES, retry_delay=RETRY_DELAY):
+        self.outbox = outbox
+        self.sink = sink or StubSink()
+        self.tick_seconds = tick_seconds
+        self.batch_limit = batch_limit
+        self.rate_per_second = rate_per_second
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.tokens = rate_per_second
+        self.refilled = None
+        self.sent = 0
+        self.batches = 0
+        self.failed = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _refill(self, now):
+        if self.refilled is not None:
+            self.tokens = min(self.rate_per_second, self.tokens + (now - self.refilled) * self.rate_per_second)
+        self.refilled = now
+
+    def tick(self, now=None):
+        """Send what is due; returns the number of notifications delivered"""
+        now = self.outbox.clock() if now is None else now
+        self._refill(now)
+        groups = {}
+        for notification in self.outbox.take(self.batch_limit, now):
+            groups.setdefault((notification.recipient, notification.channel), []).append(notification)
+        delivered = 0
+        waiting = []
+        for (recipient, channel), batch in groups.items():
+            if self.tokens < 1:
+                waiting.extend(batch)
+                continue
+            self.tokens -= 1
+            try:
+                self.sink.send(recipient, channel, [notification.text for notification in batch])
+            except SinkError:
+                retry = [notification for notification in batch if notification.attempts < self.retries]
+                self.failed += len(batch) - len(retry)
+                if retry:
+                    self.outbox.retry(retry, now + self.retry_delay * 2 ** retry[0].attempts)
+                continue
+            self.batches += 1
+            delivered += len(batch)
+            for notification in batch:
+                lag = now - notification.created
+                self.total_lag += lag
+                self.max_lag = max(self.max_lag, lag)
+        self.outbox.restore(waiting)
+        self.sent += delivered
+        return delivered
+
+    def report(self, now=None):
+        """Queue depth and delivery lag so far"""
+        now = self.outbox.clock() if now is None else now
+        oldest = self.outbox.oldest()
+        return {
+            "queued": len(self.outbox),
+            "oldest_seconds": 0.0 if oldest is None else now - oldest,
+            "sent": self.sent,
+            "batches": self.batches,
+            "failed": self.failed,
+            "mean_lag": self.total_lag / self.sent if self.sent else 0.0,
+            "max_lag": self.max_lag,
+        }
+
+    def start(self):
+        if self._thread:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="notification-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the thread after one last attempt at what is still queued"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.tick()
+
+    def _run(self):
+        while not self._stop.wait(self.tick_seconds):
+            self.tick()
@@ -0,0 +1,228 @@
+import argparse
+import builtins
+import functools
+import json
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from output import is_plain, set_plain
+from payments import StubGateway
+from storage import MemoryStorage
+from utils import DEFAULT_RESTAURANT, data_file, read_json
+
+_state = {"log": None}
+_lock = threading.Lock()
+
+def open_log(path):
+    """Start appending every recorded command to the operations log at path"""
+    close_log()
+    _state["log"] = open(path, "a", encoding="utf-8")
+
+def close_log():
+    log, _state["log"] = _state["log"], None
+    if log:
+        log.close()
+
+def write_entry(entry):
+    with _lock:
+        log = _state["log"]
+        if log:
+            log.write(json.dumps(entry, separators=(",", ":"), ensure_ascii=False) + "\n")
+            log.flush()
+
+def recorded(op):
+    """Log each call of a manager command that changes state, with the answers it read.
+
+    While an operations log is open, input() is wrapped for the length of the
+    command and every answer typed is kept. One line is written when the
+    command returns: {"t": finish time, "op": op, "r": restaurant, "a": args,
+    "in": answers}, leaving out a default restaurant and empty args. Feeding
+    the same answers to the same command is all a replay needs, and dispatch
+    decisions (which agent gets an order) are made again rather than copied.
+    """
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args):
+            if _state["log"] is None:
+                return method(self, *args)
+            answers = []
+            read = builtins.input
+
+            def record_input(prompt=""):
+                answer = read(prompt)
+                answers.append(answer)
+                return answer
+
+            builtins.input = record_input
+            try:
+                return method(self, *args)
+            finally:
+                builtins.input = read
+                entry = {"t": round(time.time(), 3), "op": op}
+                if self.restaurant_id not in (None, DEFAULT_RESTAURANT):
+                    entry["r"] = self.restaurant_id
+                if args:
+                    entry["a"] = list(args)
+                entry["in"] = answers
+                write_entry(entry)
+        return wrapper
+    return decorate
+
+# Command recorded under each op name: (service attribute, method name)
+COMMANDS = {
+    "place": ("order_manager", "place_order"),
+    "rate": ("order_manager", "rate_order"),
+    "login": ("delivery_manager", "signup_login"),
+    "status": ("delivery_manager", "update_order_status"),
+    "batch_status": ("delivery_manager", "batch_update_status"),
+    "location": ("delivery_manager", "share_location"),
+    "menu": ("restaurant_manager", "edit_menu"),
+}
+
+def read_log(path):
+    """Entries of an operations log, oldest first"""
+    with open(path, encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    unknown = {entry["op"] for entry in entries} - set(COMMANDS)
+    if unknown:
+        raise ValueError(f"Unknown operations: {', '.join(sorted(unknown))}")
+    return entries
+
+class ReplayClock:
+    """Time as recorded in the log, so order times and agent pings match the original run"""
+
+    def __init__(self):
+        self.now = time.time()
+
+    def time(self):
+        return self.now
+
+    def datetime_class(self):
+        clock = self
+
+        class ReplayDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return datetime.fromtimestamp(clock.now, tz)
+
+        return ReplayDatetime
+
+def replay(entries, storage=None, speed=None, seed=None):
+    """Re-execute logged commands against a fresh store; returns (results, storage).
+
+    Each command gets its recorded answers and runs with the clock set to its
+    recorded time. The store is a new MemoryStorage unless one is given, seeded
+    with the data file at seed if set. Online payments go to an instant gateway
+    that approves every charge and are settled before the next command, so a
+    log always replays to the same data. With speed, the gaps between commands
+    are kept, divided by speed; without it commands run back to back.
+    Each result is {"op", "seconds", "error"}; error is set when a command
+    asked for more answers than were recorded or left some unread.
+    """
+    from unittest.mock import patch
+    from main import RestaurantServices  # main imports the managers, which import this module
+
+    storage = storage or MemoryStorage()
+    if seed:
+        with open(seed, encoding="utf-8") as f:
+            storage.save(data_file(), json.load(f))
+    clock = ReplayClock()
+    services = {}
+    results = []
+    plain = is_plain()
+    set_plain()
+    with patch("order.datetime", clock.datetime_class()), patch("delivery.datetime", clock.datetime_class()), \
+            patch.object(builtins, "print", lambda *args, **kwargs: None):
+        try:
+            previous = None
+            for entry in entries:
+                if speed and previous is not None:
+                    time.sleep(max(0.0, entry["t"] - previous) / speed)
+                previous = clock.now = entry["t"]
+                current = services.get(entry.get("r"))
+                if current is None:
+                    current = services[entry.get("r")] = RestaurantServices(entry.get("r"), storage)
+                    current.locations.clock = clock.time
+                    current.payments.gateway = StubGateway(latency=(0, 0), decline_rate=0, timeout_rate=0, seed=0)
+                results.append(run_entry(current, entry))
+        finally:
+            for current in services.values():
+                current.sweeper.stop()
+                current.payments.shutdown()
+                current.notifier.stop()
+            set_plain(plain)
+    return results, storage
+
+def run_entry(services, entry):
+    """Run one logged command with its recorded answers and wait for the payments it started"""
+    from unittest.mock import patch
+    answers = deque(entry["in"])
+
+    def answer(prompt=""):
+        if not answers:
+            raise EOFError("recorded answers exhausted")
+        return answers.popleft()
+
+    service, method = COMMANDS[entry["op"]]
+    error = None
+    started = time.perf_counter()
+    with patch.object(builtins, "input", answer):
+        try:
+            getattr(getattr(services, service), method)(*entry.get("a", ()))
+        except EOFError as e:
+            error = str(e)
+    services.payments.drain()
+    seconds = time.perf_counter() - started
+    if answers and not error:
+        error = f"{len(answers)} recorded answers left unread"
+    return {"op": entry["op"], "seconds": seconds, "error": error}
+
+def agent_loads(storage, restaurants):
+    """Delivery orders per agent in each replayed restaurant"""
+    loads = {}
+    for restaurant_id in restaurants:
+        for order in read_json(restaurant_id, storage)["orders"]:
+            if order["type"] == "Delivery":
+                key = (restaurant_id or "main", order["delivery_agent"])
+                loads[key] = loads.get(key, 0) + 1
+    return loads
+
+def main(argv=None):
+    from replay import summarize
+
+    parser = argparse.ArgumentParser(description="Replay an operations log against a fresh in-memory store.")
+    parser.add_argument("log", help="operations log written with main.py --log-ops")
+    parser.add_argument("-s", "--speed", type=float, help="keep the recorded gaps, this many times faster "
+                                                          "(default: no gaps)")
+    parser.add_argument("--seed", help="data file to start from instead of the default data")
+    parser.add_argument("-o", "--out", help="save the replayed data of the main restaurant to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        entries = read_log(args.log)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    started = time.perf_counter()
+    results, storage = replay(entries, speed=args.speed, seed=args.seed)
+    elapsed = time.perf_counter() - started
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(storage.load(data_file()), f, indent=4)
+
+    print(f"{len(results)} operations in {elapsed:.2f}s ({len(results) / max(elapsed, 1e-9):.0f} ops/s)")
+    summary = summarize([{"timings": [(result["op"], result["seconds"])]} for result in results])
+    for op, stats in summary.items():
+        print(f"  {op:<12} runs {stats['runs']:>6}  mean {stats['mean'] * 1000:8.2f} ms  "
+              f"p95 {stats['p95'] * 1000:8.2f} ms  max {stats['max'] * 1000:8.2f} ms")
+    for (restaurant, agent), count in sorted(agent_loads(storage, {entry.get("r") for entry in entries}).items()):
+        print(f"  {restaurant}: {agent} has {count} delivery orders")
+    failed = [(number, result) for number, result in enumerate(results, 1) if result["error"]]
+    for number, result in failed:
+        print(f"  operation {number} ({result['op']}) diverged: {result['error']}", file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
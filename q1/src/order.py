@@ -1,20 +1,49 @@
-from rich.console import Console
-from rich.table import Table
-import random
+import time
 from datetime import datetime, timedelta
+from admission import ACCEPT, REJECT
 from delivery import DeliveryManager
-from restaurant import RestaurantManager
+from eta import EtaEstimator
+from ids import IdAllocator
+from migrations import SCHEMA_KEY, SCHEMA_VERSION
+from notifications import LATE
+from oplog import recorded
+from output import console
+from payments import METHODS, PaymentProcessor
+from pricing import parse_cart
+from query import FINAL_STATUSES, PAYMENT_FAILED, index_for
+from ratings import parse_stars
+from restaurant import RestaurantManager, orders_table
+from snapshot import read_snapshot
+from sweeper import parse_order_time
 from utils import read_json, write_json
 
-console = Console()
+
+MY_ORDERS_COLUMNS = ["id", "type", "items", "status", "delivery_agent", "total_price", "eta"]
+RATEABLE_STATUSES = ("Delivered", "Completed")
 
 class OrderManager:
-    def __init__(self):
-        self.delivery_manager = DeliveryManager()
-        self.restaurant_manager = RestaurantManager()
+    def __init__(self, sweeper=None, estimator=None, restaurant_id=None, locations=None,
+                 delivery_manager=None, restaurant_manager=None, payments=None, storage=None):
+        self.restaurant_id = restaurant_id
+        self.storage = storage
+        self.estimator = estimator or EtaEstimator()
+        # Pass in the restaurant's shared managers; standalone use gets private ones
+        self.restaurant_manager = restaurant_manager or RestaurantManager(restaurant_id, storage)
+        self.delivery_manager = delivery_manager or DeliveryManager(sweeper, self.estimator, restaurant_id, locations,
+                                                                    feedback=self.restaurant_manager.feedback,
+                                                                    storage=storage)
+        self.locations = self.delivery_manager.locations
+        self.id_allocator = IdAllocator(restaurant_id=restaurant_id, storage=storage)
+        self.sweeper = sweeper
+        self.payments = payments or PaymentProcessor(restaurant_id, stock=self.restaurant_manager.stock,
+                                                     storage=storage)
+        self.payments.subscribe(self.payment_settled)
+        if sweeper is not None:
+            sweeper.subscribe(self.deadline_missed)
 
+    @recorded("place")
     def place_order(self):
-        data = read_json()
+        data = read_json(self.restaurant_id, self.storage)
         customer_name = input("Enter your name: ").strip()
         
         while True:
@@ -25,41 +54,102 @@ class OrderManager:
                 console.print("[bold red]Invalid option. Choose 'Delivery' or 'Takeaway'.[/bold red]")
 
         self.restaurant_manager.view_menu()
-        items = input("Enter items (comma-separated): ").split(",")
-        items = [item.strip().lower() for item in items]
+        try:
+            lines = parse_cart(input("Enter items (comma-separated, e.g. 2 x pizza + extra cheese): "))
+        except ValueError as e:
+            console.print(f"[bold red]{e}.[/bold red]")
+            return
+
+        snapshot = self.restaurant_manager.menu_snapshot(data)
+        for n, line in enumerate(lines):
+            item = snapshot.match_item(line.item)
+            if item and item != line.item:
+                console.print(f"[bold yellow]Using '{item}' for '{line.item}'.[/bold yellow]")
+                lines[n] = line._replace(item=item)
+        try:
+            quote = snapshot.pricing.quote(lines, order_type)
+        except KeyError as e:
+            console.print(f"[bold red]Item '{e.args[0]}' is not available in the menu.[/bold red]")
+            return
+        items = [line.item for line in lines]
+        total_price = quote["total"]
 
-        total_price = 0
-        for item in items:
-            if item not in data["menu"]:
-                console.print(f"[bold red]Item '{item}' is not available in the menu.[/bold red]")
+        while True:
+            method = input(f"Total ₹{total_price:.2f}. Pay by (UPI/Card/Wallet/COD): ").strip().lower()
+            if method in METHODS:
+                break
+            console.print("[bold red]Invalid payment method. Choose UPI, Card, Wallet or COD.[/bold red]")
+
+        shortages = self.restaurant_manager.stock.reserve(lines)
+        if shortages:
+            console.print("[bold red]Not enough left of: " + ", ".join(
+                f"{item} ({left} left)" for item, left in sorted(shortages.items())) + ".[/bold red]")
+            return
+
+        if order_type == "delivery":
+            order_time = datetime.now()
+            decision = self.delivery_manager.admit(data, items, order_time)
+            if decision.action == REJECT:
+                self.restaurant_manager.stock.release(lines)
+                console.print("[bold red]All delivery agents are busy and the waiting list is full. "
+                              f"Please try again in {decision.retry_after} mins.[/bold red]")
                 return
-            total_price += data["menu"][item]
 
+        order_id = self.id_allocator.next_id(data["next_order_id"])
         order = {
-            "id": data["next_order_id"],
+            "id": order_id,
             "customer": customer_name,
             "type": order_type.capitalize(),
             "items": items,
             "total_price": total_price,
             "status": "Completed" if order_type == "takeaway" else "Pending",
-            "delivery_agent": "-" if order_type == "takeaway" else "Not Assigned"
+            "delivery_agent": "-" if order_type == "takeaway" else "Not Assigned",
+            "expected_delivery_time": None,
+            "order_time": None,
+            SCHEMA_KEY: SCHEMA_VERSION
         }
 
         if order_type == "delivery":
-            order["expected_delivery_time"] = random.randint(10, 45)
-            order["order_time"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            self.delivery_manager.assign_delivery_agent(order)
+            if decision.action == ACCEPT:
+                self.delivery_manager.assign_delivery_agent(order, data)
+            else:
+                data.setdefault("waitlist", []).append(order_id)
+            order["expected_delivery_time"] = decision.eta
+            order["order_time"] = order_time.strftime("%Y-%m-%d %H:%M:%S")
 
+        order["lines"] = [{"item": line.item, "quantity": line.quantity, "modifiers": list(line.modifiers)}
+                          for line in lines]
+        order["subtotal"] = quote["subtotal"]
+        order["tax"] = quote["tax"]
+        order["delivery_fee"] = quote["delivery_fee"]
+        self.payments.open(order, method)
+
+        self.payments.apply_settled(data)  # keep settlements that landed while this order was being taken
         data["orders"].append(order)
-        data["next_order_id"] += 1
-        write_json(data)
-        console.print(f"[bold green]Order placed successfully! Your Order ID is {data['next_order_id'] - 1}[/bold green]")
+        data["next_order_id"] = max(data["next_order_id"], order_id + 1)
+        write_json(data, self.restaurant_id, storage=self.storage)
+        if method != "cod":
+            self.payments.submit(order)
+        if self.sweeper:
+            self.sweeper.schedule(order)
+        console.print(f"[bold green]Order placed successfully! Your Order ID is {order_id}[/bold green]")
+        console.print(f"[bold blue]Subtotal: ₹{quote['subtotal']:.2f}  Tax: ₹{quote['tax']:.2f}  "
+                      f"Delivery fee: ₹{quote['delivery_fee']:.2f}[/bold blue]")
         console.print(f"[bold blue]Total Price: ₹{total_price:.2f}[/bold blue]")
+        if method == "cod":
+            console.print(f"[bold blue]Pay ₹{total_price:.2f} in cash "
+                          f"{'on delivery' if order_type == 'delivery' else 'at pickup'}.[/bold blue]")
+        else:
+            console.print(f"[bold yellow]Your {METHODS[method]} payment is being processed; "
+                          "the order is confirmed once it goes through.[/bold yellow]")
         if order_type == "delivery":
+            if decision.action != ACCEPT:
+                console.print("[bold yellow]All delivery agents are busy; your order is "
+                              f"#{len(data['waitlist'])} in the waiting list.[/bold yellow]")
             console.print(f"[bold blue]Estimated time left for delivery: {order['expected_delivery_time']} mins[/bold blue]")
 
     def track_order(self):
-        data = read_json()
+        data = read_snapshot(self.restaurant_id, self.storage)
         order_id = input("Enter your Order ID: ").strip()
         try:
             order_id = int(order_id)
@@ -67,21 +157,106 @@ class OrderManager:
             console.print("[bold red]Invalid Order ID. Please enter a number.[/bold red]")
             return
 
-        for order in data["orders"]:
-            if order["id"] == order_id:
-                table = Table(title="Order Details")
-                for key in order.keys():
-                    table.add_column(key, justify="center", style="cyan")
-                table.add_row(*map(str, order.values()))
-                console.print(table)
-                if order["type"] == "Delivery":
-                    if order["status"] != "Delivered":
-                        order_time = datetime.strptime(order["order_time"], "%Y-%m-%d %H:%M:%S")
-                        elapsed_minutes = int((datetime.now() - order_time).total_seconds() // 60)
-                        time_left = order["expected_delivery_time"] - elapsed_minutes
-                        if time_left < 0:
-                            time_left = 0
-                        console.print(f"[bold blue]Estimated time left for delivery: {time_left} mins[/bold blue]")
-                return
+        order = index_for(data, self.restaurant_id, self.storage).get(order_id)
+        if not order:
+            console.print("[bold red]Order not found![/bold red]")
+            return
+
+        console.print(orders_table([order], "Order Details"))
+        time_left = self.time_left(order)
+        if time_left is not None:
+            console.print(f"[bold blue]Estimated time left for delivery: {time_left} mins[/bold blue]")
+            if self.sweeper and order_id in self.sweeper.late:
+                console.print("[bold red]This order is running late.[/bold red]")
+            position = self.locations.latest(order["delivery_agent"])
+            if position:
+                seen = int(time.time() - position.timestamp)
+                speed = self.locations.speed_kmh(order["delivery_agent"])
+                moving = f", moving at {speed:.0f} km/h" if speed is not None else ""
+                console.print(f"[bold blue]Your delivery agent was at ({position.lat:.5f}, {position.lon:.5f}) "
+                              f"{seen}s ago{moving}.[/bold blue]")
 
-        console.print("[bold red]Order not found![/bold red]")
+    @recorded("rate")
+    def rate_order(self):
+        """Let a customer rate the food and delivery of one of their finished orders"""
+        data = read_json(self.restaurant_id, self.storage)
+        customer_name = input("Enter your name: ").strip()
+        try:
+            order_id = int(input("Enter the Order ID to rate: ").strip())
+        except ValueError:
+            console.print("[bold red]Invalid Order ID. Please enter a number.[/bold red]")
+            return
+
+        index = index_for(data, self.restaurant_id, self.storage)
+        order = index.get(order_id)
+        if not order or index.customer_key(order["customer"]) != index.customer_key(customer_name):
+            console.print("[bold red]Order not found![/bold red]")
+            return
+        if order["status"] not in RATEABLE_STATUSES:
+            console.print(f"[bold yellow]You can rate order {order_id} once it has been "
+                          f"{'delivered' if order['type'] == 'Delivery' else 'completed'}.[/bold yellow]")
+            return
+        if order.get("feedback"):
+            console.print(f"[bold yellow]You have already rated order {order_id}.[/bold yellow]")
+            return
+
+        feedback = {"food": self.ask_stars("Rate the food (1-5): "),
+                    "delivery": self.ask_stars("Rate the delivery (1-5): ") if order["type"] == "Delivery" else None,
+                    "comment": input("Any comments? (optional): ").strip(),
+                    "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+        order["feedback"] = feedback
+        self.payments.apply_settled(data)  # keep payments settled while the customer was rating
+        write_json(data, self.restaurant_id, storage=self.storage)
+        self.restaurant_manager.feedback.record(order, feedback)
+        console.print("[bold green]Thank you for your feedback![/bold green]")
+
+    @staticmethod
+    def ask_stars(prompt):
+        while True:
+            stars = parse_stars(input(prompt))
+            if stars:
+                return stars
+            console.print("[bold red]Please enter a whole number from 1 to 5.[/bold red]")
+
+    def payment_settled(self, order):
+        """Tell the customer how the payment went; stop tracking the deadline if it failed"""
+        if self.delivery_manager.outbox is not None:
+            self.delivery_manager.outbox.notify(order)
+        if self.sweeper and order["status"] == PAYMENT_FAILED:
+            self.sweeper.cancel(order["id"])
+
+    def deadline_missed(self, order_id, deadline):
+        """Tell the customer once that their delivery is running late"""
+        if self.delivery_manager.outbox is None:
+            return
+        data = read_snapshot(self.restaurant_id, self.storage)
+        order = index_for(data, self.restaurant_id, self.storage).get(order_id)
+        if order:
+            self.delivery_manager.outbox.notify(order, LATE)
+
+    @staticmethod
+    def time_left(order, now=None):
+        """Minutes until an undelivered delivery order is due; None otherwise (also once its payment failed)"""
+        if order["type"] != "Delivery" or order["status"] in FINAL_STATUSES:
+            return None
+        elapsed_minutes = int(((now or datetime.now()) - parse_order_time(order["order_time"])).total_seconds() // 60)
+        return max(0, order["expected_delivery_time"] - elapsed_minutes)
+
+    def my_orders(self):
+        """A customer's active orders with live ETAs, looked up by customer index"""
+        customer_name = input("Enter your name: ").strip()
+        index = index_for(read_snapshot(self.restaurant_id, self.storage), self.restaurant_id, self.storage)
+        orders = index.by_customer(customer_name)
+        if not orders:
+            console.print("[bold yellow]You have no orders yet.[/bold yellow]")
+            return
+        now = datetime.now()
+        active = [dict(order, items=order.get("lines", order["items"]), eta=self.time_left(order, now))
+                  for order in orders if order["id"] in index.active_ids]
+        if not active:
+            console.print(f"[bold yellow]You have no active orders ({len(orders)} past).[/bold yellow]")
+            return
+        console.print(orders_table(active, f"Active Orders for {customer_name}", MY_ORDERS_COLUMNS))
+        late = [order["id"] for order in active if self.sweeper and order["id"] in self.sweeper.late]
+        if late:
+            console.print(f"[bold red]Running late: {', '.join(map(str, late))}[/bold red]")
@@ -0,0 +1,97 @@
+import os
+import re
+
+# Style tags used in console markup, e.g. [bold red]...[/bold red]
+COLORS = "red|green|yellow|blue|cyan|magenta|white"
+MARKUP = re.compile(rf"\[/?(?:(?:bold|dim|italic)(?: (?:{COLORS}))?|(?:{COLORS}))\]")
+
+_state = {"plain": bool(os.environ.get("Q1_PLAIN"))}
+
+def set_plain(plain=True):
+    """Switch between rich rendering and plain text output"""
+    _state["plain"] = plain
+
+def is_plain():
+    return _state["plain"]
+
+def strip_markup(text):
+    return MARKUP.sub("", text)
+
+class PlainColumn:
+    def __init__(self, header):
+        self.header = header
+        self.cells = []
+
+class PlainTable:
+    """Table with the parts of rich's Table API the CLI uses, printed as plain text"""
+
+    def __init__(self, title=None, caption=None):
+        self.title = title
+        self.caption = caption
+        self.columns = []
+
+    @property
+    def row_count(self):
+        return len(self.columns[0].cells) if self.columns else 0
+
+    def add_column(self, header, **style):
+        self.columns.append(PlainColumn(header))
+
+    def add_row(self, *cells, **style):
+        for column, cell in zip(self.columns, cells):
+            column.cells.append(strip_markup(str(cell)))
+
+    def __str__(self):
+        widths = [max([len(column.header)] + [len(cell) for cell in column.cells]) for column in self.columns]
+        lines = [self.title] if self.title else []
+        lines.append("  ".join(column.header.ljust(width) for column, width in zip(self.columns, widths)))
+        lines.append("  ".join("-" * width for width in widths))
+        for row in range(self.row_count):
+            lines.append("  ".join(column.cells[row].ljust(width) for column, width in zip(self.columns, widths)))
+        if self.caption:
+            lines.append(self.caption)
+        return "\n".join(line.rstrip() for line in lines)
+
+class PlainGroup:
+    def __init__(self, *renderables):
+        self.renderables = list(renderables)
+
+    def __str__(self):
+        return "\n\n".join(map(str, self.renderables))
+
+def make_table(title=None):
+    if is_plain():
+        return PlainTable(title)
+    from rich.table import Table
+    return Table(title=title)
+
+def group(*renderables):
+    if is_plain():
+        return PlainGroup(*renderables)
+    from rich.console import Group
+    return Group(*renderables)
+
+class LazyConsole:
+    """Stands in for a rich Console that is only created on first use.
+
+    Importing rich costs more than the rest of the CLI put together, so it
+    is deferred until something is printed, and skipped entirely in plain mode.
+    """
+
+    def __init__(self):
+        self._console = None
+
+    @property
+    def rich(self):
+        if self._console is None:
+            from rich.console import Console
+            self._console = Console()
+        return self._console
+
+    def print(self, *objects, **kwargs):
+        if is_plain():
+            print(*(strip_markup(obj) if isinstance(obj, str) else str(obj) for obj in objects))
+        else:
+            self.rich.print(*objects, **kwargs)
+
+console = LazyConsole()
@@ -0,0 +1,317 @@
+import argparse
+import copy
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+from pricing import OrderLine
+from query import AWAITING_PAYMENT, PAYMENT_FAILED, index_for
+from stock import StockLedger
+from utils import (DEFAULT_DATA, DEFAULT_RESTAURANT, data_file, data_version, locked_update, read_json,
+                   read_locked, save_if_unchanged, sidecar_path, write_json)
+
+METHODS = {"upi": "UPI", "card": "Card", "wallet": "Wallet", "cod": "COD"}
+WORKERS = 4  # payments talking to the gateway at once
+MAX_PENDING = 32  # payments queued or in flight before intake waits for a free slot
+RETRIES = 3  # extra attempts after a gateway timeout
+RETRY_DELAY = 0.2  # seconds before the first retry; doubles on each further one
+WRITE_ATTEMPTS = 10  # saves of settled payments tried while other writers keep getting there first
+
+Charge = namedtuple("Charge", ["charge_id", "key", "amount", "method"])
+
+class PaymentDeclined(Exception):
+    pass
+
+class GatewayTimeout(Exception):
+    pass
+
+class StubGateway:
+    """Local stand-in for a UPI/card/wallet gateway.
+
+    Each charge takes a random latency and may be declined or time out. Like a
+    real gateway it is idempotent: a charge repeated with the same key returns
+    the first outcome instead of charging again. A timeout can happen after the
+    money was taken, so callers must retry with the same key. With a seed, the
+    same charges get the same latencies, outcomes and charge ids on every run.
+    """
+
+    def __init__(self, latency=(0.05, 0.3), decline_rate=0.05, timeout_rate=0.05, seed=None):
+        self.latency = latency
+        self.decline_rate = decline_rate
+        self.timeout_rate = timeout_rate
+        self.random = random.Random(seed)
+        self.outcomes = {}  # idempotency key -> Charge or PaymentDeclined
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    @property
+    def charges(self):
+        return [outcome for outcome in self.outcomes.values() if isinstance(outcome, Charge)]
+
+    def charge(self, key, amount, method):
+        with self._lock:
+            self.calls += 1
+            delay = self.random.uniform(*self.latency)
+            declined = self.random.random() < self.decline_rate
+            lost = self.random.random() < self.timeout_rate
+            charge_id = f"ch_{self.random.getrandbits(48):012x}"
+        time.sleep(delay)
+        with self._lock:
+            outcome = self.outcomes.get(key)
+            if outcome is None:
+                outcome = (PaymentDeclined(f"{METHODS[method]} payment declined") if declined
+                           else Charge(charge_id, key, amount, method))
+                self.outcomes[key] = outcome
+        if lost:
+            raise GatewayTimeout(f"no response for {key}")
+        if isinstance(outcome, PaymentDeclined):
+            raise outcome
+        return outcome
+
+def apply_ledger(data, restaurant_id=None, storage=None, path=None):
+    """Settle the orders awaiting payment in data as the payments ledger records; returns the orders changed.
+
+    Every manager calls this on data it read earlier just before writing it
+    back, so a payment settled in the meantime is not undone by the write.
+    """
+    index = index_for(data, restaurant_id, storage)
+    awaiting = index.by_status(AWAITING_PAYMENT)
+    if not awaiting:
+        return []
+    ledger = read_locked(path or sidecar_path("payments", restaurant_id), {}, storage)
+    changed = []
+    for order in awaiting:
+        entry = ledger.get(order["payment"]["key"])
+        if not entry or entry["status"] == "pending":
+            continue
+        if entry["status"] == "paid":
+            order["payment"].update(status="paid", charge_id=entry["charge_id"])
+            index.set_status(order, "Pending" if order["type"] == "Delivery" else "Completed")
+        else:
+            order["payment"]["status"] = "declined"
+            index.set_status(order, PAYMENT_FAILED)
+            if order["id"] in data.get("waitlist", []):
+                data["waitlist"].remove(order["id"])
+        changed.append(order)
+    return changed
+
+class PaymentProcessor:
+    """Settles online payments in the background so order intake never waits on the gateway.
+
+    An order paid by UPI, card or wallet is saved as 'Awaiting Payment' and
+    handed to a bounded pool of workers; intake only waits when MAX_PENDING
+    payments are already queued. Every payment has an idempotency key derived
+    from the restaurant and order id, used for every attempt at the gateway,
+    and its outcome is recorded once in the data.json.payments ledger. A retry,
+    a resubmission or a restart therefore never charges twice.
+
+    The ledger is the source of truth. Settled payments are applied to the
+    data file with a compare-and-swap write; every manager also applies the
+    ledger (apply_ledger) to what it saves, so a settlement is never
+    overwritten by a concurrent write. Paid orders become 'Pending' (or 'Completed' for takeaway);
+    declined ones become 'Payment Failed' and their stock is released.
+    Listeners receive each order whose payment was applied.
+    """
+
+    def __init__(self, restaurant_id=None, gateway=None, stock=None, path=None, workers=WORKERS,
+                 max_pending=MAX_PENDING, retries=RETRIES, retry_delay=RETRY_DELAY, storage=None):
+        self.restaurant_id = restaurant_id
+        self._path = path
+        self.storage = storage
+        self.gateway = gateway or StubGateway()
+        self.stock = stock or StockLedger(restaurant_id, storage=storage)
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.listeners = []
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="payments")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._futures = set()
+        self._lock = threading.Lock()
+
+    @property
+    def path(self):
+        return self._path or sidecar_path("payments", self.restaurant_id)
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def key_for(self, order_id):
+        return f"{self.restaurant_id or DEFAULT_RESTAURANT}-{order_id}"
+
+    def ledger(self):
+        return read_locked(self.path, {}, self.storage)
+
+    def open(self, order, method):
+        """Attach a payment to a new order; online payments hold it at 'Awaiting Payment'"""
+        if method == "cod":
+            order["payment"] = {"method": method, "status": "due"}
+            return
+        order["payment"] = {"method": method, "status": "pending", "key": self.key_for(order["id"])}
+        order["status"] = AWAITING_PAYMENT
+
+    def submit(self, order):
+        """Queue an order's online payment; call after the order has been saved"""
+        key = order["payment"]["key"]
+        entry = {"order_id": order["id"], "amount": order["total_price"], "method": order["payment"]["method"],
+                 "lines": [{"item": line["item"], "quantity": line["quantity"]} for line in order.get("lines", [])],
+                 "status": "pending"}
+
+        def add(ledger):
+            ledger = ledger or {}
+            ledger.setdefault(key, entry)
+            return ledger, None
+
+        locked_update(self.path, add, {}, self.storage)
+        self._slots.acquire()
+        future = self._pool.submit(self._settle, key)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._forget)
+        return future
+
+    def _forget(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+    def _settle(self, key):
+        try:
+            entry = self.ledger().get(key)
+            if entry and entry["status"] == "pending":
+                outcome = self._charge(key, entry)
+                if outcome is not None:
+                    self._record(key, outcome)
+            return self.apply()
+        finally:
+            self._slots.release()
+
+    def _charge(self, key, entry):
+        """The gateway's outcome, retrying timeouts with the same key; None if it never answered"""
+        for attempt in range(self.retries + 1):
+            try:
+                return self.gateway.charge(key, entry["amount"], entry["method"])
+            except PaymentDeclined as declined:
+                return declined
+            except GatewayTimeout:
+                if attempt < self.retries:
+                    time.sleep(self.retry_delay * 2 ** attempt)
+        return None  # still pending; resumed with the same key on the next start
+
+    def _record(self, key, outcome):
+        def settle(ledger):
+            entry = ledger[key]
+            if entry["status"] != "pending":
+                return ledger, None
+            if isinstance(outcome, PaymentDeclined):
+                entry.update(status="declined", reason=str(outcome))
+            else:
+                entry.update(status="paid", charge_id=outcome.charge_id)
+            return ledger, entry
+
+        entry = locked_update(self.path, settle, {}, self.storage)
+        if entry and entry["status"] == "declined":
+            self.stock.release([OrderLine(line["item"], line["quantity"], ()) for line in entry["lines"]])
+
+    def apply_settled(self, data):
+        """Bring orders awaiting payment in data up to date with the ledger; returns the orders changed"""
+        return apply_ledger(data, self.restaurant_id, self.storage, self.path)
+
+    def apply(self):
+        """Save settled payments to the data file, retrying if another writer got there first.
+
+        Gives up after WRITE_ATTEMPTS lost races or on a failed write. The
+        ledger keeps the outcomes, so the next save of the data file (see
+        apply_ledger) or resume() applies them instead.
+        """
+        for _ in range(WRITE_ATTEMPTS):
+            version = data_version(self.restaurant_id, self.storage)
+            data = read_json(self.restaurant_id, self.storage)
+            changed = self.apply_settled(data)
+            if not changed:
+                return []
+            try:
+                if save_if_unchanged(data, self.restaurant_id, version, self.storage):
+                    break
+            except OSError as e:
+                print(f"Error saving settled payments: {e}")
+                return []
+        else:
+            print(f"Error saving settled payments: {data_file(self.restaurant_id)} kept changing; "
+                  f"gave up after {WRITE_ATTEMPTS} attempts")
+            return []
+        for order in changed:
+            for listener in self.listeners:
+                listener(order)
+        return changed
+
+    def resume(self):
+        """Apply payments settled while we were away and resubmit the ones still pending"""
+        self.apply()
+        data = read_json(self.restaurant_id, self.storage)
+        awaiting = index_for(data, self.restaurant_id, self.storage).by_status(AWAITING_PAYMENT)
+        return [self.submit(order) for order in awaiting]
+
+    def drain(self):
+        """Wait for every queued payment to settle"""
+        with self._lock:
+            futures = list(self._futures)
+        wait(futures)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+def benchmark(orders=100, latency=0.05, workers=8):
+    """Order intake rate when each order waits for its payment vs when payments settle in the background.
+
+    Runs in a scratch directory. Returns {mode: (orders per second taken in,
+    seconds until every payment had settled)}.
+    """
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            for mode in ("inline", "background"):
+                for name in os.listdir(workdir):
+                    os.remove(name)
+                write_json(copy.deepcopy(DEFAULT_DATA))
+                gateway = StubGateway(latency=(latency, latency), decline_rate=0, timeout_rate=0)
+                processor = PaymentProcessor(gateway=gateway, workers=workers)
+                started = time.perf_counter()
+                for _ in range(orders):
+                    data = read_json()
+                    order = {"id": data["next_order_id"], "customer": "bench", "type": "Takeaway",
+                             "items": ["pizza"], "lines": [{"item": "pizza", "quantity": 1, "modifiers": []}],
+                             "total_price": 315.0, "status": "Completed", "delivery_agent": "-"}
+                    processor.open(order, "upi")
+                    processor.apply_settled(data)
+                    data["orders"].append(order)
+                    data["next_order_id"] += 1
+                    write_json(data)
+                    future = processor.submit(order)
+                    if mode == "inline":
+                        future.result()
+                intake = time.perf_counter() - started
+                processor.drain()
+                results[mode] = (orders / intake, time.perf_counter() - started)
+                processor.shutdown()
+        finally:
+            os.chdir(cwd)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure order intake with payments settled inline or in the background.")
+    parser.add_argument("-n", "--orders", type=int, default=100)
+    parser.add_argument("-l", "--latency", type=float, default=0.05, help="gateway latency in seconds")
+    parser.add_argument("-w", "--workers", type=int, default=WORKERS)
+    args = parser.parse_args(argv)
+    results = benchmark(args.orders, args.latency, args.workers)
+    for mode, (rate, settled) in results.items():
+        print(f"{mode:>10}: {rate:8.1f} orders/s taken in, all settled after {settled:.2f} s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
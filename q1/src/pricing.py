@@ -0,0 +1,72 @@
+from collections import namedtuple
+
+TAX_RATE = 0.05
+DELIVERY_FEE = 40.00
+
+OrderLine = namedtuple("OrderLine", ["item", "quantity", "modifiers"])
+
+def parse_line(text):
+    """Parse '2 x pizza + extra cheese' into an OrderLine.
+
+    The quantity ('2 x' or '2') is optional and defaults to 1; everything after
+    a '+' is a modifier.
+    """
+    parts = [part.strip().lower() for part in text.split("+")]
+    head, modifiers = parts[0], tuple(part for part in parts[1:] if part)
+    quantity = 1
+    words = head.split()
+    if len(words) > 1 and words[0].isdigit():
+        quantity = int(words[0])
+        words = words[2:] if words[1] == "x" else words[1:]
+    if quantity < 1:
+        raise ValueError(f"Invalid quantity in '{text.strip()}'")
+    return OrderLine(" ".join(words), quantity, modifiers)
+
+def parse_cart(text):
+    """Order lines typed as comma-separated entries; raises ValueError if there are none"""
+    lines = [parse_line(part) for part in text.split(",") if part.strip()]
+    if not lines:
+        raise ValueError("No items entered")
+    return lines
+
+class PriceTable:
+    """Unit prices for menu items and modifiers, built once per menu version.
+
+    Modifiers that are not in the table are free special requests. quote()
+    prices a whole cart in one pass; quote_many() prices a batch of carts and
+    reuses line amounts shared between them.
+    """
+
+    def __init__(self, menu, modifiers):
+        self.items = dict(menu)
+        self.modifiers = dict(modifiers)
+
+    def line_amount(self, line):
+        """Price of a line; raises KeyError for items not on the menu"""
+        unit = self.items[line.item]
+        for modifier in line.modifiers:
+            unit += self.modifiers.get(modifier, 0.0)
+        return unit * line.quantity
+
+    def quote(self, lines, order_type, amounts=None):
+        subtotal = 0.0
+        for line in lines:
+            amount = amounts.get(line) if amounts is not None else None
+            if amount is None:
+                amount = self.line_amount(line)
+                if amounts is not None:
+                    amounts[line] = amount
+            subtotal += amount
+        tax = round(subtotal * TAX_RATE, 2)
+        delivery_fee = DELIVERY_FEE if order_type == "delivery" else 0.0
+        return {
+            "subtotal": round(subtotal, 2),
+            "tax": tax,
+            "delivery_fee": delivery_fee,
+            "total": round(subtotal + tax + delivery_fee, 2)
+        }
+
+    def quote_many(self, carts):
+        """Quotes for (lines, order_type) pairs, e.g. for bulk quotes"""
+        amounts = {}
+        return [self.quote(lines, order_type, amounts) for lines, order_type in carts]
@@ -0,0 +1,180 @@
+import bisect
+from datetime import datetime, timedelta
+from utils import data_file, storage_or_default
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+AWAITING_PAYMENT = "Awaiting Payment"  # placed, but not confirmed until its payment settles
+PAYMENT_FAILED = "Payment Failed"
+FINAL_STATUSES = {"Delivered", "Completed", PAYMENT_FAILED}
+ORDER_STATUSES = ("Pending", "Picked Up", "Out for Delivery", "Delivered", "Completed", AWAITING_PAYMENT, PAYMENT_FAILED)
+
+class OrderIndex:
+    """Secondary indexes over a list of orders.
+
+    Orders are indexed by status, delivery agent, customer and order time.
+    order_time strings sort chronologically, so the time index is a sorted list
+    of (order_time, id) pairs and range scans are two bisects. The index is kept
+    up to date incrementally through add(), set_status() and set_agent(), and
+    synced() carries it over to a later read of the same order history.
+    """
+
+    def __init__(self, orders):
+        self.orders = orders
+        self.positions = {}
+        self.by_status_ids = {}
+        self.by_agent_ids = {}
+        self.by_customer_ids = {}
+        self.active_ids = {}  # id of each order not in a final status -> (status, agent) it is indexed under
+        self.changed_ids = {}  # id of each order moved by set_status/set_agent -> (status, agent) it is indexed under
+        self.times = []
+        self.owned = {id(self.times)}  # ids of the buckets (and times list) no other index shares
+        for position, order in enumerate(self.orders):
+            self._insert(order, position)
+
+    def __len__(self):
+        return len(self.positions)
+
+    @staticmethod
+    def customer_key(name):
+        return name.strip().lower()
+
+    @staticmethod
+    def stamp(order):
+        """What an order keeps for good, to tell a later read of a history from another history"""
+        return order["id"], order["customer"], order.get("order_time")
+
+    def _bucket(self, buckets, key):
+        """buckets[key] for changing; copied first if another index shares it"""
+        bucket = buckets.get(key)
+        if bucket is None or id(bucket) not in self.owned:
+            bucket = buckets[key] = set() if bucket is None else set(bucket)
+            self.owned.add(id(bucket))
+        return bucket
+
+    def _move(self, buckets, order_id, old, new):
+        if order_id in buckets.get(old, ()):
+            self._bucket(buckets, old).discard(order_id)
+        self._bucket(buckets, new).add(order_id)
+
+    def _track(self, order_id, status, agent):
+        if status in FINAL_STATUSES:
+            self.active_ids.pop(order_id, None)
+        else:
+            self.active_ids[order_id] = (status, agent)
+
+    def _insert(self, order, position):
+        order_id = order["id"]
+        self.positions[order_id] = position
+        self._bucket(self.by_status_ids, order["status"]).add(order_id)
+        self._bucket(self.by_agent_ids, order["delivery_agent"]).add(order_id)
+        self._bucket(self.by_customer_ids, self.customer_key(order["customer"])).add(order_id)
+        self._track(order_id, order["status"], order["delivery_agent"])
+        if order.get("order_time"):
+            if id(self.times) not in self.owned:
+                self.times = list(self.times)
+                self.owned.add(id(self.times))
+            bisect.insort(self.times, (order["order_time"], order_id))
+
+    def add(self, order):
+        """Index an order that has just been appended to the order list"""
+        self._insert(order, len(self.positions))
+
+    def set_status(self, order, status):
+        """Change an order's status and move it between status buckets"""
+        self._move(self.by_status_ids, order["id"], order["status"], status)
+        self._track(order["id"], status, order["delivery_agent"])
+        self.changed_ids[order["id"]] = (status, order["delivery_agent"])
+        order["status"] = status
+
+    def set_agent(self, order, agent):
+        """Change an order's delivery agent and move it between agent buckets"""
+        self._move(self.by_agent_ids, order["id"], order["delivery_agent"], agent)
+        self._track(order["id"], order["status"], agent)
+        self.changed_ids[order["id"]] = (order["status"], agent)
+        order["delivery_agent"] = agent
+
+    def synced(self, orders):
+        """Index for orders, a later read of this history; None if orders is some other history.
+
+        Saved orders never leave a final status, so only those still active
+        and those changed through this index (which may never have been
+        saved) are re-checked for a new status or agent, and orders appended
+        since are added. Both indexes share their buckets until one of them
+        changes a bucket, so this costs about as much as the orders that changed.
+        """
+        indexed = len(self.positions)
+        if len(orders) < indexed or any(self.stamp(orders[position]) != self.stamp(self.orders[position])
+                                        for position in {0, indexed - 1} if indexed):
+            return None
+        index = OrderIndex.__new__(OrderIndex)
+        index.orders = orders
+        index.positions = dict(self.positions)
+        index.by_status_ids = dict(self.by_status_ids)
+        index.by_agent_ids = dict(self.by_agent_ids)
+        index.by_customer_ids = dict(self.by_customer_ids)
+        index.active_ids = dict(self.active_ids)
+        index.changed_ids = {}
+        index.times = self.times
+        index.owned = set()
+        self.owned = set()  # now shared both ways
+        for order_id, (status, agent) in {**self.active_ids, **self.changed_ids}.items():
+            order = orders[self.positions[order_id]]
+            if (order["status"], order["delivery_agent"]) == (status, agent):
+                continue
+            index._move(index.by_status_ids, order_id, status, order["status"])
+            index._move(index.by_agent_ids, order_id, agent, order["delivery_agent"])
+            index._track(order_id, order["status"], order["delivery_agent"])
+        for position in range(indexed, len(orders)):
+            index._insert(orders[position], position)
+        return index
+
+    def get(self, order_id):
+        position = self.positions.get(order_id)
+        return None if position is None else self.orders[position]
+
+    def _resolve(self, ids, active=False):
+        if active:
+            ids = [order_id for order_id in ids if order_id in self.active_ids]
+        return [self.orders[self.positions[order_id]] for order_id in sorted(ids)]
+
+    def by_status(self, status):
+        return self._resolve(self.by_status_ids.get(status, ()))
+
+    def by_agent(self, agent, active=False):
+        return self._resolve(self.by_agent_ids.get(agent, ()), active)
+
+    def by_customer(self, customer, active=False):
+        return self._resolve(self.by_customer_ids.get(self.customer_key(customer), ()), active)
+
+    def placed_between(self, start, end):
+        """Orders with start <= order_time < end (datetimes), oldest first"""
+        lo = bisect.bisect_left(self.times, (start.strftime(TIME_FORMAT),))
+        hi = bisect.bisect_left(self.times, (end.strftime(TIME_FORMAT),))
+        return [self.orders[self.positions[order_id]] for _, order_id in self.times[lo:hi]]
+
+    def older_than(self, status, minutes, now=None):
+        """Orders in a status that were placed more than minutes ago, oldest first"""
+        cutoff = ((now or datetime.now()) - timedelta(minutes=minutes)).strftime(TIME_FORMAT)
+        matches = [self.get(order_id) for order_id in self.by_status_ids.get(status, ())]
+        return sorted((order for order in matches if (order.get("order_time") or cutoff) < cutoff),
+                      key=lambda order: order["order_time"])
+
+_indexes = {}  # (storage, data file) -> index of the orders last read from it
+
+def index_for(data, restaurant_id=None, storage=None):
+    """Index for data["orders"], as read from the data file of restaurant_id.
+
+    Each data file keeps the index of its latest read. The same list reuses
+    it; a later read of the file gets an index synced from it (see
+    OrderIndex.synced) rather than one built over every order again.
+    """
+    key = (storage_or_default(storage), data_file(restaurant_id))
+    orders = data["orders"]
+    index = _indexes.get(key)
+    if index is not None and index.orders is orders and len(index) == len(orders):
+        return index
+    index = index.synced(orders) if index is not None else None
+    if index is None:
+        index = OrderIndex(orders)
+    _indexes[key] = index
+    return index
@@ -0,0 +1,119 @@
+from collections import deque
+from utils import locked_update, read_locked, sidecar_path
+
+STARS = range(1, 6)
+RECENT_RATINGS = 20  # ratings in the recent-window average
+RECENT_FEEDBACK = 20  # latest comments kept for the manager's view
+NEUTRAL_RATING = 3.0  # stands in for agents nobody has rated yet
+
+class RatingAggregate:
+    """Running summary of 1-5 star ratings: count, mean, histogram and a recent-window mean.
+
+    add() is O(1): it bumps the totals and slides a fixed-size window, so
+    nothing ever re-reads individual ratings.
+    """
+
+    def __init__(self, count=0, total=0, histogram=None, recent=(), window=RECENT_RATINGS, recent_total=None):
+        self.count = count
+        self.total = total
+        self.histogram = list(histogram or [0] * len(STARS))
+        self.recent = deque(recent, maxlen=window)
+        self.recent_total = sum(self.recent) if recent_total is None else recent_total
+
+    def add(self, stars):
+        self.count += 1
+        self.total += stars
+        self.histogram[stars - 1] += 1
+        if len(self.recent) == self.recent.maxlen:
+            self.recent_total -= self.recent[0]
+        self.recent.append(stars)
+        self.recent_total += stars
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    @property
+    def recent_mean(self):
+        return self.recent_total / len(self.recent) if self.recent else None
+
+    def to_dict(self):
+        return {"count": self.count, "total": self.total, "histogram": self.histogram,
+                "recent": list(self.recent), "recent_total": self.recent_total}
+
+    @classmethod
+    def from_dict(cls, state, window=RECENT_RATINGS):
+        if len(state["recent"]) > window:
+            return cls(state["count"], state["total"], state["histogram"], state["recent"][-window:], window)
+        return cls(state["count"], state["total"], state["histogram"], state["recent"], window, state["recent_total"])
+
+def parse_stars(text):
+    """1-5 from user input, or None if it is not a whole number in that range"""
+    text = text.strip()
+    return int(text) if text.isdigit() and int(text) in STARS else None
+
+class FeedbackStore:
+    """Ratings aggregated per menu item and per delivery agent.
+
+    The feedback itself is kept on the rated order in the data file. Each new
+    rating also updates the aggregates in a small sidecar (data.json.ratings)
+    with one locked update whose cost depends on the number of items and agents,
+    never on how many ratings there are. The sidecar also keeps the latest
+    comments for the manager.
+    """
+
+    def __init__(self, restaurant_id=None, path=None, window=RECENT_RATINGS, storage=None):
+        self.restaurant_id = restaurant_id
+        self._path = path
+        self.storage = storage
+        self.window = window
+
+    @property
+    def path(self):
+        return self._path or sidecar_path("ratings", self.restaurant_id)
+
+    def record(self, order, feedback):
+        """Fold an order's feedback into the item and agent aggregates"""
+        def update(state):
+            state = state or {"items": {}, "agents": {}, "recent": []}
+            self._fold(state, order, feedback)
+            return state, None
+
+        locked_update(self.path, update, {}, self.storage)
+
+    def _fold(self, state, order, feedback):
+        for item in dict.fromkeys(order["items"]):
+            self._add(state["items"], item, feedback["food"])
+        if feedback.get("delivery"):
+            self._add(state["agents"], order["delivery_agent"], feedback["delivery"])
+        state["recent"].append(dict(feedback, order_id=order["id"], customer=order["customer"]))
+        del state["recent"][:-RECENT_FEEDBACK]
+
+    def _add(self, aggregates, name, stars):
+        aggregate = (RatingAggregate.from_dict(aggregates[name], self.window) if name in aggregates
+                     else RatingAggregate(window=self.window))
+        aggregate.add(stars)
+        aggregates[name] = aggregate.to_dict()
+
+    def summary(self):
+        """{"items": {item: RatingAggregate}, "agents": {agent: RatingAggregate}, "recent": [feedback]}"""
+        state = read_locked(self.path, {}, self.storage)
+        return {
+            "items": {name: RatingAggregate.from_dict(aggregate, self.window)
+                      for name, aggregate in state.get("items", {}).items()},
+            "agents": {name: RatingAggregate.from_dict(aggregate, self.window)
+                       for name, aggregate in state.get("agents", {}).items()},
+            "recent": state.get("recent", []),
+        }
+
+    def agent_ratings(self):
+        """Recent-window mean per rated agent"""
+        return {agent: aggregate.recent_mean for agent, aggregate in self.summary()["agents"].items()}
+
+    def rebuild(self, orders):
+        """Recompute the aggregates from the feedback kept on orders, e.g. after losing the sidecar"""
+        state = {"items": {}, "agents": {}, "recent": []}
+        rated = sorted((order for order in orders if order.get("feedback")), key=lambda order: order["feedback"]["time"])
+        for order in rated:
+            self._fold(state, order, order["feedback"])
+        locked_update(self.path, lambda _: (state, None), {}, self.storage)
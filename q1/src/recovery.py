@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import time
+import zlib
+from collections import namedtuple
+
+CHECKPOINT_EVERY = 100  # logged writes between checkpoints; bounds what recovery replays
+
+Recovered = namedtuple("Recovered", ["data", "replayed", "seconds"])
+
+def _dumps(value):
+    return json.dumps(value, sort_keys=True, separators=(",", ":"))
+
+def _checksum(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+class Journal:
+    """Checksummed checkpoint and change log kept next to one data file.
+
+    The checkpoint (<data>.checkpoint) is a header line with a generation and
+    the SHA-256 of the payload line that follows it. Every write after that
+    appends one line to <data>.log with only the orders and top-level keys
+    that changed, prefixed by its CRC-32. A new checkpoint starts a new
+    generation and empties the log, so recovery reads one checkpoint and at
+    most CHECKPOINT_EVERY log lines however long the history is.
+
+    Changes are diffed against the state this process last wrote. If some
+    other process wrote in between, that baseline is unknown and a full
+    checkpoint is taken instead.
+    """
+
+    def __init__(self, path, checkpoint_every=CHECKPOINT_EVERY):
+        self.path = path
+        self.checkpoint_path = f"{path}.checkpoint"
+        self.log_path = f"{path}.log"
+        self.checkpoint_every = checkpoint_every
+        self.generation = None
+        self.logged = 0
+        self.baseline = None  # (data file version, {order id: text}, {key: text})
+
+    def record(self, data, version_before, version_after):
+        """Journal a write that moved the data file from version_before to version_after"""
+        orders = {order["id"]: (_dumps(order), order) for order in data.get("orders", [])}
+        keys = {key: (_dumps(value), value) for key, value in data.items() if key != "orders"}
+        if (self.baseline is None or self.baseline[0] != version_before
+                or self.logged >= self.checkpoint_every or not os.path.exists(self.checkpoint_path)):
+            self.checkpoint(data)
+        else:
+            _, old_orders, old_keys = self.baseline
+            changes = {
+                "orders": [order for order_id, (text, order) in orders.items() if old_orders.get(order_id) != text],
+                "set": {key: value for key, (text, value) in keys.items() if old_keys.get(key) != text},
+                "unset": [key for key in old_keys if key not in keys],
+            }
+            if any(changes.values()):
+                self.append(changes)
+        self.baseline = (version_after,
+                         {order_id: text for order_id, (text, _) in orders.items()},
+                         {key: text for key, (text, _) in keys.items()})
+
+    def checkpoint(self, data):
+        self.generation = time.time_ns()
+        payload = _dumps(data)
+        header = _dumps({"generation": self.generation, "checksum": _checksum(payload)})
+        temp_path = f"{self.checkpoint_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            f.write(f"{header}\n{payload}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.checkpoint_path)
+        # Lines left from the previous generation are ignored even if this truncation is lost
+        open(self.log_path, "w").close()
+        self.logged = 0
+
+    def append(self, changes):
+        body = _dumps({"generation": self.generation, "changes": changes})
+        with open(self.log_path, "a") as f:
+            f.write(f"{zlib.crc32(body.encode()):08x} {body}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.logged += 1
+
+    def recover(self):
+        """State rebuilt from the checkpoint and its log; None if there is no valid checkpoint"""
+        started = time.perf_counter()
+        try:
+            with open(self.checkpoint_path) as f:
+                header, payload = f.readline(), f.readline().rstrip("\n")
+            header = json.loads(header)
+        except (OSError, ValueError):
+            return None
+        if _checksum(payload) != header.get("checksum"):
+            return None
+        data = json.loads(payload)
+        positions = {order["id"]: position for position, order in enumerate(data.get("orders", []))}
+        replayed = 0
+        try:
+            with open(self.log_path) as f:
+                lines = f.readlines()
+        except OSError:
+            lines = []
+        for line in lines:
+            crc, _, body = line.rstrip("\n").partition(" ")
+            if not line.endswith("\n") or crc != f"{zlib.crc32(body.encode()):08x}":
+                break  # torn tail from a crash mid-append; nothing after it was acknowledged
+            record = json.loads(body)
+            if record["generation"] != header["generation"]:
+                continue
+            changes = record["changes"]
+            for order in changes["orders"]:
+                if order["id"] in positions:
+                    data["orders"][positions[order["id"]]] = order
+                else:
+                    positions[order["id"]] = len(data["orders"])
+                    data["orders"].append(order)
+            data.update(changes["set"])
+            for key in changes["unset"]:
+                data.pop(key, None)
+            replayed += 1
+        return Recovered(data, replayed, time.perf_counter() - started)
+
+_journals = {}
+
+def journal_for(path):
+    journal = _journals.get(path)
+    if journal is None:
+        journal = _journals[path] = Journal(path)
+    return journal
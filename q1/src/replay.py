@@ -0,0 +1,185 @@
+import argparse
+import builtins
+import importlib
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections import deque
+from multiprocessing import Pool
+from unittest.mock import patch
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# Interactive apps the driver can replay; module is imported from src and its main() run
+APPS = {
+    "q1": {"src": os.path.join(ROOT, "q1", "src"), "module": "main"},
+    "q3": {"src": os.path.join(ROOT, "q3", "src"), "module": "dollmarket"},
+}
+
+class ScriptedInput:
+    """Stands in for input() and print() while a session is replayed.
+
+    Inputs are served from the session's flows in order and each flow is timed
+    from its first input to the first input of the next flow (or the end of the
+    session), so a flow's time covers all the work its inputs trigger. Output
+    is kept as plain text per flow; rich renderables are recorded by type name
+    and never rendered.
+    """
+
+    def __init__(self, flows):
+        self.flows = flows
+        self.pending = deque((number, text) for number, flow in enumerate(flows) for text in flow["inputs"])
+        self.started = [None] * len(flows)
+        self.output = [[] for _ in flows]
+        self.current = 0
+        self.finished = None
+
+    def input(self, prompt=""):
+        self.write(prompt)
+        if not self.pending:
+            raise EOFError("session script exhausted")
+        number, text = self.pending.popleft()
+        if self.started[number] is None:
+            self.started[number] = time.perf_counter()
+        self.current = number
+        return text
+
+    def write(self, *args, **kwargs):
+        self.output[self.current].append(" ".join(
+            arg if isinstance(arg, str) else type(arg).__name__ for arg in args))
+
+    def finish(self):
+        self.finished = time.perf_counter()
+
+    def timings(self):
+        """(flow name, seconds) for each flow that was reached"""
+        marks = [start for start in self.started if start is not None] + [self.finished]
+        return [(flow["name"], end - start)
+                for flow, start, end in zip(self.flows, marks, marks[1:])]
+
+    def failures(self):
+        """Expected text that did not show up in its flow's output"""
+        missing = []
+        for flow, lines in zip(self.flows, self.output):
+            text = "\n".join(lines)
+            missing += [(flow["name"], expected) for expected in flow.get("expect", []) if expected not in text]
+        return missing
+
+def run_session(job):
+    """Replay one session in this process; the worker's cwd becomes workdir"""
+    app, session, workdir = job
+    os.chdir(workdir)
+    sys.path.insert(0, APPS[app]["src"])
+    script = ScriptedInput(session["flows"])
+    error = None
+    with patch.object(builtins, "input", script.input), patch.object(builtins, "print", script.write), \
+            patch("rich.console.Console.print", lambda self, *args, **kwargs: script.write(*args)):
+        module = importlib.import_module(APPS[app]["module"])
+        if hasattr(module, "getpass"):
+            module.getpass = script.input
+        try:
+            module.main()
+        except (EOFError, SystemExit):
+            pass
+        except Exception as e:  # reported with the session rather than killing the run
+            error = repr(e)
+        script.finish()
+    if script.pending:
+        error = error or f"{len(script.pending)} inputs left unread"
+    return {"session": session["name"], "timings": script.timings(),
+            "failures": script.failures(), "error": error}
+
+def load_script(path):
+    """Read a session script and expand each session's repeat count"""
+    with open(path, "r") as file:
+        script = json.load(file)
+    if script.get("app") not in APPS:
+        raise ValueError(f"Unknown app '{script.get('app')}'; expected one of {', '.join(APPS)}")
+    seed = script.get("data")
+    if seed:
+        seed = os.path.join(os.path.dirname(os.path.abspath(path)), seed)
+    sessions = []
+    for session in script["sessions"]:
+        sessions += [session] * session.get("repeat", 1)
+    return script["app"], sessions, seed
+
+def replay(path, processes=None, repeat=1, shared=False):
+    """Replay every session of a script repeat times across worker processes.
+
+    Each session gets its own scratch directory (seeded with the script's data
+    file, if any) unless shared is set, in which case all sessions run against
+    one directory and so contend for the same data files.
+    """
+    app, sessions, seed = load_script(path)
+    sessions = sessions * repeat
+    scratch = tempfile.mkdtemp(prefix="replay-")
+    try:
+        workdirs = []
+        for number in range(1 if shared else len(sessions)):
+            workdir = os.path.join(scratch, str(number))
+            os.makedirs(workdir)
+            if seed:
+                shutil.copy(seed, os.path.join(workdir, "data.json"))
+            workdirs.append(workdir)
+        jobs = [(app, session, workdirs[0 if shared else number]) for number, session in enumerate(sessions)]
+        started = time.perf_counter()
+        # A fresh process per session, so module level state never leaks between sessions
+        with Pool(processes, maxtasksperchild=1) as pool:
+            results = pool.map(run_session, jobs, chunksize=1)
+        return results, time.perf_counter() - started
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+def summarize(results):
+    """Per flow name: runs, mean, p95 and max wall time in seconds"""
+    samples = {}
+    for result in results:
+        for name, seconds in result["timings"]:
+            samples.setdefault(name, []).append(seconds)
+    summary = {}
+    for name, values in samples.items():
+        values.sort()
+        summary[name] = {
+            "runs": len(values),
+            "mean": statistics.fmean(values),
+            "p95": values[min(len(values) - 1, int(len(values) * 0.95))],
+            "max": values[-1],
+        }
+    return summary
+
+def main(argv=None):
+    from rich.console import Console
+    from rich.table import Table
+
+    parser = argparse.ArgumentParser(description="Replay scripted CLI sessions and time each flow.")
+    parser.add_argument("script", help="session script (JSON)")
+    parser.add_argument("-p", "--processes", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("-r", "--repeat", type=int, default=1, help="replay the whole script this many times")
+    parser.add_argument("--shared", action="store_true", help="run all sessions against one data directory")
+    args = parser.parse_args(argv)
+
+    console = Console()
+    results, elapsed = replay(args.script, args.processes, args.repeat, args.shared)
+
+    table = Table(title="Flow Timings (ms)")
+    for header in ("Flow", "Runs", "Mean", "P95", "Max"):
+        table.add_column(header, justify="left" if header == "Flow" else "right")
+    for name, stats in summarize(results).items():
+        table.add_row(name, str(stats["runs"]),
+                      *(f"{stats[key] * 1000:.2f}" for key in ("mean", "p95", "max")))
+    console.print(table)
+    console.print(f"{len(results)} sessions in {elapsed:.2f}s ({len(results) / elapsed:.1f} sessions/s)")
+
+    failed = [result for result in results if result["error"] or result["failures"]]
+    for result in failed:
+        console.print(f"[bold red]{result['session']}:[/bold red] {result['error'] or ''}")
+        for flow, expected in result["failures"]:
+            console.print(f"  [red]{flow}: expected '{expected}'[/red]")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
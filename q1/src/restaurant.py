@@ -1,29 +1,138 @@
-from rich.console import Console
-from rich.table import Table
-from utils import read_json, write_json
+from pricing import PriceTable
+from migrations import SCHEMA_KEY
+from oplog import recorded
+from output import console, make_table
+from payments import apply_ledger
+from query import index_for
+from ratings import STARS, FeedbackStore
+from search import PrefixTrie, SearchIndex
+from snapshot import read_snapshot
+from stock import StockLedger
+from utils import read_json, write_json, read_sidecar, sidecar_path, locked_update
 
-console = Console()
+
+MAX_CACHED_MENUS = 4
+
+def format_cell(value):
+    """Table text for an order field; order lines read as '2 x pizza + extra cheese'"""
+    if value is None:
+        return "-"
+    if isinstance(value, list):
+        return ", ".join(map(format_cell, value))
+    if isinstance(value, dict) and "item" in value:
+        text = value["item"] if value["quantity"] == 1 else f"{value['quantity']} x {value['item']}"
+        return " + ".join([text] + value["modifiers"])
+    return str(value)
+
+def orders_table(orders, title, columns=None):
+    """Table of orders; columns default to every key in first-seen order"""
+    if columns is None:
+        columns = list(dict.fromkeys(key for order in orders for key in order if key != SCHEMA_KEY))
+    table = make_table(title)
+    for header in columns:
+        table.add_column(header, justify="center", style="cyan")
+    for order in orders:
+        table.add_row(*(format_cell(order.get(column)) for column in columns))
+    return table
+
+class MenuSnapshot:
+    """One version of the menu with its price tables and rendered table"""
+
+    def __init__(self, version, menu, modifiers=None):
+        self.version = version
+        self.pricing = PriceTable(menu, modifiers or {})
+        self.prices = self.pricing.items
+        self.table = make_table("Food Menu")
+        self.table.add_column("Item", justify="center", style="cyan")
+        self.table.add_column("Price (₹)", justify="center", style="green")
+        for item, price in self.prices.items():
+            self.table.add_row(item.capitalize(), f"{price:.2f}")
+        self.names = PrefixTrie(self.prices)
+        if self.pricing.modifiers:
+            self.table.caption = "Add-ons: " + ", ".join(
+                f"{name} ₹{price:.2f}" for name, price in self.pricing.modifiers.items())
+
+    def match_item(self, name):
+        """The menu item a customer meant by a possibly short or misspelt name, or None"""
+        return name if name in self.prices else self.names.match(name)
 
 class RestaurantManager:
+    def __init__(self, restaurant_id=None, storage=None):
+        self.restaurant_id = restaurant_id
+        self.storage = storage
+        self.stock = StockLedger(restaurant_id, storage=storage)
+        self.feedback = FeedbackStore(restaurant_id, storage=storage)
+        self.search = SearchIndex()
+        self.menus = {}
+        self.current_menu_version = None
+
+    def menu_snapshot(self, data=None):
+        """Menu for the current version; built once per version and then cached.
+
+        Every menu edit bumps menu_version in the data file and in the small
+        data.json.menu sidecar. Without data, the sidecar alone tells us whether
+        the cached snapshot is still current, so the data file is not re-read.
+        """
+        if data is None:
+            published = read_sidecar("menu", restaurant_id=self.restaurant_id, storage=self.storage)
+            if published is not None and published == self.current_menu_version:
+                return self.menus[published]
+            data = read_json(self.restaurant_id, self.storage)
+            if published is None:
+                # Publish the version so the next reader can skip the data file
+                version = data.get("menu_version", 0)
+                locked_update(sidecar_path("menu", self.restaurant_id),
+                              lambda current: (max(current or 0, version), None), storage=self.storage)
+        version = data.get("menu_version", 0)
+        snapshot = self.menus.get(version)
+        if snapshot is None:
+            snapshot = MenuSnapshot(version, data["menu"], data.get("modifiers"))
+            self.menus[version] = snapshot
+            if len(self.menus) > MAX_CACHED_MENUS:
+                del self.menus[min(self.menus)]
+        self.current_menu_version = version
+        return snapshot
+
+    def save_menu(self, data, save=None):
+        """Save an edited menu under a new version; returns whether it was saved.
+
+        The version is picked, the data file written (save(data), write_json
+        by default) and the version published in data.json.menu all under the
+        sidecar's lock, so versions stay unique across processes and a save
+        that fails or loses a race never publishes a menu that was not stored.
+        """
+        save = save or (lambda data: write_json(data, self.restaurant_id, storage=self.storage))
+        previous = data.get("menu_version", 0)
+
+        def bump(published):
+            data["menu_version"] = max(published or 0, previous) + 1
+            if save(data):
+                return data["menu_version"], True
+            data["menu_version"] = previous
+            return published, False
+
+        return locked_update(sidecar_path("menu", self.restaurant_id), bump, storage=self.storage)
+
     def view_menu(self):
-        data = read_json()
-        table = Table(title="Food Menu")
-        table.add_column("Item", justify="center", style="cyan")
-        table.add_column("Price (₹)", justify="center", style="green")
-        for item, price in data["menu"].items():
-            table.add_row(item.capitalize(), f"{price:.2f}")
-        console.print(table)
+        console.print(self.menu_snapshot().table)
+        levels = self.stock.levels()
+        if levels:
+            console.print("[bold yellow]Limited today: " + ", ".join(
+                f"{item} ({count} left)" if count > 0 else f"{item} (sold out)"
+                for item, count in sorted(levels.items())) + "[/bold yellow]")
 
+    @recorded("menu")
     def edit_menu(self):
         while True:
             console.print("\n[bold magenta]=== Edit Menu ===[/bold magenta]")
             console.print("[yellow]1.[/yellow] Add Item")
             console.print("[yellow]2.[/yellow] Remove Item")
             console.print("[yellow]3.[/yellow] View Menu")
-            console.print("[yellow]4.[/yellow] Back to Manager Menu")
+            console.print("[yellow]4.[/yellow] Set Availability")
+            console.print("[yellow]5.[/yellow] Back to Manager Menu")
 
             choice = input("\nSelect an option: ").strip()
-            data = read_json()
+            data = read_json(self.restaurant_id, self.storage)
             
             if choice == "1":
                 new_item = input("Enter the name of the new item: ").strip().lower()
@@ -32,8 +141,9 @@ class RestaurantManager:
                     new_price = float(new_price)
                     if new_item and new_item not in data["menu"]:
                         data["menu"][new_item] = new_price
-                        write_json(data)
-                        console.print(f"[bold green]{new_item.capitalize()} added to the menu with price ₹{new_price:.2f}.[/bold green]")
+                        apply_ledger(data, self.restaurant_id, self.storage)
+                        if self.save_menu(data):
+                            console.print(f"[bold green]{new_item.capitalize()} added to the menu with price ₹{new_price:.2f}.[/bold green]")
                     else:
                         console.print("[bold red]Invalid item or item already exists.[/bold red]")
                 except ValueError:
@@ -42,29 +152,77 @@ class RestaurantManager:
                 remove_item = input("Enter the name of the item to remove: ").strip().lower()
                 if remove_item in data["menu"]:
                     del data["menu"][remove_item]
-                    write_json(data)
-                    console.print(f"[bold green]{remove_item.capitalize()} removed from the menu.[/bold green]")
+                    apply_ledger(data, self.restaurant_id, self.storage)
+                    if self.save_menu(data):
+                        self.stock.set_count(remove_item, None)
+                        console.print(f"[bold green]{remove_item.capitalize()} removed from the menu.[/bold green]")
                 else:
                     console.print("[bold red]Item not found in the menu.[/bold red]")
             elif choice == "3":
                 self.view_menu()
             elif choice == "4":
+                self.set_availability(data)
+            elif choice == "5":
                 break
             else:
                 console.print("[bold red]Invalid option. Please try again.[/bold red]")
 
-    def view_orders(self):
-        data = read_json()
-        if not data["orders"]:
+    def set_availability(self, data):
+        item = input("Enter the name of the item: ").strip().lower()
+        if item not in data["menu"]:
+            console.print("[bold red]Item not found in the menu.[/bold red]")
+            return
+        count = input("Enter portions available (leave blank for unlimited): ").strip()
+        if not count:
+            self.stock.set_count(item, None)
+            console.print(f"[bold green]{item.capitalize()} is now unlimited.[/bold green]")
+        elif count.isdigit():
+            self.stock.set_count(item, int(count))
+            console.print(f"[bold green]{item.capitalize()} limited to {int(count)} portions.[/bold green]")
+        else:
+            console.print("[bold red]Invalid count. Please enter a whole number.[/bold red]")
+
+    def view_orders(self, status=None):
+        data = read_snapshot(self.restaurant_id, self.storage)
+        orders = index_for(data, self.restaurant_id, self.storage).by_status(status) if status else data["orders"]
+        if not orders:
             console.print("[bold red]No orders available.[/bold red]")
             return
 
-        table = Table(title="All Orders")
-        headers = data["orders"][0].keys()
-        for header in headers:
-            table.add_column(header, justify="center", style="cyan")
+        console.print(orders_table(orders, f"{status} Orders" if status else "All Orders"))
+
+    def filter_orders(self):
+        status = input("Enter status (Pending / Picked Up / Out for Delivery / Delivered / Completed): ").strip()
+        self.view_orders(' '.join(word.capitalize() for word in status.split()))
 
-        for order in data["orders"]:
-            table.add_row(*map(str, order.values()))
+    def search_orders(self):
+        """Newest orders whose customer and items match every word typed, the last one as a prefix"""
+        query = input("Search by customer or item: ").strip()
+        self.search.sync(read_snapshot(self.restaurant_id, self.storage)["orders"])
+        matches = self.search.search(query)
+        if not matches:
+            console.print("[bold red]No matching orders.[/bold red]")
+            return
+        console.print(orders_table(matches, f"Orders matching '{query}'"))
 
-        console.print(table)
+    def view_ratings(self):
+        """Item and agent ratings from the running aggregates, with the latest comments"""
+        summary = self.feedback.summary()
+        if not summary["recent"]:
+            console.print("[bold yellow]No ratings yet.[/bold yellow]")
+            return
+        tables = [("Food Ratings", "Item", summary["items"]), ("Delivery Ratings", "Agent", summary["agents"])]
+        for title, subject, aggregates in tables:
+            if not aggregates:
+                continue
+            table = make_table(title)
+            for header in (subject, "Ratings", "Average", f"Last {self.feedback.window}",
+                           " ".join(f"{stars}★" for stars in STARS)):
+                table.add_column(header, justify="center", style="cyan")
+            for name, aggregate in sorted(aggregates.items(), key=lambda entry: -entry[1].mean):
+                table.add_row(name.capitalize(), str(aggregate.count), f"{aggregate.mean:.2f}",
+                              f"{aggregate.recent_mean:.2f}", " ".join(map(str, aggregate.histogram)))
+            console.print(table)
+        console.print(orders_table([dict(feedback, delivery=feedback["delivery"] or "-")
+                                    for feedback in reversed(summary["recent"])], "Latest Feedback",
+                                   ["order_id", "customer", "food", "delivery", "comment", "time"]))
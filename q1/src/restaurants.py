@@ -0,0 +1,59 @@
+import copy
+import os
+import re
+from output import console
+from utils import DEFAULT_DATA, DEFAULT_RESTAURANT, data_file, storage_or_default, write_json
+
+
+VALID_ID = re.compile(r"^[a-z0-9][a-z0-9_-]*$")
+
+def list_restaurants(storage=None):
+    """Ids of all onboarded restaurants, the default restaurant first"""
+    names = storage_or_default(storage).listdir(os.path.dirname(data_file("_")))
+    return [DEFAULT_RESTAURANT] + sorted(
+        name[:-len(".json")] for name in names if name.endswith(".json"))
+
+def onboard_restaurant(restaurant_id, storage=None):
+    """Create a restaurant with its own data file; returns False if invalid or taken"""
+    if not VALID_ID.match(restaurant_id) or restaurant_id in list_restaurants(storage):
+        return False
+    data = copy.deepcopy(DEFAULT_DATA)
+    return write_json(data, restaurant_id, storage=storage)
+
+def select_restaurant(storage=None):
+    """Ask which restaurant to use; skips the prompt when there is only one"""
+    restaurants = list_restaurants(storage)
+    if len(restaurants) == 1:
+        return restaurants[0]
+    console.print("\n[bold white]Restaurants:[/bold white]")
+    for number, restaurant_id in enumerate(restaurants, 1):
+        console.print(f"[yellow]{number}.[/yellow] {restaurant_id.capitalize()}")
+    choice = input("\nSelect a restaurant: ").strip().lower()
+    if choice.isdigit() and 1 <= int(choice) <= len(restaurants):
+        return restaurants[int(choice) - 1]
+    if choice in restaurants:
+        return choice
+    console.print("[bold red]Invalid restaurant.[/bold red]")
+    return None
+
+def admin_menu(storage=None):
+    while True:
+        console.print("\n[bold magenta]=== Admin Menu ===[/bold magenta]")
+        console.print("[yellow]1.[/yellow] Onboard Restaurant")
+        console.print("[yellow]2.[/yellow] List Restaurants")
+        console.print("[yellow]3.[/yellow] Back to Main Menu")
+
+        choice = input("\nSelect an option: ").strip()
+        if choice == "1":
+            restaurant_id = input("Enter a short id for the restaurant (letters, digits, - or _): ").strip().lower()
+            if onboard_restaurant(restaurant_id, storage):
+                console.print(f"[bold green]Restaurant '{restaurant_id}' onboarded with the default menu.[/bold green]")
+            else:
+                console.print("[bold red]Invalid id or restaurant already exists.[/bold red]")
+        elif choice == "2":
+            for restaurant_id in list_restaurants(storage):
+                console.print(f"- {restaurant_id}")
+        elif choice == "3":
+            break
+        else:
+            console.print("[bold red]Invalid option. Please try again.[/bold red]")
@@ -0,0 +1,295 @@
+import argparse
+import difflib
+import re
+import statistics
+import sys
+import time
+from bisect import bisect_left
+from heapq import merge
+from itertools import chain, islice
+
+WORD = re.compile(r"[a-z0-9]+")
+SEARCH_LIMIT = 50  # matches returned per query, newest first
+FUZZY_CUTOFF = 0.75  # how close a misspelling must be to count as a match (0-1)
+BLOCK_SIZE = 1 << 14  # positions covered by one block of bitmaps
+DENSE = 64  # postings a word needs within a block before the block keeps a bitmap of it
+MAX_PREFIX_CHECKS = 8  # beyond this many completions, a match's own words are checked against the prefix
+PREFIX_DEPTH = 2  # prefixes up to this long keep their own posting list; they complete to the most words
+PREFIX_KEY = "^"  # marks a prefix among the words of a block; never matched by WORD
+END = ""  # key marking the end of a word in a trie node; never a single character
+
+def words(text):
+    return WORD.findall(text.lower())
+
+def bitmap(positions, start):
+    """Int with bit n set for each position start + n; positions lie within one block"""
+    if len(positions) < DENSE:
+        found = 0
+        for position in positions:
+            found |= 1 << position - start
+        return found
+    digits = bytearray(b"0") * BLOCK_SIZE  # most significant bit first; parsed in one go
+    last = start + BLOCK_SIZE - 1
+    one = ord("1")
+    for position in positions:
+        digits[last - position] = one
+    return int(digits, 2)
+
+class PrefixTrie:
+    """Words stored one character per level, so completing a prefix only visits matching words"""
+
+    def __init__(self, words=()):
+        self.root = {}
+        self.size = 0
+        for word in words:
+            self.insert(word)
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, word):
+        node = self._find(word)
+        return node is not None and END in node
+
+    def _find(self, prefix):
+        node = self.root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return None
+        return node
+
+    def insert(self, word):
+        node = self.root
+        for char in word:
+            node = node.setdefault(char, {})
+        if END not in node:
+            node[END] = word
+            self.size += 1
+
+    def complete(self, prefix, limit=None):
+        """Words starting with prefix, shortest first"""
+        node = self._find(prefix)
+        if node is None:
+            return []
+        found = []
+        level = [node]
+        while level and (limit is None or len(found) < limit):
+            found.extend(node[END] for node in level if END in node)
+            level = [child for node in level for char, child in node.items() if char != END]
+        return found[:limit]
+
+    def match(self, word, cutoff=FUZZY_CUTOFF):
+        """The word meant by a possibly short or misspelt one: itself, its only completion,
+        or the closest spelling; None if nothing is close enough"""
+        if word in self:
+            return word
+        completions = self.complete(word, limit=2)
+        if len(completions) == 1:
+            return completions[0]
+        close = difflib.get_close_matches(word, self.complete(""), n=1, cutoff=cutoff)
+        return close[0] if close else None
+
+class SearchIndex:
+    """Inverted index and prefix trie over the customer names and items of orders.
+
+    Postings hold positions in the order list. That list only grows, so each
+    posting list stays sorted and the newest matches are at its end. sync()
+    indexes just the orders appended since the last call. Prefixes of up to
+    PREFIX_DEPTH characters would complete to too many words to merge, so each
+    of them keeps a posting list of its own.
+
+    A query of a single (prefix) word merges the lists of its completions
+    newest first and stops at the limit. Several words are matched a block of
+    BLOCK_SIZE positions at a time, newest block first: the words of a block
+    are ANDed as int bitmaps, so words that rarely occur together cost a few
+    bitwise operations per block rather than a walk of their posting lists.
+    A full block keeps the bitmap of each word with at least DENSE postings
+    in it, built once when the block fills up; the block still being filled
+    builds them as queries need them and extends them with later postings.
+    A word rarer than that in a block is matched by its handful of positions.
+    """
+
+    def __init__(self):
+        self.orders = ()
+        self.postings = {}  # word -> positions of orders containing it
+        self.prefixes = {}  # short prefix -> positions of orders with a word starting with it
+        self.blocks = []  # per full block: word or PREFIX_KEY + prefix -> bitmap, for those dense in it
+        self.open_bitmaps = {}  # bitmaps of dense words in the block being filled: key -> (bitmap, postings in it)
+        self.trie = PrefixTrie()
+        self.last_id = None
+
+    def __len__(self):
+        return len(self.orders)
+
+    @staticmethod
+    def order_words(order):
+        return set(words(order["customer"])).union(*(words(item) for item in order["items"]))
+
+    def add(self, order, position):
+        if position and position % BLOCK_SIZE == 0:
+            self._seal()
+        for word in self.order_words(order):
+            posting = self.postings.get(word)
+            if posting is None:
+                posting = self.postings[word] = []
+                self.trie.insert(word)
+            posting.append(position)
+            for length in range(1, min(len(word), PREFIX_DEPTH) + 1):
+                posting = self.prefixes.setdefault(word[:length], [])
+                if not posting or posting[-1] != position:
+                    posting.append(position)
+
+    def _seal(self):
+        """Keep the bitmaps of the words dense in the block just filled"""
+        start = len(self.blocks) * BLOCK_SIZE
+        keyed = chain(self.postings.items(),
+                      ((PREFIX_KEY + prefix, posting) for prefix, posting in self.prefixes.items()))
+        self.blocks.append({key: bitmap(posting[bisect_left(posting, start):], start)
+                            for key, posting in keyed if len(posting) >= DENSE and posting[-DENSE] >= start})
+        self.open_bitmaps = {}
+
+    def sync(self, orders):
+        """Index orders appended since the last sync; start over if the list was replaced by another history"""
+        indexed = len(self.orders)
+        if len(orders) < indexed or (indexed and orders[indexed - 1]["id"] != self.last_id):
+            self.__init__()
+            indexed = 0
+        for position, order in enumerate(islice(orders, indexed, None), indexed):
+            self.add(order, position)
+        self.orders = orders
+        if orders:
+            self.last_id = orders[-1]["id"]
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """Orders whose customer and items contain every word of query, the last word as a prefix"""
+        query_words = words(query)
+        if not query_words:
+            return []
+        *exact, prefix = query_words
+        if len(prefix) <= PREFIX_DEPTH:
+            prefix_terms = [(PREFIX_KEY + prefix, self.prefixes.get(prefix, []))]
+        else:
+            prefix_terms = [(word, self.postings[word]) for word in self.trie.complete(prefix)]
+        exact_terms = sorted(((word, self.postings.get(word, [])) for word in set(exact)),
+                             key=lambda term: len(term[1]))
+        if not all(posting for _, posting in exact_terms) or not any(posting for _, posting in prefix_terms):
+            return []
+        if not exact_terms:
+            return self._newest(prefix_terms, limit)
+
+        check_words = len(prefix_terms) > MAX_PREFIX_CHECKS
+        matches = []
+        for block in range(len(self.blocks), -1, -1):
+            found = self._block_matches(block, exact_terms, () if check_words else prefix_terms)
+            start = block * BLOCK_SIZE
+            while found:
+                offset = found.bit_length() - 1
+                found ^= 1 << offset
+                order = self.orders[start + offset]
+                if check_words and not any(word.startswith(prefix) for word in self.order_words(order)):
+                    continue
+                matches.append(order)
+                if len(matches) == limit:
+                    return matches
+        return matches
+
+    def _newest(self, terms, limit):
+        """Orders in any of the posting lists of terms, newest first"""
+        matches = []
+        previous = None
+        for position in merge(*(reversed(posting) for _, posting in terms), reverse=True):
+            if position != previous:  # in the lists of two words sharing the prefix
+                matches.append(self.orders[position])
+                if len(matches) == limit:
+                    break
+            previous = position
+        return matches
+
+    def _in_block(self, block, key, posting):
+        """(bitmap, None) if key is dense in block, else (None, its positions in block)"""
+        start = block * BLOCK_SIZE
+        low = bisect_left(posting, start)
+        if block < len(self.blocks):
+            kept = self.blocks[block].get(key)
+            if kept is not None:
+                return kept, None
+            return None, posting[low:bisect_left(posting, start + BLOCK_SIZE, low)]
+        count = len(posting) - low
+        if count < DENSE:
+            return None, posting[low:]
+        kept, covered = self.open_bitmaps.get(key, (0, 0))
+        if covered < count:
+            kept |= bitmap(posting[low + covered:], start)
+            self.open_bitmaps[key] = (kept, count)
+        return kept, None
+
+    def _block_matches(self, block, exact_terms, prefix_terms):
+        """Bitmap of the orders in block holding every exact word and some prefix word.
+
+        The bitmaps of dense words are combined; when a word is sparse in the
+        block, the positions of the rarest one are checked one by one instead.
+        """
+        start = block * BLOCK_SIZE
+        found = -1
+        sparse = []
+        for key, posting in exact_terms:
+            kept, positions = self._in_block(block, key, posting)
+            if kept is None:
+                if not positions:
+                    return 0
+                sparse.append(positions)
+            else:
+                found &= kept
+                if not found:
+                    return 0
+        any_prefix = 0 if prefix_terms else -1
+        prefixed = []
+        for key, posting in prefix_terms:
+            kept, positions = self._in_block(block, key, posting)
+            if kept is None:
+                prefixed.extend(positions)
+            else:
+                any_prefix |= kept
+        if not sparse:
+            return found & (any_prefix | bitmap(prefixed, start))
+        rarest, *others = sorted(sparse, key=len)
+        others = [set(positions) for positions in others]
+        prefixed = set(prefixed)
+        return bitmap([position for position in rarest
+                       if found >> position - start & 1 and all(position in positions for positions in others)
+                       and (any_prefix >> position - start & 1 or position in prefixed)], start)
+
+def benchmark(orders=1_000_000, queries=200):
+    """Median and worst search time in ms over a synthetic order history"""
+    first = ["aarav", "aditi", "alice", "arjun", "bob", "carol", "chen", "dave", "divya", "emma", "farah", "gopal",
+             "hana", "ishaan", "jaya", "karan", "lena", "meera", "nikhil", "omar", "priya", "quinn", "rahul",
+             "sara", "tanvi", "uma", "vikram", "wei", "yusuf", "zara"]
+    last = ["sharma", "patel", "iyer", "khan", "das", "reddy", "singh", "nair", "smith", "garcia", "wong", "mehta"]
+    customers = [f"{a} {b}" for a in first for b in last]
+    items = ["burger", "pizza", "pasta", "salad", "coke", "water", "fries", "chicken wings", "ice cream", "coffee"]
+    history = [{"id": 1000 + n, "customer": customers[(n * 31) % len(customers)],
+                "items": [items[n % len(items)], items[(n * 7) % len(items)]]} for n in range(orders)]
+    index = SearchIndex()
+    started = time.perf_counter()
+    index.sync(history)
+    built = time.perf_counter() - started
+    samples = ["pizza", "chicken w", "priya", "arjun sharma", "patel coffee", "ice", "c", "wei wong pa", "wei wong",
+               "nothing here", "alice smith salad", "bob burger", "sharma p"]
+    timings = []
+    for n in range(queries):
+        started = time.perf_counter()
+        index.search(samples[n % len(samples)])
+        timings.append((time.perf_counter() - started) * 1000)
+    return built, statistics.median(timings), max(timings)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure order search latency over a synthetic history.")
+    parser.add_argument("-n", "--orders", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+    built, median, worst = benchmark(args.orders)
+    print(f"indexed {args.orders} orders in {built:.1f} s; query median {median:.3f} ms, worst {worst:.3f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+import threading
+import weakref
+from utils import read_json, data_version, storage_or_default
+
+class FrozenDict(dict):
+    """A dict that refuses changes; snapshot records are shared between readers"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("snapshot data is read-only")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+def freeze(value):
+    """Read-only copy of parsed JSON: dicts become FrozenDicts, lists tuples"""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+class SnapshotStore:
+    """Immutable, versioned views of each restaurant's data file.
+
+    Writers replace the data file atomically (see utils.write_json), so a new
+    file version is published in one step and a reader never sees a partly
+    written file. The first read of a version parses and freezes it once;
+    every later read of the same version returns that same snapshot without
+    locking or re-reading, and an index built over it stays valid. Only the
+    newest version is kept here; older versions live on in weak references
+    until the last reader holding one lets go.
+    """
+
+    def __init__(self):
+        self.current = {}  # (storage, restaurant id) -> (version, snapshot)
+        self.versions = weakref.WeakValueDictionary()  # (storage, restaurant id, version) -> snapshot
+        self._lock = threading.Lock()
+
+    def read(self, restaurant_id=None, storage=None):
+        key = (storage_or_default(storage), restaurant_id)
+        version = data_version(restaurant_id, storage)
+        with self._lock:
+            cached = self.current.get(key)
+            if cached and version is not None and cached[0] == version:
+                return cached[1]
+        snapshot = freeze(read_json(restaurant_id, storage))
+        with self._lock:
+            self.current[key] = (version, snapshot)
+            self.versions[key + (version,)] = snapshot
+        return snapshot
+
+    def live_versions(self, restaurant_id=None, storage=None):
+        """Versions still held by the store or by some reader"""
+        key = (storage_or_default(storage), restaurant_id)
+        return {version for (*owner, version) in list(self.versions.keys()) if tuple(owner) == key}
+
+_store = SnapshotStore()
+
+def read_snapshot(restaurant_id=None, storage=None):
+    """Read-only view of the current data; never mutate or write it back"""
+    return _store.read(restaurant_id, storage)
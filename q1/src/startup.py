@@ -0,0 +1,40 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC = os.path.dirname(os.path.abspath(__file__))
+STARTUP_BUDGET_SECONDS = 0.5  # start the CLI in plain mode and exit from the main menu
+
+def measure_startup(runs=5, plain=True):
+    """Best wall time over runs of launching main.py and exiting at once"""
+    command = [sys.executable, os.path.join(SRC, "main.py")] + (["--plain"] if plain else [])
+    best = None
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(runs):
+            started = time.perf_counter()
+            subprocess.run(command, input="5\n", cwd=workdir, capture_output=True, text=True, check=True)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def imported_modules(module="main"):
+    """Top-level packages loaded by importing a module, in a fresh interpreter"""
+    code = f"import sys; import {module}; print(' '.join(sorted({{name.split('.')[0] for name in sys.modules}})))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=SRC, capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure q1 CLI start-up time against its budget.")
+    parser.add_argument("-r", "--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+    plain = measure_startup(args.runs)
+    rich = measure_startup(args.runs, plain=False)
+    print(f"plain start-up: {plain * 1000:.1f} ms (budget {STARTUP_BUDGET_SECONDS * 1000:.0f} ms)")
+    print(f"rich start-up:  {rich * 1000:.1f} ms")
+    return 0 if plain <= STARTUP_BUDGET_SECONDS else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
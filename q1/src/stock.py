@@ -0,0 +1,74 @@
+from collections import Counter
+from utils import locked_update, read_locked, sidecar_path
+
+class StockLedger:
+    """Portions left per menu item, e.g. for today's service.
+
+    Counts live in a small sidecar file (data.json.stock) and every change is
+    one locked update of that file alone, so concurrent sessions and processes
+    can reserve items without locking the data file. Items without a count
+    are unlimited.
+    """
+
+    def __init__(self, restaurant_id=None, path=None, storage=None):
+        self.restaurant_id = restaurant_id
+        self._path = path
+        self.storage = storage
+
+    @property
+    def path(self):
+        return self._path or sidecar_path("stock", self.restaurant_id)
+
+    def levels(self):
+        """Current counts of the limited items"""
+        return read_locked(self.path, {}, self.storage)
+
+    def set_count(self, item, count):
+        """Limit an item to count portions; None makes it unlimited again"""
+        def update(levels):
+            levels = levels or {}
+            if count is None:
+                levels.pop(item, None)
+            else:
+                levels[item] = count
+            return levels, None
+
+        locked_update(self.path, update, {}, self.storage)
+
+    def reserve(self, lines):
+        """Take portions for a whole cart of OrderLines, or none at all.
+
+        Returns the shortages as {item: portions left}; empty means the cart
+        was reserved. If any line cannot be served, nothing is taken.
+        """
+        wanted = Counter()
+        for line in lines:
+            wanted[line.item] += line.quantity
+        if not wanted.keys() & self.levels().keys():
+            return {}  # only unlimited items; no need to take the lock
+
+        def update(levels):
+            levels = levels or {}
+            shortages = {item: levels[item] for item, quantity in wanted.items()
+                         if item in levels and levels[item] < quantity}
+            if not shortages:
+                for item, quantity in wanted.items():
+                    if item in levels:
+                        levels[item] -= quantity
+            return levels, shortages
+
+        return locked_update(self.path, update, {}, self.storage)
+
+    def release(self, lines):
+        """Give back portions reserved for lines, e.g. when the order is not placed"""
+        if not {line.item for line in lines} & self.levels().keys():
+            return
+
+        def update(levels):
+            levels = levels or {}
+            for line in lines:
+                if line.item in levels:
+                    levels[line.item] += line.quantity
+            return levels, None
+
+        locked_update(self.path, update, {}, self.storage)
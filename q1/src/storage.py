@@ -0,0 +1,187 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+from recovery import journal_for
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive lock on a lock file for the duration of the block"""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)  # closing the descriptor releases the lock
+
+class FileStorage:
+    """JSON documents kept as files, named by their path under directory.
+
+    The default directory "" leaves names as given, so data.json lives in the
+    working directory. Documents are replaced atomically and journaled (see
+    save), and small sidecars are updated under an exclusive file lock, so
+    several processes can share one directory.
+    """
+
+    def __init__(self, directory=""):
+        self.directory = directory
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def exists(self, name):
+        return os.path.exists(self.path(name))
+
+    def load(self, name):
+        with open(self.path(name), 'r') as f:
+            return json.load(f)
+
+    def save(self, name, data, expected_version=None):
+        """Write data to a temporary file that then atomically replaces the document.
+
+        Readers see either the old or the new version, never a partial one.
+        With expected_version, nothing is written if the document has changed
+        since; returns whether the data was written.
+        """
+        path = self.path(name)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            try:
+                f = open(temp_path, 'w')
+            except FileNotFoundError:  # first document in a new directory
+                os.makedirs(os.path.dirname(path))
+                f = open(temp_path, 'w')
+            with f:
+                json.dump(data, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            with file_lock(f"{path}.lock"):
+                version_before = self.version(name)
+                if expected_version is not None and version_before != expected_version:
+                    os.remove(temp_path)
+                    return False
+                os.replace(temp_path, path)
+                journal_for(path).record(data, version_before, self.version(name))
+            return True
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def version(self, name):
+        """Cheap change marker: (inode, mtime_ns, size), or None if missing"""
+        try:
+            stat = os.stat(self.path(name))
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def read(self, name, default=None, locked=False):
+        """Contents of a small document, or default if it is missing or unreadable.
+
+        locked takes a shared lock, so a document written with update() is
+        never read halfway through being rewritten.
+        """
+        try:
+            with open(self.path(name)) as f:
+                if locked and fcntl:
+                    fcntl.flock(f, fcntl.LOCK_SH)
+                return json.load(f)
+        except (OSError, ValueError):
+            return default
+
+    def update(self, name, update, default=None):
+        """Read-modify-write a small document under an exclusive lock.
+
+        update(state) receives the current contents (default if the document
+        is new) and returns (new_state, result); result is returned to the caller.
+        """
+        fd = os.open(self.path(name), os.O_RDWR | os.O_CREAT, 0o644)
+        with os.fdopen(fd, "r+") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                raw = f.read()
+                state = json.loads(raw) if raw.strip() else default
+                state, result = update(state)
+                f.seek(0)
+                f.truncate()
+                json.dump(state, f)
+                f.flush()
+                os.fsync(f.fileno())
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+        return result
+
+    def listdir(self, directory):
+        try:
+            return os.listdir(self.path(directory))
+        except OSError:
+            return []
+
+    def recover(self, name):
+        """The document rebuilt from its checkpoint and change log, or None"""
+        return journal_for(self.path(name)).recover()
+
+class MemoryStorage:
+    """JSON documents kept in this process only, for tests and benchmarks.
+
+    Documents are stored as JSON text, so every load returns a fresh copy just
+    like reading a file. Nothing touches the disk, so separate instances (and
+    separate test processes) never share state. Versions come from one counter
+    and never repeat.
+    """
+
+    def __init__(self):
+        self.documents = {}  # name -> (version, JSON text)
+        self._clock = 0
+        self._lock = threading.RLock()
+
+    def exists(self, name):
+        return name in self.documents
+
+    def load(self, name):
+        try:
+            return json.loads(self.documents[name][1])
+        except KeyError:
+            raise FileNotFoundError(name) from None
+
+    def save(self, name, data, expected_version=None):
+        text = json.dumps(data)
+        with self._lock:
+            if expected_version is not None and self.version(name) != expected_version:
+                return False
+            self._clock += 1
+            self.documents[name] = (self._clock, text)
+        return True
+
+    def version(self, name):
+        document = self.documents.get(name)
+        return document and document[0]
+
+    def read(self, name, default=None, locked=False):
+        try:
+            return self.load(name)
+        except FileNotFoundError:
+            return default
+
+    def update(self, name, update, default=None):
+        with self._lock:
+            state, result = update(self.read(name, default))
+            self.save(name, state)
+        return result
+
+    def listdir(self, directory):
+        return [os.path.basename(name) for name in list(self.documents) if os.path.dirname(name) == directory]
+
+    def recover(self, name):
+        return None
@@ -0,0 +1,96 @@
+import heapq
+import threading
+from datetime import datetime, timedelta
+from functools import lru_cache
+from query import TIME_FORMAT, FINAL_STATUSES
+
+TICK_SECONDS = 1
+
+@lru_cache(maxsize=4096)
+def parse_order_time(order_time):
+    """datetime for an order_time string; parsed once per distinct string"""
+    return datetime.strptime(order_time, TIME_FORMAT)
+
+def deadline_of(order):
+    return parse_order_time(order["order_time"]) + timedelta(minutes=order["expected_delivery_time"])
+
+class DeadlineSweeper:
+    """Flags delivery orders that pass their expected delivery time.
+
+    Deadlines live in a min-heap, so a tick only peeks at the earliest deadline
+    (O(1) when nothing is due) and each breach is popped exactly once. Stale heap
+    entries left by cancel() or rescheduling are skipped when they surface.
+    Listeners receive the breached order id and its deadline.
+    """
+
+    def __init__(self, tick_seconds=TICK_SECONDS):
+        self.tick_seconds = tick_seconds
+        self.late = set()
+        self.listeners = []
+        self._heap = []
+        self._deadlines = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def schedule(self, order):
+        if order["type"] != "Delivery" or order["status"] in FINAL_STATUSES:
+            return
+        deadline = deadline_of(order)
+        with self._lock:
+            if self._deadlines.get(order["id"]) == deadline:
+                return
+            self._deadlines[order["id"]] = deadline
+            heapq.heappush(self._heap, (deadline, order["id"]))
+
+    def cancel(self, order_id):
+        with self._lock:
+            self._deadlines.pop(order_id, None)
+            self.late.discard(order_id)
+
+    def sync(self, orders):
+        """Track every in-flight delivery order and drop finished ones"""
+        for order in orders:
+            if order["status"] in FINAL_STATUSES:
+                if order["id"] in self._deadlines:
+                    self.cancel(order["id"])
+            else:
+                self.schedule(order)
+
+    def tick(self, now=None):
+        now = now or datetime.now()
+        breaches = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                deadline, order_id = heapq.heappop(self._heap)
+                if self._deadlines.get(order_id) != deadline or order_id in self.late:
+                    continue
+                self.late.add(order_id)
+                breaches.append((order_id, deadline))
+        for order_id, deadline in breaches:
+            for listener in self.listeners:
+                listener(order_id, deadline)
+        return breaches
+
+    def start(self):
+        if self._thread:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="deadline-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.tick_seconds):
+            self.tick()
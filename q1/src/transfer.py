@@ -0,0 +1,254 @@
+import argparse
+import copy
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from itertools import islice
+from migrations import migrate_order
+from query import AWAITING_PAYMENT, FINAL_STATUSES, ORDER_STATUSES, TIME_FORMAT
+from restaurant import RestaurantManager
+from utils import (DEFAULT_DATA, data_file, data_version, locked_update, read_json, save_if_unchanged, sidecar_path,
+                   write_json)
+
+FORMATS = ("csv", "jsonl")
+BATCH_SIZE = 250_000  # imported orders per write of the data file; each write rewrites the whole file
+MAX_ATTEMPTS = 10  # writes of one batch tried while other processes keep writing first
+ORDER_COLUMNS = ["id", "customer", "type", "status", "items", "lines", "subtotal", "tax", "delivery_fee",
+                 "total_price", "delivery_agent", "order_time", "expected_delivery_time", "payment", "feedback"]
+TEXT_COLUMNS = {"customer", "type", "status", "delivery_agent", "order_time", "item", "agent"}  # other CSV cells hold JSON
+COLUMNS = {"orders": ORDER_COLUMNS, "menu": ["item", "price"], "agents": ["agent"]}
+REQUIRED = {"orders": ("id", "customer", "type", "status", "items", "delivery_agent"), "menu": ("item", "price"),
+            "agents": ("agent",)}
+ORDER_TYPES = ("Delivery", "Takeaway")
+SPELLINGS = {status.lower(): status for status in ORDER_STATUSES}  # imported status, any case -> stored spelling
+
+def format_for(path, fmt=None):
+    """Format named explicitly or by the file extension"""
+    fmt = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}'; use one of {', '.join(FORMATS)}")
+    return fmt
+
+def records(kind, data, since=None, until=None, status=None):
+    """Records of one kind from the data, one at a time.
+
+    Orders can be limited to a status and to order times in [since, until);
+    orders without an order time (takeaway) are left out when a time range is given.
+    """
+    if kind == "menu":
+        yield from ({"item": item, "price": price} for item, price in data["menu"].items())
+    elif kind == "agents":
+        yield from ({"agent": agent} for agent in data["delivery_agents"])
+    else:
+        # TIME_FORMAT strings sort like the times they stand for, so no parsing is needed
+        since = since and since.strftime(TIME_FORMAT)
+        until = until and until.strftime(TIME_FORMAT)
+        for order in data["orders"]:
+            if status and order["status"] != status:
+                continue
+            if since or until:
+                order_time = order.get("order_time")
+                if not order_time or (since and order_time < since) or (until and order_time >= until):
+                    continue
+            yield order
+
+def write_records(out, rows, kind, fmt):
+    """Write rows to a text stream as they come; returns how many"""
+    count = 0
+    if fmt == "jsonl":
+        for count, row in enumerate(rows, 1):
+            out.write(json.dumps(row, separators=(",", ":"), ensure_ascii=False) + "\n")
+        return count
+    writer = csv.writer(out)
+    writer.writerow(COLUMNS[kind])
+    for count, row in enumerate(rows, 1):
+        writer.writerow([encode_cell(column, row.get(column)) for column in COLUMNS[kind]])
+    return count
+
+def encode_cell(column, value):
+    if value is None:
+        return ""
+    if column in TEXT_COLUMNS:
+        return value
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+def check_order(row):
+    """Raise ValueError unless an imported order has what the managers read; respells its status as stored"""
+    if type(row["id"]) is not int:
+        raise ValueError(f"id {row['id']!r} is not a whole number")
+    status = SPELLINGS.get(row["status"].lower()) if isinstance(row["status"], str) else None
+    if status is None:
+        raise ValueError(f"unknown status {row['status']!r}")
+    row["status"] = status
+    if row["type"] not in ORDER_TYPES:
+        raise ValueError(f"type must be one of {', '.join(ORDER_TYPES)}")
+    if not isinstance(row["customer"], str) or not isinstance(row["delivery_agent"], str):
+        raise ValueError("customer and delivery_agent must be text")
+    if not isinstance(row["items"], list):
+        raise ValueError("items must be a list")
+    if status == AWAITING_PAYMENT and ("payment" not in row or "total_price" not in row):
+        raise ValueError("an order awaiting payment needs its payment and total_price")
+    if row["type"] == "Delivery" and status not in FINAL_STATUSES:
+        # Open deliveries are tracked against their deadline from the moment they are loaded
+        try:
+            datetime.strptime(row.get("order_time") or "", TIME_FORMAT)
+        except (TypeError, ValueError):
+            raise ValueError("an open delivery needs an order_time like 2025-03-01 12:00:00") from None
+        if not isinstance(row.get("expected_delivery_time"), (int, float)):
+            raise ValueError("an open delivery needs its expected_delivery_time in minutes")
+
+def read_records(source, kind, fmt):
+    """Records parsed from a text stream one line at a time; ValueError names the bad line"""
+    if fmt == "jsonl":
+        rows = ((number, json.loads(line)) for number, line in enumerate(source, 1) if line.strip())
+    else:
+        rows = ((number, {column: cell if column in TEXT_COLUMNS else json.loads(cell)
+                          for column, cell in row.items() if cell != "" and column in COLUMNS[kind]})
+                for number, row in enumerate(csv.DictReader(source), 2))
+    try:
+        for number, row in rows:
+            missing = [field for field in REQUIRED[kind] if field not in row]
+            if missing:
+                raise ValueError(f"line {number}: missing {', '.join(missing)}")
+            if kind == "orders":
+                try:
+                    check_order(row)
+                except ValueError as e:
+                    raise ValueError(f"line {number}: {e}") from None
+            yield row
+    except json.JSONDecodeError as e:
+        raise ValueError(f"invalid JSON: {e}") from None
+
+def export_records(kind, out, fmt="jsonl", restaurant_id=None, since=None, until=None, status=None, storage=None):
+    """Stream one kind of record from the current data to out; returns how many were written"""
+    data = read_json(restaurant_id, storage)  # read once and not kept, unlike a frozen snapshot
+    return write_records(out, records(kind, data, since, until, status), kind, fmt)
+
+def import_records(kind, source, fmt="jsonl", restaurant_id=None, batch_size=BATCH_SIZE, storage=None):
+    """Load records from source into the data file; returns (imported, skipped).
+
+    Orders are appended batch_size at a time with one write of the data file
+    per batch, so a failed import keeps every batch before it. An order whose
+    id is already present is skipped, which makes re-running an import safe.
+    Menu items and agents are merged in a single write.
+    """
+    rows = read_records(source, kind, fmt)
+    if kind != "orders":
+        return _merge(kind, list(rows), restaurant_id, storage)
+    imported = skipped = 0
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return imported, skipped
+        added = _append_orders(batch, restaurant_id, storage)
+        imported += added
+        skipped += len(batch) - added
+
+def _gave_up(restaurant_id):
+    return OSError(f"{data_file(restaurant_id)} kept changing; gave up after {MAX_ATTEMPTS} attempts")
+
+def _append_orders(batch, restaurant_id, storage):
+    """Append one batch with a compare-and-swap write; re-applied if another process wrote first"""
+    for _ in range(MAX_ATTEMPTS):
+        version = data_version(restaurant_id, storage)
+        data = read_json(restaurant_id, storage)
+        known = {order["id"] for order in data["orders"]}
+        new = [migrate_order(order) for order in batch if order["id"] not in known and not known.add(order["id"])]
+        if not new:
+            return 0
+        data["orders"].extend(new)
+        top = max(order["id"] for order in new) + 1
+        data["next_order_id"] = max(data["next_order_id"], top)
+        if save_if_unchanged(data, restaurant_id, version, storage):
+            # Keep ids handed out later clear of the imported ones
+            locked_update(sidecar_path("ids", restaurant_id), lambda high_water: (max(high_water or 0, top), None),
+                          storage=storage)
+            return len(new)
+    raise _gave_up(restaurant_id)
+
+def _merge(kind, rows, restaurant_id, storage):
+    for _ in range(MAX_ATTEMPTS):
+        version = data_version(restaurant_id, storage)
+        data = read_json(restaurant_id, storage)
+        if kind == "menu":
+            changed = {row["item"].strip().lower(): float(row["price"]) for row in rows}
+            changed = {item: price for item, price in changed.items() if data["menu"].get(item) != price}
+            data["menu"].update(changed)
+            # The new menu version is only published once this write wins
+            saved = not changed or RestaurantManager(restaurant_id, storage).save_menu(
+                data, lambda data: save_if_unchanged(data, restaurant_id, version, storage))
+        else:
+            changed = [agent for agent in dict.fromkeys(row["agent"].strip().lower() for row in rows)
+                       if agent not in data["delivery_agents"]]
+            data["delivery_agents"].extend(changed)
+            saved = not changed or save_if_unchanged(data, restaurant_id, version, storage)
+        if saved:
+            return len(changed), len(rows) - len(changed)
+    raise _gave_up(restaurant_id)
+
+def benchmark(orders=1_000_000, batch_size=BATCH_SIZE):
+    """Seconds to export and to import a synthetic order history, in a scratch directory"""
+    history = ({"id": 1001 + n, "customer": f"customer{n % 5000}", "type": "Delivery", "items": ["pizza", "coke"],
+                "lines": [{"item": "pizza", "quantity": 1, "modifiers": []}, {"item": "coke", "quantity": 1, "modifiers": []}],
+                "total_price": 392.5, "status": "Delivered", "delivery_agent": "bob", "expected_delivery_time": 30,
+                "order_time": f"2025-01-{1 + n % 28:02d} 12:00:00"} for n in range(orders))
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            with open("history.jsonl", "w") as f:
+                write_records(f, history, "orders", "jsonl")
+            write_json(copy.deepcopy(DEFAULT_DATA))
+            started = time.perf_counter()
+            with open("history.jsonl") as f:
+                import_records("orders", f, "jsonl", batch_size=batch_size)
+            imported = time.perf_counter() - started
+            started = time.perf_counter()
+            with open("export.csv", "w", newline="") as f:
+                export_records("orders", f, "csv")
+            exported = time.perf_counter() - started
+        finally:
+            os.chdir(cwd)
+    return imported, exported
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export or import orders, menu items or delivery agents as CSV or JSONL.")
+    parser.add_argument("action", choices=["export", "import", "benchmark"])
+    parser.add_argument("kind", nargs="?", choices=sorted(COLUMNS), default="orders")
+    parser.add_argument("path", nargs="?", default="-", help="file to write or read; - for stdout/stdin")
+    parser.add_argument("-f", "--format", choices=FORMATS, help="defaults to the file extension")
+    parser.add_argument("-r", "--restaurant", help="restaurant id; defaults to the main restaurant")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="only orders placed at or after this time")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="only orders placed before this time")
+    parser.add_argument("--status", help="only orders with this status")
+    parser.add_argument("-n", "--orders", type=int, default=1_000_000, help="orders for the benchmark")
+    parser.add_argument("-b", "--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    if args.action == "benchmark":
+        imported, exported = benchmark(args.orders, args.batch_size)
+        print(f"{args.orders} orders imported in {imported:.1f} s, exported in {exported:.1f} s")
+        return 0
+    try:
+        fmt = format_for(args.path, args.format or ("jsonl" if args.path == "-" else None))
+        if args.action == "export":
+            out = sys.stdout if args.path == "-" else open(args.path, "w", newline="", encoding="utf-8")
+            with out:
+                count = export_records(args.kind, out, fmt, args.restaurant, args.since, args.until, args.status)
+            print(f"{args.kind}: {count} exported", file=sys.stderr)
+        else:
+            source = sys.stdin if args.path == "-" else open(args.path, newline="", encoding="utf-8")
+            with source:
+                imported, skipped = import_records(args.kind, source, fmt, args.restaurant, args.batch_size)
+            print(f"{args.kind}: {imported} imported, {skipped} already present", file=sys.stderr)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
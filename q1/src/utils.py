@@ -1,5 +1,7 @@
-import json
+import copy
 import os
+from migrations import SCHEMA_KEY, SCHEMA_VERSION, schedule_write_back, upgrade
+from storage import FileStorage
 
 DEFAULT_DATA = {
     "menu": {
@@ -14,29 +16,125 @@ DEFAULT_DATA = {
         "ice cream": 80.00,
         "coffee": 60.00
     },
+    "modifiers": {
+        "extra cheese": 30.00,
+        "extra toppings": 40.00,
+        "large": 50.00
+    },
     "orders": [],
     "delivery_agents": ["bob"],
-    "next_order_id": 1001
+    "next_order_id": 1001,
+    "menu_version": 0,
+    SCHEMA_KEY: SCHEMA_VERSION
 }
 
 JSON_FILE = "data.json"
+RESTAURANTS_DIR = "restaurants"
+DEFAULT_RESTAURANT = "main"
+STORAGE = FileStorage()  # backend used when a caller does not pass its own
+
+def storage_or_default(storage=None):
+    return STORAGE if storage is None else storage
+
+def data_file(restaurant_id=None):
+    """Data file for a restaurant; the default restaurant keeps JSON_FILE.
+
+    Every other restaurant has its own file under restaurants/ next to
+    JSON_FILE, so its menu, orders and agents never share a file or a lock
+    with another restaurant.
+    """
+    if restaurant_id in (None, DEFAULT_RESTAURANT):
+        return JSON_FILE
+    return os.path.join(os.path.dirname(JSON_FILE), RESTAURANTS_DIR, f"{restaurant_id}.json")
+
+def read_json(restaurant_id=None, storage=None):
+    """Read data from JSON file, create with default data if doesn't exist.
 
-def read_json():
-    """Read data from JSON file, create with default data if doesn't exist"""
+    A missing or unreadable file is first rebuilt from its checkpoint and
+    change log, so acknowledged orders are never replaced by the defaults.
+    Orders written under an older schema are migrated as they are read, and
+    the migrated file is saved in the background (see migrations.WriteBack).
+    """
+    name = data_file(restaurant_id)
     try:
-        if not os.path.exists(JSON_FILE):
-            write_json(DEFAULT_DATA)
-            return DEFAULT_DATA
-        with open(JSON_FILE, 'r') as f:
-            return json.load(f)
+        if not storage_or_default(storage).exists(name):
+            recovered = recover_json(restaurant_id, storage)
+            if recovered is not None:
+                return recovered
+            data = copy.deepcopy(DEFAULT_DATA)  # callers change what they read; never hand out the defaults
+            write_json(data, restaurant_id, storage=storage)
+            return data
+        data = storage_or_default(storage).load(name)
     except Exception as e:
         print(f"Error reading JSON: {e}")
-        return DEFAULT_DATA
+        recovered = recover_json(restaurant_id, storage)
+        return copy.deepcopy(DEFAULT_DATA) if recovered is None else recovered
+    if upgrade(data):
+        schedule_write_back(storage_or_default(storage), name)
+    return data
+
+def recover_json(restaurant_id=None, storage=None):
+    """Rebuild and rewrite the data file from its journal; None if there is nothing to recover"""
+    try:
+        recovered = storage_or_default(storage).recover(data_file(restaurant_id))
+    except Exception:
+        return None
+    if recovered is None:
+        return None
+    upgrade(recovered.data)
+    write_json(recovered.data, restaurant_id, storage=storage)
+    print(f"Recovered {data_file(restaurant_id)} from checkpoint and {recovered.replayed} logged "
+          f"changes in {recovered.seconds * 1000:.1f} ms")
+    return recovered.data
+
+def data_version(restaurant_id=None, storage=None):
+    """Cheap change marker for the JSON file, or None if missing"""
+    return storage_or_default(storage).version(data_file(restaurant_id))
+
+def write_json(data, restaurant_id=None, expected_version=None, storage=None):
+    """Write data to JSON file.
 
-def write_json(data):
-    """Write data to JSON file"""
+    The file is replaced atomically (see FileStorage.save). With
+    expected_version (from data_version() taken before reading), nothing is
+    written if the file has changed since; returns whether the data was written.
+    """
     try:
-        with open(JSON_FILE, 'w') as f:
-            json.dump(data, f, indent=4)
+        return storage_or_default(storage).save(data_file(restaurant_id), data, expected_version)
     except Exception as e:
         print(f"Error writing JSON: {e}")
+        return False
+
+def save_if_unchanged(data, restaurant_id=None, version=None, storage=None):
+    """Write data if the file is still at version; False if another write got there first.
+
+    write_json also returns False when the write itself failed, which shows
+    as a file still at version; that raises OSError instead of being retried.
+    """
+    if write_json(data, restaurant_id, expected_version=version, storage=storage):
+        return True
+    if data_version(restaurant_id, storage) == version:
+        raise OSError(f"could not write {data_file(restaurant_id)}")
+    return False
+
+def sidecar_path(suffix, restaurant_id=None):
+    """Path of a small companion file kept next to the JSON data file"""
+    return f"{data_file(restaurant_id)}.{suffix}"
+
+def read_sidecar(suffix, default=None, restaurant_id=None, storage=None):
+    """Contents of a sidecar file, or default if it is missing or unreadable"""
+    return storage_or_default(storage).read(sidecar_path(suffix, restaurant_id), default)
+
+def read_locked(path, default=None, storage=None):
+    """Contents of a JSON file written with locked_update, or default if it is missing or unreadable.
+
+    Takes a shared lock so the file is never read while an update is rewriting it.
+    """
+    return storage_or_default(storage).read(path, default, locked=True) or default
+
+def locked_update(path, update, default=None, storage=None):
+    """Read-modify-write a small JSON sidecar file under an exclusive lock.
+
+    update(state) receives the current contents (default if the file is new)
+    and returns (new_state, result); result is returned to the caller.
+    """
+    return storage_or_default(storage).update(path, update, default)
@@ -0,0 +1,86 @@
+import unittest
+import sys
+import os
+from datetime import datetime
+from unittest.mock import MagicMock
+
+# Add the src directory to path for importing modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from admission import AdmissionController, ACCEPT, QUEUE, REJECT
+
+def delivery(order_id, agent, status="Pending"):
+    return {"id": order_id, "customer": "test", "type": "Delivery", "items": ["burger"],
+            "status": status, "delivery_agent": agent, "expected_delivery_time": 30,
+            "order_time": "2023-01-01 12:00:00"}
+
+class TestAdmissionController(unittest.TestCase):
+    def setUp(self):
+        self.estimator = MagicMock()
+        self.controller = AdmissionController(self.estimator, promise_minutes=60, waitlist_limit=1)
+        self.data = {
+            "orders": [delivery(1001, "bob"), delivery(1002, "alice", "Delivered")],
+            "delivery_agents": ["bob", "alice"]
+        }
+        self.when = datetime(2023, 1, 1, 12, 30)
+
+    def test_agent_loads_prefers_logged_in_roster(self):
+        self.assertEqual(self.controller.agent_loads(self.data, set()), {"bob": 1, "alice": 0})
+        self.assertEqual(self.controller.agent_loads(self.data, {"bob"}), {"bob": 1})
+
+    def test_pick_agent(self):
+        self.assertEqual(AdmissionController.pick_agent({"bob": 1, "alice": 0}), "alice")
+        self.assertEqual(AdmissionController.pick_agent({"bob": 2, "alice": 1}), "alice")
+        self.assertIsNone(AdmissionController.pick_agent({}))
+
+    def test_pick_agent_prefers_located_agents_on_ties(self):
+        self.assertEqual(AdmissionController.pick_agent({"alice": 0, "bob": 0}, {"bob"}), "bob")
+        self.assertEqual(AdmissionController.pick_agent({"alice": 0, "bob": 1}, {"bob"}), "alice")
+
+    def test_pick_agent_prefers_better_rated_agents_on_ties(self):
+        ratings = {"alice": 2.5, "bob": 4.8}
+        self.assertEqual(AdmissionController.pick_agent({"alice": 0, "bob": 0}, (), ratings), "bob")
+        # Location still comes first, and unrated agents count as neutral
+        self.assertEqual(AdmissionController.pick_agent({"alice": 0, "bob": 0}, {"alice"}, ratings), "alice")
+        self.assertEqual(AdmissionController.pick_agent({"alice": 0, "carol": 0}, (), ratings), "carol")
+
+    def test_accept_idle_agent(self):
+        self.estimator.estimate.return_value = 25
+        decision = self.controller.decide(self.data, ["burger"], set(), self.when)
+        self.assertEqual(decision, (ACCEPT, "alice", 25, None))
+        kwargs = self.estimator.estimate.call_args[1]
+        self.assertEqual((kwargs["agent_backlog"], kwargs["kitchen_queue"]), (0, 1))
+
+    def test_accept_busy_agent_with_longer_eta(self):
+        self.estimator.estimate.return_value = 55
+        decision = self.controller.decide(self.data, ["burger"], {"bob"}, self.when)
+        self.assertEqual(decision, (ACCEPT, "bob", 55, None))
+        self.assertEqual(self.estimator.estimate.call_args[1]["agent_backlog"], 1)
+
+    def test_queue_when_eta_breaks_promise(self):
+        self.estimator.estimate.return_value = 75
+        decision = self.controller.decide(self.data, ["burger"], {"bob"}, self.when)
+        self.assertEqual(decision.action, QUEUE)
+
+    def test_reject_when_waitlist_full(self):
+        self.estimator.estimate.return_value = 75
+        self.data["waitlist"] = [1003]
+        decision = self.controller.decide(self.data, ["burger"], {"bob"}, self.when)
+        self.assertEqual(decision, (REJECT, None, 75, 15))
+
+    def test_queue_without_agents(self):
+        self.estimator.estimate.return_value = 20
+        self.data["delivery_agents"] = []
+        decision = self.controller.decide(self.data, ["burger"], set(), self.when)
+        self.assertEqual(decision.action, QUEUE)
+
+    def test_dispatch_assigns_waiting_orders_to_idle_agents(self):
+        self.data["orders"] += [delivery(1003, "Not Assigned"), delivery(1004, "Not Assigned")]
+        self.data["waitlist"] = [1003, 1004]
+        assigned = self.controller.dispatch(self.data, {"bob", "alice"})
+        self.assertEqual([order["id"] for order in assigned], [1003])
+        self.assertEqual(self.data["orders"][2]["delivery_agent"], "alice")
+        self.assertEqual(self.data["waitlist"], [1004])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import sys
+import os
+from datetime import datetime
+from unittest.mock import patch
+
+# Add the src directory to path for importing modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from dashboard import Dashboard
+from notifications import NotificationDispatcher, Outbox, StubSink
+from sweeper import DeadlineSweeper
+
+class TestDashboard(unittest.TestCase):
+    def setUp(self):
+        self.dashboard = Dashboard()
+        self.test_data = {
+            "menu": {"burger": 150.00},
+            "orders": [
+                {"id": 1001, "customer": "test", "type": "Delivery", "items": ["burger"],
+                 "total_price": 150.00, "status": "Pending", "delivery_agent": "bob",
+                 "expected_delivery_time": 30, "order_time": "2023-01-01 12:00:00"},
+                {"id": 1002, "customer": "test2", "type": "Takeaway", "items": ["burger"],
+                 "total_price": 150.00, "status": "Completed", "delivery_agent": "-"},
+                {"id": 1003, "customer": "test3", "type": "Delivery", "items": ["burger"],
+                 "total_price": 150.00, "status": "Picked Up", "delivery_agent": "alice",
+                 "expected_delivery_time": 45, "order_time": "2023-01-01 12:10:00"},
+                {"id": 1004, "customer": "test4", "type": "Delivery", "items": ["burger"],
+                 "total_price": 150.00, "status": "Delivered", "delivery_agent": "bob",
+                 "expected_delivery_time": 30, "order_time": "2023-01-01 11:00:00"}
+            ],
+            "delivery_agents": ["bob", "alice", "carol"],
+            "next_order_id": 1005
+        }
+        self.now = datetime(2023, 1, 1, 12, 40)
+
+    def test_update_summarises_state(self):
+        self.dashboard.update(self.test_data)
+        self.assertEqual(self.dashboard.status_counts,
+                         {"Pending": 1, "Completed": 1, "Picked Up": 1, "Delivered": 1})
+        self.assertEqual(set(self.dashboard.rows), {1001, 1003})
+        self.assertEqual(self.dashboard.agent_load, {"bob": 1, "alice": 1})
+
+    def test_late_orders(self):
+        self.dashboard.update(self.test_data)
+        # 1001 was due at 12:30, 1003 is due at 12:55
+        self.assertEqual(self.dashboard.late_ids(self.now), [1001])
+
+    def test_late_orders_from_sweeper(self):
+        sweeper = DeadlineSweeper()
+        sweeper.sync(self.test_data["orders"])
+        sweeper.tick(self.now)
+        self.dashboard.sweeper = sweeper
+        self.dashboard.update(self.test_data)
+        self.assertEqual(self.dashboard.late_ids(), [1001])
+
+    def test_unchanged_rows_are_reused(self):
+        self.dashboard.update(self.test_data)
+        row_1001 = self.dashboard.rows[1001]
+        row_1003 = self.dashboard.rows[1003]
+        self.test_data["orders"][2]["status"] = "Out for Delivery"
+        self.dashboard.update(self.test_data)
+        self.assertIs(self.dashboard.rows[1001], row_1001)
+        self.assertIsNot(self.dashboard.rows[1003], row_1003)
+
+    def test_render_limits_rows(self):
+        self.dashboard.max_rows = 1
+        self.dashboard.update(self.test_data)
+        summary, agents, orders = self.dashboard.render(self.now).renderables
+        self.assertEqual(orders.row_count, 1)
+        self.assertEqual(orders.caption, "showing 1 of 2")
+        self.assertEqual(agents.caption, "2/3 agents busy")
+
+    def test_render_reports_notifications(self):
+        outbox = Outbox(clock=lambda: 100.0)
+        self.dashboard.notifier = NotificationDispatcher(outbox, StubSink())
+        outbox.notify(self.test_data["orders"][2])
+        self.dashboard.update(self.test_data)
+        summary, _, _ = self.dashboard.render(self.now).renderables
+        self.assertEqual(summary.caption, "notifications: 1 queued (oldest 0.0s), 0 sent, lag 0.0s avg")
+
+    @patch('dashboard.read_snapshot')
+    @patch('dashboard.data_version')
+    def test_poll_rereads_only_on_change(self, mock_version, mock_read_snapshot):
+        mock_read_snapshot.return_value = self.test_data
+        mock_version.return_value = (1, 100)
+        self.assertTrue(self.dashboard.poll())
+        self.assertFalse(self.dashboard.poll())
+        mock_version.return_value = (2, 120)
+        self.assertTrue(self.dashboard.poll())
+        self.assertEqual(mock_read_snapshot.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,10 +7,13 @@ from unittest.mock import patch, MagicMock
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
 from delivery import DeliveryManager
+from notifications import Outbox
+from eta import EtaEstimator
+from storage import MemoryStorage
 
 class TestDeliveryManager(unittest.TestCase):
     def setUp(self):
-        self.delivery_manager = DeliveryManager()
+        self.delivery_manager = DeliveryManager(storage=MemoryStorage())
         self.test_data = {
             "menu": {"burger": 150.00},
             "orders": [
@@ -107,6 +110,73 @@ class TestDeliveryManager(unittest.TestCase):
         # Match the case used in the application (first letter of each word capitalized)
         self.assertEqual(found_order["status"], "Picked Up")
 
+    @patch('delivery.read_json')
+    @patch('delivery.write_json')
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_update_order_status_records_times(self, mock_print, mock_input, mock_write_json, mock_read_json):
+        mock_read_json.return_value = self.test_data
+        self.delivery_manager.estimator = EtaEstimator()
+        order = self.test_data["orders"][0]
+        for status in ("picked up", "out for delivery", "delivered"):
+            mock_input.side_effect = ["1001", status]
+            self.delivery_manager.update_order_status("bob")
+        self.assertIn("picked_up_time", order)
+        self.assertIn("delivered_time", order)
+        self.assertEqual(self.delivery_manager.estimator.legs["bob"].count, 1)
+
+    @patch('delivery.read_json')
+    @patch('delivery.write_json')
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_update_order_status_stores_listed_spelling(self, mock_print, mock_input, mock_write_json, mock_read_json):
+        mock_read_json.return_value = self.test_data
+        order = self.test_data["orders"][0]
+        order["status"] = "Picked Up"
+        mock_input.side_effect = ["1001", "out for delivery"]
+        self.delivery_manager.update_order_status("bob")
+        self.assertEqual(order["status"], "Out for Delivery")
+        order["status"] = "Out For Delivery"  # as saved by earlier versions
+        mock_input.side_effect = ["1001", "deliverd", "delivered"]
+        self.delivery_manager.update_order_status("bob")
+        self.assertEqual(order["status"], "Delivered")
+        mock_print.assert_any_call("[bold red]Invalid status.[/bold red]")
+
+    @patch('delivery.read_json')
+    @patch('delivery.write_json')
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_delivered_order_frees_agent_for_waiting_order(self, mock_print, mock_input, mock_write_json, mock_read_json):
+        waiting = dict(self.test_data["orders"][0], id=1005, delivery_agent="Not Assigned")
+        self.test_data["orders"].append(waiting)
+        self.test_data["waitlist"] = [1005]
+        self.test_data["orders"][2]["status"] = "Out for Delivery"
+        mock_read_json.return_value = self.test_data
+        self.delivery_manager.logged_in_agents.update({"bob", "alice"})
+        mock_input.side_effect = ["1003", "delivered"]
+
+        self.delivery_manager.update_order_status("alice")
+
+        updated_data = mock_write_json.call_args[0][0]
+        self.assertEqual(updated_data["waitlist"], [])
+        self.assertEqual(waiting["delivery_agent"], "alice")
+
+    @patch('delivery.read_json')
+    @patch('delivery.write_json')
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_login_dispatches_waiting_orders(self, mock_print, mock_input, mock_write_json, mock_read_json):
+        waiting = dict(self.test_data["orders"][0], id=1005, delivery_agent="Not Assigned")
+        self.test_data["orders"].append(waiting)
+        self.test_data["waitlist"] = [1005]
+        mock_read_json.return_value = self.test_data
+        mock_input.return_value = "charlie"
+
+        self.delivery_manager.signup_login()
+
+        mock_write_json.assert_called_once()
+        self.assertEqual(waiting["delivery_agent"], "charlie")
+
     @patch('delivery.read_json')
     @patch('builtins.input')
     @patch('rich.console.Console.print')
@@ -162,6 +232,200 @@ class TestDeliveryManager(unittest.TestCase):
         self.delivery_manager.update_order_status("bob")
         mock_print.assert_called_with("[bold yellow]Order 1004 has already been delivered and cannot be updated.[/bold yellow]")
 
+    @patch('delivery.read_json')
+    @patch('delivery.write_json')
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_update_order_status_payment_failed(self, mock_print, mock_input, mock_write_json, mock_read_json):
+        self.test_data["orders"][0]["status"] = "Payment Failed"
+        mock_read_json.return_value = self.test_data
+        mock_input.side_effect = ["1001", "delivered"]
+        self.delivery_manager.update_order_status("bob")
+        mock_write_json.assert_not_called()
+        self.assertEqual(self.test_data["orders"][0]["status"], "Payment Failed")
+        mock_print.assert_called_with("[bold yellow]Order 1001 is 'Payment Failed' and cannot be updated.[/bold yellow]")
+
+    @patch('delivery.read_json')
+    @patch('delivery.write_json')
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_update_order_status_only_to_next_status(self, mock_print, mock_input, mock_write_json, mock_read_json):
+        mock_read_json.return_value = self.test_data
+        mock_input.side_effect = ["1001", "delivered", "out for delivery", "picked up"]
+        self.delivery_manager.update_order_status("bob")
+        self.assertEqual(self.test_data["orders"][0]["status"], "Picked Up")
+        mock_print.assert_any_call("[bold red]You must pick up this order first.[/bold red]")
+        mock_write_json.assert_called_once()
+
+    @patch('delivery.read_json')
+    @patch('delivery.write_json')
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_update_order_status_awaiting_payment(self, mock_print, mock_input, mock_write_json, mock_read_json):
+        self.test_data["orders"][0]["status"] = "Awaiting Payment"
+        mock_read_json.return_value = self.test_data
+        mock_input.return_value = "1001"
+        self.delivery_manager.update_order_status("bob")
+        mock_write_json.assert_not_called()
+        mock_print.assert_called_with("[bold yellow]Order 1001 is waiting for its payment and cannot be picked up yet.[/bold yellow]")
+
+    @patch('delivery.read_json')
+    @patch('delivery.write_json')
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_batch_update_status_skips_awaiting_payment(self, mock_print, mock_input, mock_write_json, mock_read_json):
+        self.test_data["orders"].append(dict(self.test_data["orders"][0], id=1005, status="Awaiting Payment",
+                                             payment={"method": "upi", "status": "pending", "key": "main-1005"}))
+        mock_read_json.return_value = self.test_data
+        mock_input.side_effect = ["all", "picked up"]
+
+        self.delivery_manager.batch_update_status("bob")
+
+        worklist = mock_print.call_args_list[0][0][0]
+        self.assertEqual(list(worklist.columns[4].cells), ["Picked Up", "-"])
+        self.assertEqual([order["status"] for order in self.test_data["orders"][-2:]], ["Delivered", "Awaiting Payment"])
+        self.assertEqual(self.test_data["orders"][0]["status"], "Picked Up")
+
+    @patch('delivery.read_snapshot')
+    @patch('rich.console.Console.print')
+    def test_my_orders(self, mock_print, mock_read_snapshot):
+        mock_read_snapshot.return_value = self.test_data
+        self.delivery_manager.my_orders("bob")
+        table = mock_print.call_args[0][0]
+        self.assertEqual(table.row_count, 2)
+
+    @patch('delivery.read_snapshot')
+    @patch('rich.console.Console.print')
+    def test_my_orders_none(self, mock_print, mock_read_snapshot):
+        mock_read_snapshot.return_value = self.test_data
+        self.delivery_manager.my_orders("charlie")
+        mock_print.assert_called_with("[bold yellow]No orders are assigned to you.[/bold yellow]")
+
+    @patch('delivery.read_snapshot')
+    @patch('rich.console.Console.print')
+    def test_worklist_lists_active_orders_with_next_step(self, mock_print, mock_read_snapshot):
+        mock_read_snapshot.return_value = self.test_data
+        orders = self.delivery_manager.worklist("bob")
+        self.assertEqual([order["id"] for order in orders], [1001])
+        table = mock_print.call_args[0][0]
+        self.assertEqual(list(table.columns[4].cells), ["Picked Up"])
+
+    @patch('delivery.read_json')
+    @patch('delivery.write_json')
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_batch_update_status_all(self, mock_print, mock_input, mock_write_json, mock_read_json):
+        self.test_data["orders"].append(dict(self.test_data["orders"][0], id=1005))
+        self.test_data["orders"].append(dict(self.test_data["orders"][2], id=1006, delivery_agent="bob"))
+        mock_read_json.return_value = self.test_data
+        mock_input.side_effect = ["all", "picked up"]
+
+        self.delivery_manager.batch_update_status("bob")
+
+        mock_write_json.assert_called_once()
+        statuses = {order["id"]: order["status"] for order in self.test_data["orders"]}
+        self.assertEqual((statuses[1001], statuses[1005], statuses[1006]), ("Picked Up", "Picked Up", "Picked Up"))
+        self.assertIn("picked_up_time", self.test_data["orders"][0])
+        self.assertNotIn("picked_up_time", self.test_data["orders"][-1])
+
+    @patch('delivery.read_json')
+    @patch('delivery.write_json')
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_batch_update_status_through_delivery(self, mock_print, mock_input, mock_write_json, mock_read_json):
+        mock_read_json.return_value = self.test_data
+        order = self.test_data["orders"][0]
+        for typed, expected in (("picked up", "Picked Up"), ("OUT  for delivery", "Out for Delivery"),
+                                ("Delivered", "Delivered")):
+            mock_input.side_effect = ["1001", typed]
+            self.delivery_manager.batch_update_status("bob")
+            self.assertEqual(order["status"], expected)
+
+    @patch('delivery.read_json')
+    @patch('delivery.write_json')
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_batch_update_status_queues_notifications(self, mock_print, mock_input, mock_write_json, mock_read_json):
+        self.test_data["orders"].append(dict(self.test_data["orders"][0], id=1005))
+        mock_read_json.return_value = self.test_data
+        self.delivery_manager.outbox = Outbox()
+        mock_input.side_effect = ["all", "picked up"]
+
+        self.delivery_manager.batch_update_status("bob")
+
+        queued = self.delivery_manager.outbox.take(10)
+        self.assertEqual([(n.order_id, n.channel) for n in queued], [(1001, "push"), (1005, "push")])
+
+    @patch('delivery.read_json')
+    @patch('delivery.write_json')
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_batch_update_status_delivered_cancels_deadlines(self, mock_print, mock_input, mock_write_json, mock_read_json):
+        self.test_data["orders"][0]["status"] = "Out for Delivery"
+        self.test_data["orders"].append(dict(self.test_data["orders"][0], id=1005))
+        mock_read_json.return_value = self.test_data
+        self.delivery_manager.sweeper = MagicMock()
+        mock_input.side_effect = ["1001, 1005", "delivered"]
+
+        self.delivery_manager.batch_update_status("bob")
+
+        mock_write_json.assert_called_once()
+        self.assertEqual([call[0][0] for call in self.delivery_manager.sweeper.cancel.call_args_list], [1001, 1005])
+
+    @patch('delivery.read_json')
+    @patch('delivery.write_json')
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_batch_update_status_is_all_or_nothing(self, mock_print, mock_input, mock_write_json, mock_read_json):
+        mock_read_json.return_value = self.test_data
+        mock_input.side_effect = ["1001, 1003", "picked up"]
+
+        self.delivery_manager.batch_update_status("bob")
+
+        mock_write_json.assert_not_called()
+        self.assertEqual(self.test_data["orders"][0]["status"], "Pending")
+        mock_print.assert_called_with("[bold red]No orders were updated: 1003 is not in your worklist.[/bold red]")
+
+    @patch('delivery.read_json')
+    @patch('delivery.write_json')
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_batch_update_status_wrong_transition(self, mock_print, mock_input, mock_write_json, mock_read_json):
+        mock_read_json.return_value = self.test_data
+        mock_input.side_effect = ["1001", "delivered"]
+
+        self.delivery_manager.batch_update_status("bob")
+
+        mock_write_json.assert_not_called()
+        mock_print.assert_called_with("[bold red]No orders were updated: 1001 is 'Pending' and must be marked "
+                                      "'Picked Up' next.[/bold red]")
+
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_share_location(self, mock_print, mock_input):
+        mock_input.return_value = "12.9716, 77.5946"
+        self.delivery_manager.share_location("bob")
+        self.assertEqual(self.delivery_manager.locations.latest("bob")[:2], (12.9716, 77.5946))
+        self.assertEqual(self.delivery_manager.located_agents(), {"bob"})
+
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_share_location_invalid(self, mock_print, mock_input):
+        for text in ("north", "95, 10"):
+            mock_input.return_value = text
+            self.delivery_manager.share_location("bob")
+        self.assertIsNone(self.delivery_manager.locations.latest("bob"))
+
+    @patch('delivery.read_json')
+    def test_assign_delivery_agent_skips_busy_agent(self, mock_read_json):
+        mock_read_json.return_value = self.test_data
+        self.delivery_manager.logged_in_agents.update({"bob", "alice", "charlie"})
+        self.test_data["delivery_agents"].append("charlie")
+        test_order = {"delivery_agent": "Not Assigned"}
+        self.delivery_manager.assign_delivery_agent(test_order)
+        # bob has order 1001 pending and alice has 1003 picked up
+        self.assertEqual(test_order["delivery_agent"], "charlie")
+
     def test_assign_delivery_agent_logged_in(self):
         # Simulate logged in agent
         test_order = {"delivery_agent": "Not Assigned"}
@@ -0,0 +1,75 @@
+import unittest
+import sys
+import os
+
+# Add the src directory to path for importing modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from eta import EtaEstimator, RunningStat, PREP_PRIOR, LEG_PRIOR
+
+def delivered(order_id, items, agent, order_time, picked_up_time, delivered_time):
+    return {"id": order_id, "items": items, "delivery_agent": agent, "status": "Delivered",
+            "order_time": order_time, "picked_up_time": picked_up_time,
+            "delivered_time": delivered_time}
+
+class TestEtaEstimator(unittest.TestCase):
+    def setUp(self):
+        self.history = [
+            delivered(1, ["pizza"], "bob", "2023-01-01 12:00:00", "2023-01-01 12:20:00", "2023-01-01 12:30:00"),
+            delivered(2, ["pizza", "coke"], "bob", "2023-01-01 12:10:00", "2023-01-01 12:30:00", "2023-01-01 12:40:00"),
+            delivered(3, ["coke"], "alice", "2023-01-01 18:00:00", "2023-01-01 18:02:00", "2023-01-01 18:32:00")
+        ]
+
+    def test_running_stat(self):
+        stat = RunningStat()
+        for value in (2, 4, 4, 4, 5, 5, 7, 9):
+            stat.add(value)
+        self.assertEqual(stat.count, 8)
+        self.assertAlmostEqual(stat.mean, 5.0)
+        self.assertAlmostEqual(stat.variance, 32 / 7)
+
+    def test_priors_without_history(self):
+        estimator = EtaEstimator()
+        self.assertEqual(estimator.estimate(["pizza"]), PREP_PRIOR + LEG_PRIOR)
+
+    def test_learns_per_item_and_agent(self):
+        estimator = EtaEstimator.from_orders(self.history)
+        self.assertEqual(estimator.prep["pizza"].mean, 20)
+        self.assertEqual(estimator.legs["alice"].mean, 30)
+        # pizza prep 20 + bob's leg 10
+        self.assertEqual(estimator.estimate(["pizza"], "bob"), 30)
+        # coke prep (20 + 2) / 2 = 11 + alice's leg 30
+        self.assertEqual(estimator.estimate(["coke"], "alice"), 41)
+
+    def test_backlog_and_kitchen_queue_add_time(self):
+        estimator = EtaEstimator.from_orders(self.history)
+        base = estimator.estimate(["pizza"], "bob")
+        self.assertEqual(estimator.estimate(["pizza"], "bob", agent_backlog=2), base + 20)
+        self.assertGreater(estimator.estimate(["pizza"], "bob", kitchen_queue=8), base)
+
+    def test_hour_bucket_scales_estimate(self):
+        estimator = EtaEstimator.from_orders(self.history)
+        lunch = estimator.estimate(["pizza"], "bob", hour=12)
+        dinner = estimator.estimate(["pizza"], "bob", hour=18)
+        self.assertLess(lunch, dinner)
+
+    def test_ignores_orders_without_timestamps(self):
+        estimator = EtaEstimator()
+        estimator.observe({"items": ["pizza"], "delivery_agent": "bob", "order_time": "2023-01-01 12:00:00"})
+        self.assertEqual(estimator.all_prep.count, 0)
+
+    def test_zero_and_backward_durations_are_ignored(self):
+        instant = "2023-01-01 12:00:00"
+        estimator = EtaEstimator.from_orders([
+            delivered(1, ["pizza"], "bob", instant, instant, instant),
+            delivered(2, ["pizza"], "bob", instant, "2023-01-01 11:50:00", "2023-01-01 12:10:00")])
+        self.assertEqual(estimator.all_total.count, 0)
+        self.assertEqual(estimator.estimate(["pizza"], "bob", hour=12), PREP_PRIOR + LEG_PRIOR)
+        # Hours are not scaled against a zero overall mean
+        estimator.hours[12] = RunningStat()
+        estimator.hours[12].add(0)
+        estimator.all_total.add(0)
+        self.assertEqual(estimator.estimate(["pizza"], "bob", hour=12), PREP_PRIOR + LEG_PRIOR)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+import threading
+
+# Add the src directory to path for importing modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from ids import IdAllocator
+
+class TestIdAllocator(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.path = os.path.join(self.tmp_dir, "ids")
+
+    def test_first_block_starts_at_floor(self):
+        allocator = IdAllocator(block_size=10, path=self.path)
+        self.assertEqual(allocator.next_id(1001), 1001)
+        self.assertEqual(allocator.next_id(1001), 1002)
+        with open(self.path) as f:
+            self.assertEqual(json.load(f), 1011)
+
+    def test_ids_within_block_do_not_touch_storage(self):
+        allocator = IdAllocator(block_size=10, path=self.path)
+        allocator.next_id()
+        os.remove(self.path)
+        for _ in range(9):
+            allocator.next_id()
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_allocators_get_disjoint_blocks(self):
+        first = IdAllocator(block_size=5, path=self.path)
+        second = IdAllocator(block_size=5, path=self.path)
+        self.assertEqual(first.next_id(1001), 1001)
+        self.assertEqual(second.next_id(1001), 1006)
+        self.assertEqual(first.next_id(1001), 1002)
+
+    def test_exhausted_block_reserves_next(self):
+        allocator = IdAllocator(block_size=2, path=self.path)
+        ids = [allocator.next_id(1) for _ in range(5)]
+        self.assertEqual(ids, [1, 2, 3, 4, 5])
+
+    def test_concurrent_allocators_unique(self):
+        allocators = [IdAllocator(block_size=7, path=self.path) for _ in range(4)]
+        results = []
+        lock = threading.Lock()
+
+        def worker(allocator):
+            ids = [allocator.next_id(1001) for _ in range(50)]
+            with lock:
+                results.extend(ids)
+
+        threads = [threading.Thread(target=worker, args=(a,)) for a in allocators]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(results), len(set(results)))
+        self.assertTrue(min(results) >= 1001)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import sys
+import os
+import time
+
+# Add the src directory to path for importing modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from location import PingBuffer, LocationTracker, distance_km
+
+class TestPingBuffer(unittest.TestCase):
+    def test_keeps_last_pings_in_order(self):
+        buffer = PingBuffer(capacity=3)
+        for second in range(5):
+            buffer.add(float(second), 0.0, float(second))
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual([position.timestamp for position in buffer.positions()], [2.0, 3.0, 4.0])
+        self.assertEqual(buffer.latest(), (4.0, 0.0, 4.0))
+
+    def test_empty_buffer(self):
+        buffer = PingBuffer()
+        self.assertIsNone(buffer.latest())
+        self.assertIsNone(buffer.speed_kmh())
+
+    def test_speed_over_buffered_path(self):
+        buffer = PingBuffer(capacity=4)
+        # One degree of latitude is about 111 km; cover it in one hour
+        buffer.add(0.0, 0.0, 0.0)
+        buffer.add(0.5, 0.0, 1800.0)
+        buffer.add(1.0, 0.0, 3600.0)
+        self.assertAlmostEqual(buffer.speed_kmh(), distance_km(0, 0, 1, 0), places=6)
+        self.assertAlmostEqual(buffer.speed_kmh(), 111.19, places=1)
+
+    def test_no_speed_without_elapsed_time(self):
+        buffer = PingBuffer()
+        buffer.add(0.0, 0.0, 10.0)
+        buffer.add(1.0, 0.0, 10.0)
+        self.assertIsNone(buffer.speed_kmh())
+
+class TestLocationTracker(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        self.tracker = LocationTracker(history=8, clock=lambda: self.now)
+
+    def test_ingest_and_latest(self):
+        self.tracker.ingest("bob", 12.9, 77.6)
+        self.assertEqual(self.tracker.latest("bob"), (12.9, 77.6, 1000.0))
+        self.assertIsNone(self.tracker.latest("alice"))
+        self.assertIsNone(self.tracker.speed_kmh("alice"))
+
+    def test_ingest_many_and_seen_within(self):
+        self.tracker.ingest_many([("bob", 1.0, 1.0, 900.0), ("alice", 2.0, 2.0, 990.0), ("bob", 1.0, 1.1, 950.0)])
+        self.assertEqual(self.tracker.latest("bob").lon, 1.1)
+        self.assertEqual(self.tracker.seen_within(20), {"alice"})
+        self.assertEqual(self.tracker.seen_within(60), {"alice", "bob"})
+
+    def test_sustains_high_ping_rate(self):
+        pings = [(f"agent{number % 100}", 12.0 + number * 1e-6, 77.0, float(number)) for number in range(50000)]
+        started = time.perf_counter()
+        self.tracker.ingest_many(pings)
+        self.assertLess(time.perf_counter() - started, 2.0)
+        self.assertEqual(len(self.tracker.buffers), 100)
+        self.assertEqual(len(self.tracker.buffers["agent0"]), 8)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add the src directory to path for importing modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import migrations
+from migrations import SCHEMA_KEY, SCHEMA_VERSION, migrate_order, upgrade
+from output import set_plain
+from restaurant import orders_table
+from storage import MemoryStorage
+from utils import read_json, write_json
+
+def takeaway(order_id):
+    return {"id": order_id, "customer": "jane", "type": "Takeaway", "items": ["pizza"], "total_price": 315.0,
+            "status": "Completed", "delivery_agent": "-", "lines": [{"item": "pizza", "quantity": 1, "modifiers": []}]}
+
+def delivery(order_id):
+    return {"id": order_id, "customer": "john", "type": "Delivery", "items": ["pizza"], "total_price": 345.0,
+            "status": "Pending", "delivery_agent": "bob", "expected_delivery_time": 30,
+            "order_time": "2025-03-01 12:00:00", "lines": [{"item": "pizza", "quantity": 1, "modifiers": []}]}
+
+class TestMigrations(unittest.TestCase):
+    def test_takeaway_gains_delivery_fields_in_place(self):
+        order = migrate_order(takeaway(1))
+        self.assertIsNone(order["order_time"])
+        self.assertIsNone(order["expected_delivery_time"])
+        self.assertEqual(order[SCHEMA_KEY], SCHEMA_VERSION)
+        expected = list(delivery(2)) + [SCHEMA_KEY]
+        self.assertEqual(list(order), expected)
+        self.assertEqual(list(migrate_order(delivery(2))), expected)
+
+    def test_current_and_newer_orders_are_untouched(self):
+        order = migrate_order(takeaway(1))
+        self.assertIs(migrate_order(order), order)
+        newer = dict(takeaway(2), **{SCHEMA_KEY: SCHEMA_VERSION + 1})
+        self.assertEqual(migrate_order(dict(newer)), newer)
+
+    def test_upgrade(self):
+        data = {"orders": [takeaway(1), migrate_order(takeaway(2))]}
+        self.assertTrue(upgrade(data))
+        self.assertEqual(data[SCHEMA_KEY], SCHEMA_VERSION)
+        self.assertTrue(all(order[SCHEMA_KEY] == SCHEMA_VERSION for order in data["orders"]))
+        self.assertFalse(upgrade(data))
+
+    def test_current_store_is_not_scanned(self):
+        data = {"orders": [takeaway(1)], SCHEMA_KEY: SCHEMA_VERSION}
+        with patch('migrations.migrate_order') as mock_migrate:
+            self.assertFalse(upgrade(data))
+        mock_migrate.assert_not_called()
+        self.assertNotIn("order_time", data["orders"][0])
+
+    def test_table_columns_match_whichever_order_comes_first(self):
+        set_plain(True)
+        self.addCleanup(set_plain, False)
+        first_takeaway = orders_table([migrate_order(takeaway(1)), migrate_order(delivery(2))], "All Orders")
+        first_delivery = orders_table([migrate_order(delivery(2)), migrate_order(takeaway(1))], "All Orders")
+        headers = [column.header for column in first_takeaway.columns]
+        self.assertEqual(headers, [column.header for column in first_delivery.columns])
+        self.assertNotIn(SCHEMA_KEY, headers)
+        self.assertIn("-", str(first_takeaway).splitlines()[2])
+
+class TestWriteBack(unittest.TestCase):
+    def setUp(self):
+        self.storage = MemoryStorage()
+        write_json({"orders": [takeaway(1), delivery(2)], "next_order_id": 3}, storage=self.storage)
+
+    def test_read_migrates_and_saves_in_the_background(self):
+        data = read_json(storage=self.storage)
+        self.assertIsNone(data["orders"][0]["order_time"])
+        migrations.flush()
+        stored = self.storage.load("data.json")
+        self.assertEqual(stored, data)
+        version = self.storage.version("data.json")
+        read_json(storage=self.storage)
+        migrations.flush()
+        self.assertEqual(self.storage.version("data.json"), version)  # nothing left to write
+
+    def test_write_back_yields_to_a_concurrent_writer(self):
+        save = self.storage.save
+        winner = {"orders": [migrate_order(takeaway(1))], "next_order_id": 9, SCHEMA_KEY: SCHEMA_VERSION}
+
+        def lose_to_another_writer(name, data, expected_version=None):
+            save(name, winner)
+            return save(name, data, expected_version)
+
+        with patch.object(self.storage, "save", side_effect=lose_to_another_writer) as mock_save:
+            read_json(storage=self.storage)
+            migrations.flush()
+        mock_save.assert_called_once()
+        self.assertEqual(self.storage.load("data.json"), winner)
+
+    def test_large_history_is_upgraded_with_one_write(self):
+        write_json({"orders": [takeaway(n) for n in range(20_000)], "next_order_id": 20_000}, storage=self.storage)
+        with patch.object(self.storage, "save", wraps=self.storage.save) as mock_save:
+            data = read_json(storage=self.storage)
+            migrations.flush()
+        mock_save.assert_called_once()
+        self.assertEqual(self.storage.load("data.json"), data)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import unittest
+import sys
+import os
+import time
+
+# Add the src directory to path for importing modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from notifications import NotificationDispatcher, Outbox, SinkError, StubSink
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def order(order_id, customer="alice", status="Out for Delivery"):
+    return {"id": order_id, "customer": customer, "status": status, "delivery_agent": "bob"}
+
+class FailingSink(StubSink):
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+
+    def send(self, recipient, channel, texts):
+        if self.failures:
+            self.failures -= 1
+            raise SinkError("provider unavailable")
+        super().send(recipient, channel, texts)
+
+class TestOutbox(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.outbox = Outbox(self.clock)
+
+    def test_notify_major_status_changes_only(self):
+        self.assertEqual(self.outbox.notify(order(1001)), 2)
+        self.assertEqual(self.outbox.notify(order(1002, status="Picked Up")), 1)
+        self.assertEqual(self.outbox.notify(order(1003, status="Preparing")), 0)
+        taken = self.outbox.take(10)
+        self.assertEqual([(n.order_id, n.channel) for n in taken], [(1001, "push"), (1001, "sms"), (1002, "push")])
+        self.assertEqual(taken[2].text, "Order 1002 has been picked up by Bob.")
+        self.assertEqual(len(self.outbox), 0)
+
+    def test_retries_wait_for_their_time(self):
+        self.outbox.notify(order(1001, status="Picked Up"))
+        self.outbox.retry(self.outbox.take(10), self.clock.now + 5)
+        self.assertEqual(self.outbox.take(10), [])
+        self.assertEqual(len(self.outbox), 1)
+        self.clock.now += 5
+        self.assertEqual([n.attempts for n in self.outbox.take(10)], [1])
+
+    def test_oldest(self):
+        self.assertIsNone(self.outbox.oldest())
+        self.outbox.notify(order(1001))
+        self.clock.now += 3
+        self.outbox.notify(order(1002))
+        self.assertEqual(self.outbox.oldest(), 1000.0)
+
+class TestNotificationDispatcher(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.outbox = Outbox(self.clock)
+        self.sink = StubSink()
+
+    def dispatcher(self, **options):
+        return NotificationDispatcher(self.outbox, self.sink, **options)
+
+    def test_batches_per_recipient_and_channel(self):
+        for order_id in (1001, 1002):
+            self.outbox.notify(order(order_id))
+        self.outbox.notify(order(1003, customer="carol", status="Picked Up"))
+        dispatcher = self.dispatcher()
+
+        self.assertEqual(dispatcher.tick(), 5)
+
+        self.assertEqual(self.sink.sent, [
+            ("alice", "push", ["Order 1001 is out for delivery.", "Order 1002 is out for delivery."]),
+            ("alice", "sms", ["Order 1001 is out for delivery.", "Order 1002 is out for delivery."]),
+            ("carol", "push", ["Order 1003 has been picked up by Bob."]),
+        ])
+        self.assertEqual(dispatcher.batches, 3)
+
+    def test_rate_limit_leaves_the_rest_for_later(self):
+        for customer in ("alice", "bob", "carol"):
+            self.outbox.notify(order(1001, customer=customer, status="Picked Up"))
+        dispatcher = self.dispatcher(rate_per_second=2)
+
+        self.assertEqual(dispatcher.tick(), 2)
+        self.assertEqual(len(self.outbox), 1)
+        self.assertEqual(dispatcher.tick(), 0)  # no token yet
+        self.clock.now += 0.5
+        self.assertEqual(dispatcher.tick(), 1)
+        self.assertEqual([recipient for recipient, _, _ in self.sink.sent], ["alice", "bob", "carol"])
+
+    def test_failed_batch_is_retried_with_backoff(self):
+        self.sink = FailingSink(failures=2)
+        self.outbox.notify(order(1001, status="Picked Up"))
+        dispatcher = self.dispatcher(retry_delay=1)
+
+        self.assertEqual(dispatcher.tick(), 0)
+        self.clock.now += 1
+        self.assertEqual(dispatcher.tick(), 0)  # second failure; next retry in 2s
+        self.clock.now += 1
+        self.assertEqual(dispatcher.tick(), 0)
+        self.clock.now += 1
+        self.assertEqual(dispatcher.tick(), 1)
+        self.assertEqual(dispatcher.failed, 0)
+        self.assertEqual(dispatcher.report()["max_lag"], 3)
+
+    def test_gives_up_after_retries(self):
+        self.sink = FailingSink(failures=10)
+        self.outbox.notify(order(1001, status="Picked Up"))
+        dispatcher = self.dispatcher(retries=1, retry_delay=0)
+        dispatcher.tick()
+        dispatcher.tick()
+        self.assertEqual(dispatcher.failed, 1)
+        self.assertEqual(len(self.outbox), 0)
+
+    def test_report(self):
+        self.outbox.notify(order(1001))
+        dispatcher = self.dispatcher()
+        self.clock.now += 2
+        dispatcher.tick()
+        self.outbox.notify(order(1002, status="Picked Up"))
+        self.clock.now += 1
+        self.assertEqual(dispatcher.report(), {"queued": 1, "oldest_seconds": 1, "sent": 2, "batches": 2,
+                                               "failed": 0, "mean_lag": 2, "max_lag": 2})
+
+    def test_background_thread_delivers(self):
+        outbox = Outbox()
+        dispatcher = NotificationDispatcher(outbox, self.sink, tick_seconds=0.01)
+        dispatcher.start()
+        outbox.notify(order(1001, status="Delivered"))
+        deadline = time.time() + 2
+        while len(self.sink.sent) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        dispatcher.stop()
+        self.assertEqual(len(self.sink.sent), 2)
+
+if __name__ == '__main__':
+    unittest.main()
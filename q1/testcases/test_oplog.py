@@ -0,0 +1,136 @@
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+from datetime import datetime
+from unittest.mock import patch
+
+# Add the src directory to path for importing modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from main import RestaurantServices
+from oplog import close_log, main, open_log, read_log, replay
+from output import set_plain
+from payments import StubGateway
+from query import TIME_FORMAT
+from storage import MemoryStorage
+from utils import read_json
+
+# (service, method, args, answers) for a short shift: two agents, three orders, a delivery and a menu change
+SESSION = [
+    ("delivery_manager", "signup_login", (), ["bob"]),
+    ("delivery_manager", "signup_login", (), ["Alice"]),
+    ("order_manager", "place_order", (), ["john", "delivery", "2 x pizza", "upi"]),
+    ("order_manager", "place_order", (), ["jane", "delivery", "burger, coke", "cod"]),
+    ("order_manager", "place_order", (), ["raj", "takeaway", "pasta", "cash", "cod"]),
+    ("delivery_manager", "share_location", ("alice",), ["12.97, 77.59"]),
+    ("restaurant_manager", "edit_menu", (), ["1", "dosa", "90", "5"]),
+]
+
+class TestOperationsLog(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.log_path = os.path.join(self.temp_dir, "ops.log")
+        set_plain(True)
+        self.addCleanup(set_plain, False)
+        patcher = patch('builtins.print')
+        self.mock_print = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def record(self, session=SESSION):
+        """Run a session against a fresh store with the operations log open; returns the store"""
+        storage = MemoryStorage()
+        services = RestaurantServices(None, storage)
+        services.payments.gateway = StubGateway(latency=(0, 0), decline_rate=0, timeout_rate=0, seed=0)
+        open_log(self.log_path)
+        try:
+            for service, method, args, answers in session:
+                with patch('builtins.input', side_effect=answers):
+                    getattr(getattr(services, service), method)(*args)
+                services.payments.drain()
+        finally:
+            close_log()
+            services.sweeper.stop()
+            services.payments.shutdown()
+            services.notifier.stop()
+        return storage
+
+    def test_commands_are_logged_compactly(self):
+        self.record()
+        entries = read_log(self.log_path)
+        self.assertEqual([entry["op"] for entry in entries],
+                         ["login", "login", "place", "place", "place", "location", "menu"])
+        self.assertEqual(entries[4]["in"], ["raj", "takeaway", "pasta", "cash", "cod"])  # retries are kept
+        self.assertEqual(entries[5]["a"], ["alice"])
+        self.assertNotIn("r", entries[0])
+        self.assertEqual(sorted(entries[0]), ["in", "op", "t"])
+        with open(self.log_path) as f:
+            self.assertNotIn(" ", f.readline())
+
+    def test_nothing_is_logged_without_a_log(self):
+        storage = MemoryStorage()
+        services = RestaurantServices(None, storage)
+        self.addCleanup(services.sweeper.stop)
+        self.addCleanup(services.notifier.stop)
+        with patch('oplog.write_entry') as mock_write, patch('builtins.input', side_effect=["bob"]):
+            services.delivery_manager.signup_login()
+        mock_write.assert_not_called()
+
+    def test_replay_reproduces_dispatch(self):
+        original = read_json(storage=self.record())
+        results, storage = replay(read_log(self.log_path))
+        self.assertEqual([result["error"] for result in results], [None] * len(SESSION))
+        replayed = read_json(storage=storage)
+
+        def summary(data):
+            return [(order["id"], order["customer"], order["delivery_agent"], order["status"], order["total_price"])
+                    for order in data["orders"]]
+
+        self.assertEqual(summary(replayed), summary(original))
+        self.assertEqual(replayed["delivery_agents"], ["bob", "alice"])
+        self.assertEqual(replayed["menu"]["dosa"], 90.0)
+
+    def test_replay_is_deterministic(self):
+        self.record()
+        entries = read_log(self.log_path)
+        first = read_json(storage=replay(entries)[1])
+        second = read_json(storage=replay(entries)[1])
+        self.assertEqual(first, second)
+        # Order times come from the log, not from when the replay ran
+        placed = next(entry["t"] for entry in entries if entry["op"] == "place")
+        self.assertEqual(first["orders"][0]["order_time"], datetime.fromtimestamp(placed).strftime(TIME_FORMAT))
+
+    def test_replay_flags_divergence(self):
+        entries = [{"t": 1.0, "op": "place", "in": ["john", "delivery"]},
+                   {"t": 2.0, "op": "login", "in": ["bob", "extra"]}]
+        results, _ = replay(entries)
+        self.assertEqual(results[0]["error"], "recorded answers exhausted")
+        self.assertEqual(results[1]["error"], "1 recorded answers left unread")
+
+    def test_time_scaling(self):
+        entries = [{"t": 100.0, "op": "login", "in": ["bob"]}, {"t": 101.0, "op": "login", "in": ["alice"]}]
+        with patch('oplog.time.sleep') as mock_sleep:
+            replay(entries, speed=10)
+        mock_sleep.assert_called_once_with(0.1)
+        with patch('oplog.time.sleep') as mock_sleep:
+            replay(entries)
+        mock_sleep.assert_not_called()
+
+    def test_command_line(self):
+        self.record()
+        out = os.path.join(self.temp_dir, "replayed.json")
+        self.mock_print.reset_mock()
+        self.assertEqual(main([self.log_path, "--out", out]), 0)
+        self.assertTrue(self.mock_print.call_args_list[0][0][0].startswith("7 operations in"))
+        with open(out) as f:
+            self.assertEqual(len(json.load(f)["orders"]), 3)
+        with open(self.log_path, "a") as f:
+            f.write('{"t": 1, "op": "format_disk", "in": []}\n')
+        self.assertEqual(main([self.log_path]), 1)
+        self.mock_print.assert_called_with("Error: Unknown operations: format_disk", file=sys.stderr)
+
+if __name__ == '__main__':
+    unittest.main()
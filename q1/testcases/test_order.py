@@ -1,17 +1,27 @@
 import unittest
 import sys
 import os
+import time
 from unittest.mock import patch, MagicMock
 from datetime import datetime, timedelta
 
 # Add the src directory to path for importing modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
+from delivery import DeliveryManager
+from migrations import SCHEMA_VERSION
+from notifications import Outbox
 from order import OrderManager
+from restaurant import RestaurantManager
+from storage import MemoryStorage
+from sweeper import DeadlineSweeper
 
 class TestOrderManager(unittest.TestCase):
     def setUp(self):
-        self.order_manager = OrderManager()
+        # Id blocks, stock, ratings and payments stay in memory, out of the shared files
+        self.storage = MemoryStorage()
+        self.order_manager = OrderManager(storage=self.storage)
+        self.addCleanup(self.order_manager.payments.shutdown)
         self.test_data = {
             "menu": {"burger": 150.00, "pizza": 300.00, "coke": 50.00},
             "orders": [
@@ -40,20 +50,28 @@ class TestOrderManager(unittest.TestCase):
             "next_order_id": 1003
         }
 
+    def test_shares_managers_passed_in(self):
+        delivery_manager = DeliveryManager()
+        restaurant_manager = RestaurantManager()
+        order_manager = OrderManager(delivery_manager=delivery_manager, restaurant_manager=restaurant_manager)
+        self.assertIs(order_manager.delivery_manager, delivery_manager)
+        self.assertIs(order_manager.restaurant_manager, restaurant_manager)
+        self.assertIs(order_manager.locations, delivery_manager.locations)
+
     @patch('order.read_json')
     @patch('order.write_json')
     @patch('builtins.input')
-    @patch('random.randint')
+    @patch('eta.EtaEstimator.estimate')
     @patch('datetime.datetime')
     @patch('order.DeliveryManager.assign_delivery_agent')
     @patch('order.RestaurantManager.view_menu')
     @patch('rich.console.Console.print')
     def test_place_order_delivery(self, mock_print, mock_view_menu, mock_assign_agent, mock_datetime, 
-                                mock_randint, mock_input, mock_write_json, mock_read_json):
+                                mock_estimate, mock_input, mock_write_json, mock_read_json):
         mock_read_json.return_value = self.test_data
         mock_datetime.now.return_value = datetime(2023, 1, 1, 12, 0)
-        mock_randint.return_value = 20
-        mock_input.side_effect = ["John Doe", "delivery", "burger, coke"]
+        mock_estimate.return_value = 20
+        mock_input.side_effect = ["John Doe", "delivery", "burger, coke", "cod"]
         
         self.order_manager.place_order()
         
@@ -69,9 +87,15 @@ class TestOrderManager(unittest.TestCase):
         self.assertEqual(new_order["customer"], "John Doe")
         self.assertEqual(new_order["type"], "Delivery")
         self.assertEqual(new_order["items"], ["burger", "coke"])
-        self.assertEqual(new_order["total_price"], 200.00)
+        # 200 subtotal + 5% tax + 40 delivery fee
+        self.assertEqual(new_order["subtotal"], 200.00)
+        self.assertEqual(new_order["tax"], 10.00)
+        self.assertEqual(new_order["delivery_fee"], 40.00)
+        self.assertEqual(new_order["total_price"], 250.00)
         self.assertEqual(new_order["status"], "Pending")
         self.assertEqual(new_order["expected_delivery_time"], 20)
+        # One pending order ahead in the kitchen
+        self.assertEqual(mock_estimate.call_args[1]["kitchen_queue"], 1)
 
     @patch('order.read_json')
     @patch('order.write_json')
@@ -80,7 +104,7 @@ class TestOrderManager(unittest.TestCase):
     @patch('rich.console.Console.print')
     def test_place_order_takeaway(self, mock_print, mock_view_menu, mock_input, mock_write_json, mock_read_json):
         mock_read_json.return_value = self.test_data
-        mock_input.side_effect = ["Jane Doe", "takeaway", "pizza"]
+        mock_input.side_effect = ["Jane Doe", "takeaway", "pizza", "cod"]
         
         self.order_manager.place_order()
         
@@ -95,9 +119,222 @@ class TestOrderManager(unittest.TestCase):
         self.assertEqual(new_order["customer"], "Jane Doe")
         self.assertEqual(new_order["type"], "Takeaway")
         self.assertEqual(new_order["items"], ["pizza"])
-        self.assertEqual(new_order["total_price"], 300.00)
+        # No delivery fee for takeaway
+        self.assertEqual(new_order["subtotal"], 300.00)
+        self.assertEqual(new_order["total_price"], 315.00)
         self.assertEqual(new_order["status"], "Completed")
         self.assertEqual(new_order["delivery_agent"], "-")
+        # Same fields as a delivery order, so order tables line up
+        self.assertIsNone(new_order["order_time"])
+        self.assertIsNone(new_order["expected_delivery_time"])
+        self.assertEqual(new_order["schema_version"], SCHEMA_VERSION)
+
+    @patch('order.read_json')
+    @patch('order.write_json')
+    @patch('builtins.input')
+    @patch('order.RestaurantManager.view_menu')
+    @patch('rich.console.Console.print')
+    def test_place_order_quantities_and_modifiers(self, mock_print, mock_view_menu, mock_input, mock_write_json, mock_read_json):
+        self.test_data["modifiers"] = {"extra cheese": 30.00}
+        mock_read_json.return_value = self.test_data
+        mock_input.side_effect = ["Jane Doe", "takeaway", "2 x pizza + extra cheese + no onions, coke", "cod"]
+
+        self.order_manager.place_order()
+
+        new_order = mock_write_json.call_args[0][0]["orders"][-1]
+        self.assertEqual(new_order["items"], ["pizza", "coke"])
+        self.assertEqual(new_order["lines"][0],
+                         {"item": "pizza", "quantity": 2, "modifiers": ["extra cheese", "no onions"]})
+        self.assertEqual(new_order["subtotal"], 710.00)
+        self.assertEqual(new_order["total_price"], 745.50)
+
+    @patch('order.read_json')
+    @patch('builtins.input')
+    @patch('order.RestaurantManager.view_menu')
+    @patch('rich.console.Console.print')
+    def test_place_order_invalid_quantity(self, mock_print, mock_view_menu, mock_input, mock_read_json):
+        mock_read_json.return_value = self.test_data
+        mock_input.side_effect = ["John Doe", "delivery", "0 x burger"]
+
+        self.order_manager.place_order()
+
+        mock_print.assert_called_with("[bold red]Invalid quantity in '0 x burger'.[/bold red]")
+
+    @patch('order.read_json')
+    @patch('order.write_json')
+    @patch('builtins.input')
+    @patch('order.RestaurantManager.view_menu')
+    @patch('rich.console.Console.print')
+    def test_place_order_empty_cart(self, mock_print, mock_view_menu, mock_input, mock_write_json, mock_read_json):
+        mock_read_json.return_value = self.test_data
+        mock_input.side_effect = ["John Doe", "takeaway", "  "]
+
+        self.order_manager.place_order()
+
+        mock_print.assert_called_with("[bold red]No items entered.[/bold red]")
+        mock_write_json.assert_not_called()
+        self.assertEqual(mock_input.call_count, 3)  # never asked to pay
+
+    @patch('order.read_json')
+    @patch('order.write_json')
+    @patch('builtins.input')
+    @patch('eta.EtaEstimator.estimate')
+    @patch('order.RestaurantManager.view_menu')
+    @patch('rich.console.Console.print')
+    def test_place_order_queued_when_agents_saturated(self, mock_print, mock_view_menu, mock_estimate,
+                                                      mock_input, mock_write_json, mock_read_json):
+        mock_read_json.return_value = self.test_data
+        mock_estimate.return_value = 90
+        mock_input.side_effect = ["John Doe", "delivery", "burger", "cod"]
+
+        self.order_manager.place_order()
+
+        updated_data = mock_write_json.call_args[0][0]
+        new_order = updated_data["orders"][-1]
+        self.assertEqual(new_order["delivery_agent"], "Not Assigned")
+        self.assertEqual(updated_data["waitlist"], [new_order["id"]])
+        mock_print.assert_any_call("[bold yellow]All delivery agents are busy; your order is #1 in the waiting list.[/bold yellow]")
+
+    @patch('order.read_json')
+    @patch('order.write_json')
+    @patch('builtins.input')
+    @patch('eta.EtaEstimator.estimate')
+    @patch('order.RestaurantManager.view_menu')
+    @patch('rich.console.Console.print')
+    def test_place_order_rejected_when_waitlist_full(self, mock_print, mock_view_menu, mock_estimate,
+                                                     mock_input, mock_write_json, mock_read_json):
+        self.test_data["waitlist"] = list(range(2000, 2020))
+        mock_read_json.return_value = self.test_data
+        mock_estimate.return_value = 90
+        mock_input.side_effect = ["John Doe", "delivery", "burger", "cod"]
+
+        self.order_manager.place_order()
+
+        mock_write_json.assert_not_called()
+        mock_print.assert_called_with("[bold red]All delivery agents are busy and the waiting list is full. "
+                                      "Please try again in 30 mins.[/bold red]")
+
+    @patch('order.read_json')
+    @patch('order.write_json')
+    @patch('builtins.input')
+    @patch('order.RestaurantManager.view_menu')
+    @patch('rich.console.Console.print')
+    def test_place_order_sold_out(self, mock_print, mock_view_menu, mock_input, mock_write_json, mock_read_json):
+        stock = self.order_manager.restaurant_manager.stock
+        stock.set_count("pizza", 1)
+        mock_read_json.return_value = self.test_data
+        mock_input.side_effect = ["John Doe", "takeaway", "2 x pizza, coke", "cod"]
+
+        self.order_manager.place_order()
+
+        mock_write_json.assert_not_called()
+        mock_print.assert_called_with("[bold red]Not enough left of: pizza (1 left).[/bold red]")
+        self.assertEqual(stock.levels(), {"pizza": 1})
+
+    @patch('order.read_json')
+    @patch('order.write_json')
+    @patch('builtins.input')
+    @patch('order.PaymentProcessor.submit')
+    @patch('order.RestaurantManager.view_menu')
+    @patch('rich.console.Console.print')
+    def test_place_order_online_payment_awaits_settlement(self, mock_print, mock_view_menu, mock_submit,
+                                                          mock_input, mock_write_json, mock_read_json):
+        mock_read_json.return_value = self.test_data
+        mock_input.side_effect = ["Jane Doe", "takeaway", "pizza", "cash", "upi"]
+
+        self.order_manager.place_order()
+
+        new_order = mock_write_json.call_args[0][0]["orders"][-1]
+        self.assertEqual(new_order["status"], "Awaiting Payment")
+        self.assertEqual(new_order["payment"], {"method": "upi", "status": "pending", "key": "main-1003"})
+        mock_submit.assert_called_once_with(new_order)
+        mock_print.assert_any_call("[bold red]Invalid payment method. Choose UPI, Card, Wallet or COD.[/bold red]")
+        mock_print.assert_called_with("[bold yellow]Your UPI payment is being processed; "
+                                      "the order is confirmed once it goes through.[/bold yellow]")
+
+    @patch('order.read_json')
+    @patch('order.write_json')
+    @patch('builtins.input')
+    @patch('order.PaymentProcessor.submit')
+    @patch('order.RestaurantManager.view_menu')
+    @patch('rich.console.Console.print')
+    def test_place_order_cash_on_delivery_confirmed_at_once(self, mock_print, mock_view_menu, mock_submit,
+                                                            mock_input, mock_write_json, mock_read_json):
+        mock_read_json.return_value = self.test_data
+        mock_input.side_effect = ["Jane Doe", "takeaway", "pizza", "COD"]
+
+        self.order_manager.place_order()
+
+        new_order = mock_write_json.call_args[0][0]["orders"][-1]
+        self.assertEqual(new_order["status"], "Completed")
+        self.assertEqual(new_order["payment"], {"method": "cod", "status": "due"})
+        mock_submit.assert_not_called()
+        mock_print.assert_called_with("[bold blue]Pay ₹315.00 in cash at pickup.[/bold blue]")
+
+    def test_failed_payment_cancels_deadline_and_notifies(self):
+        sweeper = DeadlineSweeper()
+        self.order_manager.sweeper = sweeper
+        self.order_manager.delivery_manager.outbox = Outbox()
+        order = dict(self.test_data["orders"][0], status="Awaiting Payment")
+        sweeper.schedule(order)
+        order["status"] = "Payment Failed"
+        self.order_manager.payment_settled(order)
+        self.assertEqual(len(sweeper), 0)
+        self.assertEqual([n.channel for n in self.order_manager.delivery_manager.outbox.take(10)], ["push", "sms"])
+
+    @patch('order.read_snapshot')
+    def test_late_delivery_notifies_customer(self, mock_read_snapshot):
+        self.test_data["orders"][0]["order_time"] = "2023-01-01 12:00:00"
+        mock_read_snapshot.return_value = self.test_data
+        sweeper = DeadlineSweeper()
+        order_manager = OrderManager(sweeper, storage=self.storage)
+        self.addCleanup(order_manager.payments.shutdown)
+        order_manager.delivery_manager.outbox = Outbox()
+        sweeper.sync(self.test_data["orders"])
+        sweeper.tick()
+        sweeper.tick()  # a breach is reported once
+        sent = order_manager.delivery_manager.outbox.take(10)
+        self.assertEqual([(n.recipient, n.channel, n.text) for n in sent],
+                         [("test", "push", "Order 1001 is running late. Sorry for the wait!")])
+
+    @patch('order.read_json')
+    @patch('order.write_json')
+    @patch('builtins.input')
+    @patch('eta.EtaEstimator.estimate')
+    @patch('order.RestaurantManager.view_menu')
+    @patch('rich.console.Console.print')
+    def test_place_order_reserves_and_releases_on_reject(self, mock_print, mock_view_menu, mock_estimate,
+                                                         mock_input, mock_write_json, mock_read_json):
+        stock = self.order_manager.restaurant_manager.stock
+        stock.set_count("pizza", 2)
+        mock_read_json.return_value = self.test_data
+        mock_input.side_effect = ["John Doe", "takeaway", "pizza", "cod", "Jane Doe", "delivery", "pizza", "upi"]
+        self.test_data["waitlist"] = list(range(2000, 2020))
+        mock_estimate.return_value = 90
+
+        self.order_manager.place_order()
+        self.assertEqual(stock.levels(), {"pizza": 1})
+        self.order_manager.place_order()  # rejected: no agent and a full waiting list
+
+        self.assertEqual(stock.levels(), {"pizza": 1})
+        mock_write_json.assert_called_once()
+
+    @patch('order.read_json')
+    @patch('order.write_json')
+    @patch('builtins.input')
+    @patch('order.RestaurantManager.view_menu')
+    @patch('rich.console.Console.print')
+    def test_place_order_corrects_misspelt_item(self, mock_print, mock_view_menu, mock_input, mock_write_json,
+                                                mock_read_json):
+        mock_read_json.return_value = self.test_data
+        mock_input.side_effect = ["Jane Doe", "takeaway", "2 x piza", "cod"]
+
+        self.order_manager.place_order()
+
+        mock_print.assert_any_call("[bold yellow]Using 'pizza' for 'piza'.[/bold yellow]")
+        new_order = mock_write_json.call_args[0][0]["orders"][-1]
+        self.assertEqual(new_order["items"], ["pizza"])
+        self.assertEqual(new_order["subtotal"], 600.00)
 
     @patch('order.read_json')
     @patch('builtins.input')
@@ -113,11 +350,63 @@ class TestOrderManager(unittest.TestCase):
         mock_print.assert_called_with("[bold red]Item 'invalid_item' is not available in the menu.[/bold red]")
 
     @patch('order.read_json')
+    @patch('order.write_json')
     @patch('builtins.input')
     @patch('rich.console.Console.print')
-    @patch('order.datetime')
-    def test_track_order_delivery_pending(self, mock_datetime, mock_print, mock_input, mock_read_json):
+    def test_rate_order(self, mock_print, mock_input, mock_write_json, mock_read_json):
+        order = self.test_data["orders"][0]
+        order["status"] = "Delivered"
         mock_read_json.return_value = self.test_data
+        mock_input.side_effect = ["Test", "1001", "5", "six", "4", "Quick delivery"]
+
+        self.order_manager.rate_order()
+
+        self.assertEqual({key: order["feedback"][key] for key in ("food", "delivery", "comment")},
+                         {"food": 5, "delivery": 4, "comment": "Quick delivery"})
+        mock_write_json.assert_called_once()
+        mock_print.assert_any_call("[bold red]Please enter a whole number from 1 to 5.[/bold red]")
+        mock_print.assert_called_with("[bold green]Thank you for your feedback![/bold green]")
+        summary = self.order_manager.restaurant_manager.feedback.summary()
+        self.assertEqual(summary["items"]["burger"].mean, 5)
+        self.assertEqual(summary["agents"]["bob"].mean, 4)
+
+    @patch('order.read_json')
+    @patch('order.write_json')
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_rate_takeaway_order_skips_delivery(self, mock_print, mock_input, mock_write_json, mock_read_json):
+        mock_read_json.return_value = self.test_data
+        mock_input.side_effect = ["test2", "1002", "3", ""]
+
+        self.order_manager.rate_order()
+
+        self.assertIsNone(self.test_data["orders"][1]["feedback"]["delivery"])
+        self.assertEqual(self.order_manager.restaurant_manager.feedback.summary()["agents"], {})
+
+    @patch('order.read_json')
+    @patch('order.write_json')
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_rate_order_refused(self, mock_print, mock_input, mock_write_json, mock_read_json):
+        mock_read_json.return_value = self.test_data
+        self.test_data["orders"][1]["feedback"] = {"food": 4}
+        cases = [
+            (["someone else", "1001"], "[bold red]Order not found![/bold red]"),
+            (["test", "1001"], "[bold yellow]You can rate order 1001 once it has been delivered.[/bold yellow]"),
+            (["test2", "1002"], "[bold yellow]You have already rated order 1002.[/bold yellow]"),
+        ]
+        for inputs, message in cases:
+            mock_input.side_effect = inputs
+            self.order_manager.rate_order()
+            mock_print.assert_called_with(message)
+        mock_write_json.assert_not_called()
+
+    @patch('order.read_snapshot')
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    @patch('order.datetime')
+    def test_track_order_delivery_pending(self, mock_datetime, mock_print, mock_input, mock_read_snapshot):
+        mock_read_snapshot.return_value = self.test_data
         order_time = datetime.now() - timedelta(minutes=10)  # Order placed 10 minutes ago
         self.test_data["orders"][0]["order_time"] = order_time.strftime("%Y-%m-%d %H:%M:%S")
         mock_datetime.now.return_value = datetime.now()
@@ -126,47 +415,144 @@ class TestOrderManager(unittest.TestCase):
         
         self.order_manager.track_order()
         
-        mock_read_json.assert_called_once()
+        mock_read_snapshot.assert_called_once()
         # Should print the remaining time (30 - 10 = 20 minutes)
         mock_print.assert_any_call("[bold blue]Estimated time left for delivery: 20 mins[/bold blue]")
 
-    @patch('order.read_json')
+    @patch('order.read_snapshot')
     @patch('builtins.input')
     @patch('rich.console.Console.print')
-    def test_track_order_takeaway(self, mock_print, mock_input, mock_read_json):
-        mock_read_json.return_value = self.test_data
+    def test_track_order_running_late(self, mock_print, mock_input, mock_read_snapshot):
+        self.test_data["orders"][0]["order_time"] = "2023-01-01 12:00:00"
+        mock_read_snapshot.return_value = self.test_data
+        mock_input.return_value = "1001"
+        self.order_manager.sweeper = DeadlineSweeper()
+        self.order_manager.sweeper.sync(self.test_data["orders"])
+        self.order_manager.sweeper.tick()
+
+        self.order_manager.track_order()
+
+        mock_print.assert_any_call("[bold blue]Estimated time left for delivery: 0 mins[/bold blue]")
+        mock_print.assert_called_with("[bold red]This order is running late.[/bold red]")
+
+    @patch('order.read_snapshot')
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_track_order_shows_agent_location(self, mock_print, mock_input, mock_read_snapshot):
+        mock_read_snapshot.return_value = self.test_data
+        mock_input.return_value = "1001"
+        now = time.time()
+        self.order_manager.locations.ingest("bob", 0.0, 0.0, now - 3600)
+        self.order_manager.locations.ingest("bob", 0.1, 0.0, now)
+
+        self.order_manager.track_order()
+
+        mock_print.assert_called_with("[bold blue]Your delivery agent was at (0.10000, 0.00000) 0s ago, "
+                                      "moving at 11 km/h.[/bold blue]")
+
+    @patch('order.read_snapshot')
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_track_order_takeaway(self, mock_print, mock_input, mock_read_snapshot):
+        mock_read_snapshot.return_value = self.test_data
         mock_input.return_value = "1002"  # Second order in test data (takeaway)
         
         self.order_manager.track_order()
         
-        mock_read_json.assert_called_once()
+        mock_read_snapshot.assert_called_once()
         # Should not print estimated time for takeaway
         for call in mock_print.call_args_list:
             self.assertNotIn("Estimated time left for delivery", str(call))
 
-    @patch('order.read_json')
+    @patch('order.read_snapshot')
     @patch('builtins.input')
     @patch('rich.console.Console.print')
-    def test_track_order_not_found(self, mock_print, mock_input, mock_read_json):
-        mock_read_json.return_value = self.test_data
+    def test_track_order_payment_failed(self, mock_print, mock_input, mock_read_snapshot):
+        self.test_data["orders"][0]["status"] = "Payment Failed"
+        mock_read_snapshot.return_value = self.test_data
+        mock_input.return_value = "1001"
+        self.order_manager.track_order()
+        for call in mock_print.call_args_list:
+            self.assertNotIn("Estimated time left for delivery", str(call))
+
+    @patch('order.read_snapshot')
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_track_order_not_found(self, mock_print, mock_input, mock_read_snapshot):
+        mock_read_snapshot.return_value = self.test_data
         mock_input.return_value = "9999"  # Non-existent order
         
         self.order_manager.track_order()
         
-        mock_read_json.assert_called_once()
+        mock_read_snapshot.assert_called_once()
         mock_print.assert_called_with("[bold red]Order not found![/bold red]")
 
-    @patch('order.read_json')
+    @patch('order.read_snapshot')
     @patch('builtins.input')
     @patch('rich.console.Console.print')
-    def test_track_order_invalid_id(self, mock_print, mock_input, mock_read_json):
-        mock_read_json.return_value = self.test_data
+    def test_track_order_invalid_id(self, mock_print, mock_input, mock_read_snapshot):
+        mock_read_snapshot.return_value = self.test_data
         mock_input.return_value = "abc"  # Invalid order ID format
         
         self.order_manager.track_order()
         
-        mock_read_json.assert_called_once()
+        mock_read_snapshot.assert_called_once()
         mock_print.assert_called_with("[bold red]Invalid Order ID. Please enter a number.[/bold red]")
 
+    @patch('order.read_snapshot')
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_my_orders(self, mock_print, mock_input, mock_read_snapshot):
+        self.test_data["orders"].append(dict(self.test_data["orders"][1], id=1003, customer="Test"))
+        mock_read_snapshot.return_value = self.test_data
+        mock_input.return_value = "test"
+
+        self.order_manager.my_orders()
+
+        # Only the active delivery order is listed, with its live ETA
+        table = mock_print.call_args[0][0]
+        self.assertEqual(table.row_count, 1)
+        self.assertEqual([column.header for column in table.columns],
+                         ["id", "type", "items", "status", "delivery_agent", "total_price", "eta"])
+        self.assertEqual(list(table.columns[0].cells), ["1001"])
+        self.assertIn(list(table.columns[6].cells)[0], ("29", "30"))
+
+    @patch('order.read_snapshot')
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_my_orders_lists_lines_and_late_orders(self, mock_print, mock_input, mock_read_snapshot):
+        self.test_data["orders"][0]["lines"] = [{"item": "burger", "quantity": 2, "modifiers": ["extra cheese"]}]
+        mock_read_snapshot.return_value = self.test_data
+        mock_input.return_value = "test"
+        self.order_manager.sweeper = MagicMock(late={1001})
+
+        self.order_manager.my_orders()
+
+        table = mock_print.call_args_list[-2][0][0]
+        self.assertEqual(list(table.columns[2].cells), ["2 x burger + extra cheese"])
+        mock_print.assert_called_with("[bold red]Running late: 1001[/bold red]")
+
+    @patch('order.read_snapshot')
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_my_orders_only_past_orders(self, mock_print, mock_input, mock_read_snapshot):
+        mock_read_snapshot.return_value = self.test_data
+        mock_input.return_value = "test2"
+
+        self.order_manager.my_orders()
+
+        mock_print.assert_called_with("[bold yellow]You have no active orders (1 past).[/bold yellow]")
+
+    @patch('order.read_snapshot')
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_my_orders_none(self, mock_print, mock_input, mock_read_snapshot):
+        mock_read_snapshot.return_value = self.test_data
+        mock_input.return_value = "nobody"
+
+        self.order_manager.my_orders()
+
+        mock_print.assert_called_with("[bold yellow]You have no orders yet.[/bold yellow]")
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add the src directory to path for importing modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import output
+from output import LazyConsole, PlainTable, group, make_table, set_plain, strip_markup
+
+class TestPlainOutput(unittest.TestCase):
+    def setUp(self):
+        set_plain(True)
+        self.addCleanup(set_plain, False)
+
+    def test_strip_markup(self):
+        self.assertEqual(strip_markup("[bold red]Order not found![/bold red]"), "Order not found!")
+        self.assertEqual(strip_markup("[yellow]1.[/yellow] Customer"), "1. Customer")
+        self.assertEqual(strip_markup("items: [1, 2] []"), "items: [1, 2] []")
+
+    def test_plain_table(self):
+        table = make_table("Orders")
+        self.assertIsInstance(table, PlainTable)
+        table.add_column("ID", justify="center", style="cyan")
+        table.add_column("Status")
+        table.add_row("1001", "[bold red]Pending[/bold red]", style="bold red")
+        table.caption = "1 order"
+        self.assertEqual(table.row_count, 1)
+        self.assertEqual(list(table.columns[1].cells), ["Pending"])
+        self.assertEqual(str(table), "Orders\nID    Status\n----  -------\n1001  Pending\n1 order")
+
+    def test_plain_group(self):
+        first, second = PlainTable("A"), PlainTable("B")
+        self.assertEqual(group(first, second).renderables, [first, second])
+
+    @patch('builtins.print')
+    def test_console_prints_plain_text_without_rich(self, mock_print):
+        console = LazyConsole()
+        console.print("[bold green]Welcome![/bold green]")
+        mock_print.assert_called_once_with("Welcome!")
+        self.assertIsNone(console._console)
+
+class TestRichOutput(unittest.TestCase):
+    @patch('rich.console.Console.print')
+    def test_console_creates_rich_console_on_first_print(self, mock_print):
+        console = LazyConsole()
+        self.assertIsNone(console._console)
+        console.print("[bold]hi[/bold]")
+        mock_print.assert_called_once_with("[bold]hi[/bold]")
+        self.assertIsNotNone(console._console)
+
+    def test_make_table_is_rich_by_default(self):
+        from rich.table import Table
+        self.assertFalse(output.is_plain())
+        self.assertIsInstance(make_table("Orders"), Table)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,274 @@
+import unittest
+import sys
+import os
+import copy
+import time
+from unittest.mock import patch
+
+# Add the src directory to path for importing modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import recovery
+from delivery import DeliveryManager
+from order import OrderManager
+from pricing import OrderLine
+from payments import WRITE_ATTEMPTS, GatewayTimeout, PaymentDeclined, PaymentProcessor, StubGateway, benchmark
+from stock import StockLedger
+from storage import MemoryStorage
+from utils import DEFAULT_DATA, locked_update, read_json, write_json
+
+def instant_gateway(**rates):
+    return StubGateway(latency=(0, 0), **dict({"decline_rate": 0, "timeout_rate": 0}, **rates))
+
+class LostFirstReply(StubGateway):
+    """Charges on the first call but times out before answering it"""
+
+    def charge(self, key, amount, method):
+        try:
+            return super().charge(key, amount, method)
+        finally:
+            self.timeout_rate = 0
+
+class TestStubGateway(unittest.TestCase):
+    def test_same_key_charges_once(self):
+        gateway = instant_gateway()
+        first = gateway.charge("main-1001", 315.0, "upi")
+        self.assertEqual(gateway.charge("main-1001", 315.0, "upi"), first)
+        self.assertEqual(gateway.charges, [first])
+        self.assertEqual(gateway.calls, 2)
+
+    def test_declined(self):
+        gateway = instant_gateway(decline_rate=1)
+        with self.assertRaises(PaymentDeclined):
+            gateway.charge("main-1001", 315.0, "card")
+        self.assertEqual(gateway.charges, [])
+
+    def test_timeout_after_charging(self):
+        gateway = instant_gateway(timeout_rate=1)
+        with self.assertRaises(GatewayTimeout):
+            gateway.charge("main-1001", 315.0, "wallet")
+        self.assertEqual(len(gateway.charges), 1)
+
+class TestPaymentProcessor(unittest.TestCase):
+    def setUp(self):
+        self.storage = MemoryStorage()
+        self.stock = StockLedger(storage=self.storage)
+        self.gateway = instant_gateway()
+        self.processor = self.make_processor(self.gateway)
+        write_json(copy.deepcopy(DEFAULT_DATA), storage=self.storage)
+
+    def make_processor(self, gateway, **options):
+        processor = PaymentProcessor(gateway=gateway, stock=self.stock, retry_delay=0, storage=self.storage, **options)
+        self.addCleanup(processor.shutdown)
+        return processor
+
+    def place(self, processor, order_id=1001, order_type="Delivery", method="upi", waitlisted=False):
+        order = {"id": order_id, "customer": "alice", "type": order_type, "items": ["pizza"],
+                 "lines": [{"item": "pizza", "quantity": 2, "modifiers": []}], "total_price": 670.0,
+                 "status": "Pending" if order_type == "Delivery" else "Completed", "delivery_agent": "bob"}
+        processor.open(order, method)
+        data = read_json(storage=self.storage)
+        data["orders"].append(order)
+        if waitlisted:
+            data.setdefault("waitlist", []).append(order_id)
+        write_json(data, storage=self.storage)
+        return order
+
+    def saved(self, order_id=1001):
+        return next(order for order in read_json(storage=self.storage)["orders"] if order["id"] == order_id)
+
+    def test_paid_delivery_order_is_confirmed(self):
+        order = self.place(self.processor)
+        self.assertEqual(order["status"], "Awaiting Payment")
+        self.processor.submit(order).result()
+        saved = self.saved()
+        self.assertEqual(saved["status"], "Pending")
+        self.assertEqual(saved["payment"]["status"], "paid")
+        self.assertEqual(saved["payment"]["charge_id"], self.gateway.charges[0].charge_id)
+        self.assertEqual(self.processor.ledger()["main-1001"]["status"], "paid")
+
+    def test_paid_takeaway_order_is_completed(self):
+        order = self.place(self.processor, order_type="Takeaway")
+        self.processor.submit(order).result()
+        self.assertEqual(self.saved()["status"], "Completed")
+
+    def test_cash_on_delivery_needs_no_gateway(self):
+        order = self.place(self.processor, method="cod")
+        self.assertEqual(order["status"], "Pending")
+        self.assertEqual(order["payment"], {"method": "cod", "status": "due"})
+
+    def test_declined_order_fails_and_gives_back_stock(self):
+        self.stock.set_count("pizza", 2)
+        self.stock.reserve([OrderLine("pizza", 2, ())])
+        processor = self.make_processor(instant_gateway(decline_rate=1))
+        settled = []
+        processor.subscribe(settled.append)
+        order = self.place(processor, waitlisted=True)
+
+        processor.submit(order).result()
+
+        saved = self.saved()
+        self.assertEqual(saved["status"], "Payment Failed")
+        self.assertEqual(saved["payment"]["status"], "declined")
+        self.assertEqual(read_json(storage=self.storage)["waitlist"], [])
+        self.assertEqual(self.stock.levels(), {"pizza": 2})
+        self.assertEqual([order["id"] for order in settled], [1001])
+
+    def test_timeout_is_retried_with_the_same_key(self):
+        gateway = LostFirstReply(latency=(0, 0), decline_rate=0, timeout_rate=1)
+        processor = self.make_processor(gateway)
+        processor.submit(self.place(processor)).result()
+        self.assertEqual(gateway.calls, 2)
+        self.assertEqual(len(gateway.charges), 1)
+        self.assertEqual(self.saved()["status"], "Pending")
+
+    def test_unanswered_payment_stays_pending(self):
+        gateway = instant_gateway(timeout_rate=1)
+        processor = self.make_processor(gateway, retries=2)
+        processor.submit(self.place(processor)).result()
+        self.assertEqual(gateway.calls, 3)
+        self.assertEqual(self.saved()["status"], "Awaiting Payment")
+        self.assertEqual(processor.ledger()["main-1001"]["status"], "pending")
+
+    def test_resubmitting_never_charges_twice(self):
+        order = self.place(self.processor)
+        self.processor.submit(order)
+        self.processor.submit(order)
+        self.processor.drain()
+        self.assertEqual(len(self.gateway.charges), 1)
+        self.assertEqual(self.saved()["status"], "Pending")
+
+    def test_resume_applies_settled_and_resubmits_pending(self):
+        self.place(self.processor, 1001)
+        self.place(self.processor, 1002)
+
+        def settled_while_away(ledger):
+            ledger = ledger or {}
+            ledger["main-1001"] = {"order_id": 1001, "amount": 670.0, "method": "upi", "lines": [],
+                                   "status": "paid", "charge_id": "ch_earlier"}
+            return ledger, None
+
+        locked_update(self.processor.path, settled_while_away, {}, self.storage)
+        futures = self.processor.resume()
+        for future in futures:
+            future.result()
+        self.assertEqual(len(futures), 1)
+        self.assertEqual(self.saved(1001)["payment"]["charge_id"], "ch_earlier")
+        self.assertEqual(self.saved(1002)["status"], "Pending")
+        self.assertEqual(self.gateway.calls, 1)
+
+    def test_settlement_overwritten_by_intake_is_put_back(self):
+        order = self.place(self.processor)
+        stale = read_json(storage=self.storage)
+        self.processor.submit(order).result()
+        self.processor.apply_settled(stale)  # what order intake does before it saves
+        write_json(stale, storage=self.storage)
+        self.assertEqual(self.saved()["status"], "Pending")
+
+    def test_settlement_losing_a_write_is_applied_again(self):
+        order = self.place(self.processor, order_type="Takeaway")
+        save = self.storage.save
+        written = []
+
+        def another_terminal_first(name, data, expected_version=None):
+            if name != "data.json":
+                return save(name, data, expected_version)
+            if not written:
+                other = self.storage.load(name)
+                other["delivery_agents"].append("carol")
+                save(name, other)
+            written.append(data["orders"][0]["status"])
+            return save(name, data, expected_version)
+
+        with patch.object(self.storage, "save", side_effect=another_terminal_first):
+            self.processor.submit(order).result()
+        self.assertEqual(written, ["Completed", "Completed"])
+        self.assertEqual(self.saved()["status"], "Completed")
+        self.assertIn("carol", read_json(storage=self.storage)["delivery_agents"])
+
+    @patch('builtins.print')
+    def test_failed_write_is_not_retried(self, mock_print):
+        self.place(self.processor)
+
+        def settled(ledger):
+            ledger = ledger or {}
+            ledger["main-1001"] = {"order_id": 1001, "amount": 670.0, "method": "upi", "lines": [],
+                                   "status": "paid", "charge_id": "ch_1"}
+            return ledger, None
+
+        locked_update(self.processor.path, settled, {}, self.storage)
+        with patch.object(self.storage, "save", return_value=False) as mock_save:
+            self.assertEqual(self.processor.apply(), [])
+        mock_save.assert_called_once()
+        self.assertIn("could not write data.json", mock_print.call_args[0][0])
+        self.assertEqual(self.saved()["status"], "Awaiting Payment")
+        self.processor.apply()  # the ledger still has it for the next save
+        self.assertEqual(self.saved()["status"], "Pending")
+
+    @patch('builtins.print')
+    def test_gives_up_under_sustained_contention(self, mock_print):
+        order = self.place(self.processor)
+        save = self.storage.save
+
+        attempts = []
+
+        def always_lose(name, data, expected_version=None):
+            if name == "data.json" and expected_version is not None:
+                attempts.append(expected_version)
+                save(name, self.storage.load(name))  # another writer gets there first every time
+            return save(name, data, expected_version)
+
+        with patch.object(self.storage, "save", side_effect=always_lose):
+            self.assertEqual(self.processor.submit(order).result(), [])
+        self.assertEqual(len(attempts), WRITE_ATTEMPTS)
+        self.assertEqual(self.saved()["status"], "Awaiting Payment")
+        self.assertIn(f"gave up after {WRITE_ATTEMPTS} attempts", mock_print.call_args[0][0])
+
+    @patch('rich.console.Console.print')
+    def test_settlement_is_kept_by_every_writer(self, mock_print):
+        delivery = DeliveryManager(storage=self.storage)
+        orders = OrderManager(delivery_manager=delivery, payments=self.processor, storage=self.storage)
+        self.place(self.processor, 1010, "Takeaway", "cod")
+        self.place(self.processor, 1011, method="cod")
+        # (command, answers, answer given once the command has read the data file)
+        writers = [(delivery.signup_login, ["alice"], 0),
+                   (lambda: delivery.update_order_status("bob"), ["1011", "picked up"], 0),
+                   (lambda: delivery.batch_update_status("bob"), ["all", "picked up"], 0),
+                   (orders.rate_order, ["alice", "1010", "5", ""], 0),
+                   (orders.restaurant_manager.edit_menu, ["1", "dosa", "90", "5"], 1)]
+        for order_id, (command, answers, settle_at) in enumerate(writers, 1001):
+            order = self.place(self.processor, order_id)
+            answered = []
+
+            def answer(prompt=""):
+                if len(answered) == settle_at:
+                    self.processor.submit(order).result()  # lands between the command's read and its write
+                answered.append(answers[len(answered)])
+                return answered[-1]
+
+            with patch('builtins.input', side_effect=answer):
+                command()
+            self.assertEqual(self.saved(order_id)["status"], "Pending", command)
+        self.assertEqual([self.saved(order_id)["status"] for order_id in (1001, 1011)], ["Picked Up", "Picked Up"])
+        self.assertTrue(self.saved(1010)["feedback"])
+        self.assertIn("dosa", read_json(storage=self.storage)["menu"])
+
+    def test_intake_waits_only_when_the_pool_is_full(self):
+        processor = self.make_processor(StubGateway(latency=(0.2, 0.2), decline_rate=0, timeout_rate=0),
+                                         workers=1, max_pending=1)
+        started = time.perf_counter()
+        processor.submit(self.place(processor, 1001))
+        self.assertLess(time.perf_counter() - started, 0.2)
+        processor.submit(self.place(processor, 1002))
+        self.assertGreaterEqual(time.perf_counter() - started, 0.2)
+        processor.drain()
+        self.assertEqual([self.saved(order_id)["status"] for order_id in (1001, 1002)], ["Pending", "Pending"])
+
+class TestPaymentBenchmark(unittest.TestCase):
+    def test_background_payments_do_not_slow_intake(self):
+        with patch.dict(recovery._journals, clear=True):
+            results = benchmark(orders=10, latency=0.05, workers=4)
+        self.assertGreater(results["background"][0], 2 * results["inline"][0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import sys
+import os
+
+# Add the src directory to path for importing modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from pricing import OrderLine, PriceTable, parse_cart, parse_line
+
+class TestPricing(unittest.TestCase):
+    def setUp(self):
+        self.table = PriceTable({"pizza": 300.00, "coke": 50.00, "chicken wings": 200.00},
+                                {"extra cheese": 30.00, "large": 50.00})
+
+    def test_parse_line(self):
+        self.assertEqual(parse_line("pizza"), OrderLine("pizza", 1, ()))
+        self.assertEqual(parse_line(" 2 x Pizza + Extra Cheese "), OrderLine("pizza", 2, ("extra cheese",)))
+        self.assertEqual(parse_line("3 chicken wings"), OrderLine("chicken wings", 3, ()))
+
+    def test_parse_line_rejects_zero_quantity(self):
+        with self.assertRaises(ValueError):
+            parse_line("0 x pizza")
+
+    def test_parse_cart_skips_empty_entries(self):
+        self.assertEqual(len(parse_cart("pizza, , coke")), 2)
+
+    def test_parse_cart_rejects_empty_cart(self):
+        for text in ("", "   ", " , ,"):
+            with self.assertRaisesRegex(ValueError, "No items entered"):
+                parse_cart(text)
+
+    def test_line_amount(self):
+        self.assertEqual(self.table.line_amount(parse_line("2 x pizza + large + extra cheese")), 760.00)
+        # Unknown modifiers are free special requests
+        self.assertEqual(self.table.line_amount(parse_line("pizza + no onions")), 300.00)
+
+    def test_unknown_item(self):
+        with self.assertRaises(KeyError):
+            self.table.line_amount(parse_line("sushi"))
+
+    def test_quote_delivery(self):
+        quote = self.table.quote(parse_cart("pizza, 2 x coke"), "delivery")
+        self.assertEqual(quote, {"subtotal": 400.00, "tax": 20.00, "delivery_fee": 40.00, "total": 460.00})
+
+    def test_quote_takeaway(self):
+        quote = self.table.quote(parse_cart("coke"), "takeaway")
+        self.assertEqual(quote, {"subtotal": 50.00, "tax": 2.50, "delivery_fee": 0.0, "total": 52.50})
+
+    def test_quote_many(self):
+        carts = [(parse_cart("pizza"), "takeaway"), (parse_cart("pizza, coke"), "delivery")]
+        quotes = self.table.quote_many(carts)
+        self.assertEqual([quote["total"] for quote in quotes], [315.00, 407.50])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+import sys
+import os
+import copy
+from datetime import datetime
+from unittest.mock import patch
+
+# Add the src directory to path for importing modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from query import OrderIndex, index_for
+from storage import MemoryStorage
+
+class TestOrderIndex(unittest.TestCase):
+    def setUp(self):
+        self.orders = [
+            {"id": 1001, "customer": "Alice", "type": "Delivery", "status": "Pending",
+             "delivery_agent": "bob", "order_time": "2023-01-01 12:00:00"},
+            {"id": 1002, "customer": "carol", "type": "Takeaway", "status": "Completed",
+             "delivery_agent": "-"},
+            {"id": 1003, "customer": "alice ", "type": "Delivery", "status": "Delivered",
+             "delivery_agent": "bob", "order_time": "2023-01-01 12:30:00"},
+            {"id": 1004, "customer": "dave", "type": "Delivery", "status": "Pending",
+             "delivery_agent": "eve", "order_time": "2023-01-01 12:50:00"}
+        ]
+        self.index = OrderIndex(self.orders)
+
+    def ids(self, orders):
+        return [order["id"] for order in orders]
+
+    def test_get(self):
+        self.assertIs(self.index.get(1003), self.orders[2])
+        self.assertIsNone(self.index.get(9999))
+
+    def test_by_status(self):
+        self.assertEqual(self.ids(self.index.by_status("Pending")), [1001, 1004])
+        self.assertEqual(self.index.by_status("Picked Up"), [])
+
+    def test_by_agent_active(self):
+        self.assertEqual(self.ids(self.index.by_agent("bob")), [1001, 1003])
+        self.assertEqual(self.ids(self.index.by_agent("bob", active=True)), [1001])
+
+    def test_by_customer_normalises_name(self):
+        self.assertEqual(self.ids(self.index.by_customer("ALICE")), [1001, 1003])
+
+    def test_placed_between(self):
+        start = datetime(2023, 1, 1, 12, 15)
+        end = datetime(2023, 1, 1, 13, 0)
+        self.assertEqual(self.ids(self.index.placed_between(start, end)), [1003, 1004])
+
+    def test_older_than(self):
+        now = datetime(2023, 1, 1, 13, 0)
+        self.assertEqual(self.ids(self.index.older_than("Pending", 30, now)), [1001])
+
+    def test_add_is_incremental(self):
+        order = {"id": 1005, "customer": "dave", "type": "Delivery", "status": "Pending",
+                 "delivery_agent": "bob", "order_time": "2023-01-01 12:10:00"}
+        self.orders.append(order)
+        self.index.add(order)
+        self.assertIs(self.index.get(1005), order)
+        self.assertEqual(self.ids(self.index.by_customer("dave")), [1004, 1005])
+        self.assertEqual(self.ids(self.index.by_agent("bob", active=True)), [1001, 1005])
+
+    def test_set_status_moves_buckets(self):
+        self.index.set_status(self.orders[0], "Delivered")
+        self.assertEqual(self.orders[0]["status"], "Delivered")
+        self.assertEqual(self.ids(self.index.by_status("Pending")), [1004])
+        self.assertEqual(self.index.by_agent("bob", active=True), [])
+
+    def test_set_agent_moves_buckets(self):
+        self.index.set_agent(self.orders[3], "bob")
+        self.assertEqual(self.index.by_agent("eve"), [])
+        self.assertEqual(self.ids(self.index.by_agent("bob", active=True)), [1001, 1004])
+
+    def test_synced_carries_changes_of_a_later_read(self):
+        later = copy.deepcopy(self.orders)
+        later[0]["status"] = "Out for Delivery"
+        later[3]["delivery_agent"] = "bob"
+        later.append({"id": 1005, "customer": "carol", "type": "Delivery", "status": "Pending",
+                      "delivery_agent": "-", "order_time": "2023-01-01 13:00:00"})
+        synced = self.index.synced(later)
+        fresh = OrderIndex(later)
+        for status in ("Pending", "Out for Delivery", "Delivered"):
+            self.assertEqual(synced.by_status(status), fresh.by_status(status))
+        self.assertEqual(self.ids(synced.by_agent("bob", active=True)), [1001, 1004])
+        self.assertEqual(self.ids(synced.by_customer("carol")), [1002, 1005])
+        self.assertIs(synced.get(1005), later[4])
+        # The index it was synced from still describes its own read
+        self.assertEqual(self.ids(self.index.by_status("Pending")), [1001, 1004])
+        self.assertEqual(self.ids(self.index.by_agent("eve")), [1004])
+        self.index.set_status(self.orders[3], "Delivered")
+        self.assertEqual(self.ids(synced.by_status("Pending")), [1004, 1005])
+
+    def test_synced_undoes_changes_that_were_never_saved(self):
+        saved = copy.deepcopy(self.orders)
+        self.index.set_status(self.orders[0], "Delivered")
+        self.index.set_agent(self.orders[2], "eve")
+        synced = self.index.synced(saved)
+        self.assertEqual(self.ids(synced.by_status("Pending")), [1001, 1004])
+        self.assertEqual(self.ids(synced.by_agent("bob", active=True)), [1001])
+        self.assertEqual(self.ids(synced.by_agent("eve")), [1004])
+
+    def test_synced_rejects_another_history(self):
+        other = copy.deepcopy(self.orders)
+        other[0]["customer"] = "zoe"
+        self.assertIsNone(self.index.synced(other))
+        self.assertIsNone(self.index.synced(self.orders[:2]))
+
+    def test_index_for_keeps_an_index_per_data_file(self):
+        storage = MemoryStorage()
+        data = {"orders": self.orders}
+        index = index_for(data, "north", storage)
+        self.assertIs(index_for(data, "north", storage), index)
+        south = {"orders": self.orders[:1]}
+        other = index_for(south, "south", storage)
+        self.assertIs(index_for(data, "north", storage), index)  # another restaurant does not evict it
+        self.assertIs(index_for(south, "south", storage), other)
+        with patch.object(OrderIndex, "__init__", side_effect=AssertionError("rebuilt")):
+            later = index_for({"orders": copy.deepcopy(self.orders)}, "north", storage)
+        self.assertEqual(self.ids(later.by_status("Pending")), [1001, 1004])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add the src directory to path for importing modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from ratings import FeedbackStore, RatingAggregate, parse_stars
+
+class TestRatingAggregate(unittest.TestCase):
+    def test_running_totals(self):
+        aggregate = RatingAggregate(window=3)
+        self.assertIsNone(aggregate.mean)
+        self.assertIsNone(aggregate.recent_mean)
+        for stars in (5, 4, 1, 2):
+            aggregate.add(stars)
+        self.assertEqual(aggregate.count, 4)
+        self.assertEqual(aggregate.mean, 3)
+        self.assertEqual(aggregate.histogram, [1, 1, 0, 1, 1])
+        # Only the last three ratings are in the window
+        self.assertEqual(list(aggregate.recent), [4, 1, 2])
+        self.assertEqual(aggregate.recent_mean, 7 / 3)
+
+    def test_round_trip(self):
+        aggregate = RatingAggregate(window=3)
+        for stars in (5, 4, 1, 2):
+            aggregate.add(stars)
+        restored = RatingAggregate.from_dict(aggregate.to_dict(), window=3)
+        restored.add(5)
+        self.assertEqual((restored.count, restored.mean, restored.recent_mean), (5, 17 / 5, 8 / 3))
+
+    def test_smaller_window_after_restart(self):
+        aggregate = RatingAggregate(window=4)
+        for stars in (1, 2, 3, 4):
+            aggregate.add(stars)
+        self.assertEqual(RatingAggregate.from_dict(aggregate.to_dict(), window=2).recent_mean, 3.5)
+
+    def test_parse_stars(self):
+        self.assertEqual(parse_stars(" 4 "), 4)
+        for text in ("0", "6", "4.5", "great", ""):
+            self.assertIsNone(parse_stars(text))
+
+class TestFeedbackStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.store = FeedbackStore(path=os.path.join(self.temp_dir, "ratings"))
+        self.orders = [
+            {"id": 1001, "customer": "alice", "items": ["pizza", "pizza", "coke"], "delivery_agent": "bob",
+             "feedback": {"food": 5, "delivery": 4, "comment": "great", "time": "2023-01-01 12:00:00"}},
+            {"id": 1002, "customer": "carol", "items": ["pizza"], "delivery_agent": "-",
+             "feedback": {"food": 3, "delivery": None, "comment": "", "time": "2023-01-01 12:30:00"}},
+            {"id": 1003, "customer": "dave", "items": ["burger"], "delivery_agent": "bob"},
+        ]
+
+    def test_record(self):
+        for order in self.orders[:2]:
+            self.store.record(order, order["feedback"])
+        summary = self.store.summary()
+        self.assertEqual({item: (a.count, a.mean) for item, a in summary["items"].items()},
+                         {"pizza": (2, 4), "coke": (1, 5)})
+        self.assertEqual(set(summary["agents"]), {"bob"})
+        self.assertEqual([feedback["order_id"] for feedback in summary["recent"]], [1001, 1002])
+        self.assertEqual(self.store.agent_ratings(), {"bob": 4})
+
+    def test_empty(self):
+        self.assertEqual(self.store.summary(), {"items": {}, "agents": {}, "recent": []})
+        self.assertEqual(self.store.agent_ratings(), {})
+
+    def test_rebuild_matches_incremental_updates(self):
+        for order in self.orders[:2]:
+            self.store.record(order, order["feedback"])
+        incremental = self.store.summary()
+        os.remove(self.store.path)
+        self.store.rebuild(reversed(self.orders))
+        rebuilt = self.store.summary()
+        self.assertEqual({item: a.to_dict() for item, a in rebuilt["items"].items()},
+                         {item: a.to_dict() for item, a in incremental["items"].items()})
+        self.assertEqual(rebuilt["recent"], incremental["recent"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Add the src directory to path for importing modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import recovery
+from migrations import SCHEMA_KEY, SCHEMA_VERSION
+from recovery import Journal
+from utils import read_json, write_json
+
+def order(order_id, status="Pending"):
+    return {"id": order_id, "customer": "test", "status": status}
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.path = os.path.join(self.temp_dir, "data.json")
+        self.journal = Journal(self.path, checkpoint_every=3)
+
+    def log_lines(self):
+        with open(self.journal.log_path) as f:
+            return f.readlines()
+
+    def test_first_write_checkpoints_then_logs_only_changes(self):
+        data = {"orders": [order(1)], "next_order_id": 2}
+        self.journal.record(data, None, "v1")
+        self.assertEqual(self.log_lines(), [])
+
+        data["orders"].append(order(2))
+        data["next_order_id"] = 3
+        self.journal.record(data, "v1", "v2")
+
+        record = json.loads(self.log_lines()[0].split(" ", 1)[1])
+        self.assertEqual(record["changes"], {"orders": [order(2)], "set": {"next_order_id": 3}, "unset": []})
+
+    def test_unknown_baseline_forces_checkpoint(self):
+        self.journal.record({"orders": []}, None, "v1")
+        generation = self.journal.generation
+        # Another process wrote v2 in between
+        self.journal.record({"orders": [order(1)]}, "v2", "v3")
+        self.assertNotEqual(self.journal.generation, generation)
+        self.assertEqual(self.log_lines(), [])
+
+    def test_recover_replays_log_tail(self):
+        data = {"orders": [order(1)], "waitlist": [1]}
+        self.journal.record(data, None, "v1")
+        data["orders"][0] = order(1, "Picked Up")
+        data["orders"].append(order(2))
+        del data["waitlist"]
+        self.journal.record(data, "v1", "v2")
+
+        recovered = Journal(self.path).recover()
+        self.assertEqual(recovered.data, {"orders": [order(1, "Picked Up"), order(2)]})
+        self.assertEqual(recovered.replayed, 1)
+
+    def test_checkpoint_every_bounds_the_log(self):
+        data = {"orders": []}
+        self.journal.record(data, None, 0)
+        for version in range(1, 6):
+            data["orders"].append(order(version))
+            self.journal.record(data, version - 1, version)
+        self.assertLessEqual(len(self.log_lines()), 3)
+        self.assertEqual(len(Journal(self.path).recover().data["orders"]), 5)
+
+    def test_recover_stops_at_torn_tail(self):
+        data = {"orders": []}
+        self.journal.record(data, None, 0)
+        data["orders"].append(order(1))
+        self.journal.record(data, 0, 1)
+        with open(self.journal.log_path, "a") as f:
+            f.write('0000 {"generation": ')
+
+        recovered = Journal(self.path).recover()
+        self.assertEqual(recovered.data["orders"], [order(1)])
+        self.assertEqual(recovered.replayed, 1)
+
+    def test_recover_ignores_previous_generation(self):
+        data = {"orders": []}
+        self.journal.record(data, None, 0)
+        data["orders"].append(order(1))
+        self.journal.record(data, 0, 1)
+        stale = self.log_lines()
+        self.journal.checkpoint({"orders": []})
+        with open(self.journal.log_path, "w") as f:
+            f.writelines(stale)  # as if truncating the log had been lost
+
+        self.assertEqual(Journal(self.path).recover().data, {"orders": []})
+
+    def test_corrupt_checkpoint_is_rejected(self):
+        self.journal.record({"orders": [order(1)]}, None, "v1")
+        with open(self.journal.checkpoint_path) as f:
+            header, payload = f.readlines()
+        with open(self.journal.checkpoint_path, "w") as f:
+            f.write(header + payload.replace("Pending", "Delivered"))
+        self.assertIsNone(Journal(self.path).recover())
+
+    def test_no_checkpoint(self):
+        self.assertIsNone(self.journal.recover())
+
+class TestCrashRecovery(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        patcher = patch('utils.JSON_FILE', os.path.join(self.temp_dir, "data.json"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch.dict(recovery._journals, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch('builtins.print')
+    def test_corrupt_data_file_is_rebuilt_from_journal(self, mock_print):
+        data = {"orders": [order(1)], "next_order_id": 2, SCHEMA_KEY: SCHEMA_VERSION}
+        write_json(data)
+        data["orders"].append(order(2))
+        write_json(data)
+        with open(os.path.join(self.temp_dir, "data.json"), "w") as f:
+            f.write('{"orders": [')  # truncated
+
+        recovery._journals.clear()  # a fresh process after the crash
+        recovered = read_json()
+
+        self.assertEqual(recovered["orders"], [order(1), order(2)])
+        self.assertTrue(mock_print.call_args[0][0].startswith("Recovered"))
+        recovery._journals.clear()
+        self.assertEqual(read_json()["orders"], [order(1), order(2)])
+
+    @patch('builtins.print')
+    def test_missing_data_file_is_rebuilt_from_journal(self, mock_print):
+        write_json({"orders": [order(1)], SCHEMA_KEY: SCHEMA_VERSION})
+        os.remove(os.path.join(self.temp_dir, "data.json"))
+        recovery._journals.clear()
+        self.assertEqual(read_json()["orders"], [order(1)])
+
+if __name__ == '__main__':
+    unittest.main()
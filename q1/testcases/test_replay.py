@@ -0,0 +1,92 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+from unittest.mock import patch
+
+# Add the src directory to path for importing modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from replay import ScriptedInput, load_script, replay, summarize
+
+class TestScriptedInput(unittest.TestCase):
+    def setUp(self):
+        self.flows = [
+            {"name": "first", "inputs": ["1", "2"], "expect": ["hello"]},
+            {"name": "second", "inputs": ["3"], "expect": ["missing"]}
+        ]
+        self.script = ScriptedInput(self.flows)
+
+    def test_serves_inputs_in_order_then_eof(self):
+        self.assertEqual([self.script.input(), self.script.input(), self.script.input()], ["1", "2", "3"])
+        with self.assertRaises(EOFError):
+            self.script.input()
+
+    def test_times_each_flow_from_its_first_input(self):
+        with patch('replay.time.perf_counter', side_effect=[1.0, 4.0, 4.5]):
+            self.script.input()
+            self.script.input()
+            self.script.input()
+            self.script.finish()
+        self.assertEqual(self.script.timings(), [("first", 3.0), ("second", 0.5)])
+
+    def test_unreached_flows_are_not_timed(self):
+        with patch('replay.time.perf_counter', side_effect=[1.0, 2.0]):
+            self.script.input()
+            self.script.finish()
+        self.assertEqual(self.script.timings(), [("first", 1.0)])
+
+    def test_output_is_captured_per_flow(self):
+        self.script.input()
+        self.script.write("hello", object())
+        self.script.input()
+        self.script.input()
+        self.script.write("bye")
+        self.assertEqual(self.script.output, [["", "hello object", "", ""], ["bye"]])
+        self.assertEqual(self.script.failures(), [("second", "missing")])
+
+class TestReplay(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "session.json")
+        script = {
+            "app": "q1",
+            "sessions": [{
+                "name": "customer",
+                "repeat": 2,
+                "flows": [
+                    {"name": "place order", "inputs": ["1", "2", "Alice", "takeaway", "burger", "cod"],
+                     "expect": ["Order placed successfully!"]},
+                    {"name": "exit", "inputs": ["6", "5"], "expect": ["Exiting application..."]}
+                ]
+            }]
+        }
+        with open(self.path, "w") as file:
+            json.dump(script, file)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_load_script_expands_repeats(self):
+        app, sessions, seed = load_script(self.path)
+        self.assertEqual((app, len(sessions), seed), ("q1", 2, None))
+
+    def test_load_script_rejects_unknown_app(self):
+        with open(self.path, "w") as file:
+            json.dump({"app": "q9", "sessions": []}, file)
+        with self.assertRaises(ValueError):
+            load_script(self.path)
+
+    def test_replays_sessions_through_the_real_menus(self):
+        results, elapsed = replay(self.path, processes=2)
+
+        self.assertEqual(len(results), 2)
+        for result in results:
+            self.assertIsNone(result["error"])
+            self.assertEqual(result["failures"], [])
+            self.assertEqual([name for name, _ in result["timings"]], ["place order", "exit"])
+        self.assertEqual(summarize(results)["exit"]["runs"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,11 +6,13 @@ from unittest.mock import patch, MagicMock
 # Add the src directory to path for importing modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
-from restaurant import RestaurantManager
+from restaurant import RestaurantManager, orders_table
+from storage import MemoryStorage
 
 class TestRestaurantManager(unittest.TestCase):
     def setUp(self):
-        self.restaurant_manager = RestaurantManager()
+        # Keep the menu version, stock and ratings sidecars out of the working directory
+        self.restaurant_manager = RestaurantManager(storage=MemoryStorage())
         self.test_data = {
             "menu": {
                 "burger": 150.00,
@@ -46,20 +48,92 @@ class TestRestaurantManager(unittest.TestCase):
     @patch('rich.console.Console.print')
     def test_edit_menu_add_item(self, mock_print, mock_input, mock_write_json, mock_read_json):
         mock_read_json.return_value = self.test_data
-        mock_input.side_effect = ["1", "salad", "120", "4"]
+        mock_input.side_effect = ["1", "salad", "120", "5"]
         self.restaurant_manager.edit_menu()
         mock_read_json.assert_called()
         updated_data = mock_write_json.call_args[0][0]
         self.assertIn("salad", updated_data["menu"])
         self.assertEqual(updated_data["menu"]["salad"], 120.0)
 
+    @patch('restaurant.read_json')
+    @patch('rich.console.Console.print')
+    def test_view_menu_cached_while_version_unchanged(self, mock_print, mock_read_json):
+        mock_read_json.return_value = self.test_data
+        self.restaurant_manager.view_menu()
+        self.restaurant_manager.view_menu()
+        mock_read_json.assert_called_once()
+        first, second = (call[0][0] for call in mock_print.call_args_list)
+        self.assertIs(first, second)
+
+    @patch('restaurant.read_json')
+    @patch('restaurant.write_json')
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_edit_menu_bumps_version(self, mock_print, mock_input, mock_write_json, mock_read_json):
+        mock_read_json.return_value = self.test_data
+        self.restaurant_manager.view_menu()
+        mock_input.side_effect = ["1", "salad", "120", "2", "pizza", "5"]
+        self.restaurant_manager.edit_menu()
+        self.assertEqual(self.test_data["menu_version"], 2)
+        mock_read_json.reset_mock()
+        snapshot = self.restaurant_manager.menu_snapshot()
+        mock_read_json.assert_called_once()
+        self.assertEqual(snapshot.version, 2)
+        self.assertEqual(snapshot.prices, {"burger": 150.00, "salad": 120.0})
+
+    @patch('restaurant.read_json')
+    @patch('restaurant.write_json')
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_failed_menu_write_publishes_nothing(self, mock_print, mock_input, mock_write_json, mock_read_json):
+        mock_read_json.return_value = self.test_data
+        mock_input.side_effect = ["1", "salad", "120", "5"]
+        self.restaurant_manager.edit_menu()
+        cached = self.restaurant_manager.menu_snapshot()
+        mock_write_json.return_value = False
+        mock_input.side_effect = ["2", "pizza", "5"]
+        self.restaurant_manager.edit_menu()
+        self.assertEqual(self.test_data["menu_version"], 1)
+        mock_read_json.reset_mock()
+        self.assertIs(self.restaurant_manager.menu_snapshot(), cached)  # clients keep their cached menu
+        mock_read_json.assert_not_called()
+        self.assertNotIn("removed from the menu", str(mock_print.call_args_list))
+
+    @patch('restaurant.read_json')
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_edit_menu_set_availability(self, mock_print, mock_input, mock_read_json):
+        mock_read_json.return_value = self.test_data
+        mock_input.side_effect = ["4", "pizza", "12", "4", "burger", "0", "4", "pasta", "5", "5"]
+        self.restaurant_manager.edit_menu()
+        self.assertEqual(self.restaurant_manager.stock.levels(), {"pizza": 12, "burger": 0})
+        mock_print.assert_any_call("[bold red]Item not found in the menu.[/bold red]")
+
+        self.restaurant_manager.view_menu()
+        mock_print.assert_called_with("[bold yellow]Limited today: burger (sold out), pizza (12 left)[/bold yellow]")
+
+        mock_input.side_effect = ["4", "pizza", "", "5"]
+        self.restaurant_manager.edit_menu()
+        self.assertEqual(self.restaurant_manager.stock.levels(), {"burger": 0})
+
+    def test_menu_snapshot_from_data(self):
+        snapshot = self.restaurant_manager.menu_snapshot(self.test_data)
+        self.assertEqual(snapshot.prices, self.test_data["menu"])
+        self.assertEqual(snapshot.table.row_count, 2)
+        self.assertIs(self.restaurant_manager.menu_snapshot(self.test_data), snapshot)
+
+    def test_menu_cache_is_bounded(self):
+        for version in range(10):
+            self.restaurant_manager.menu_snapshot(dict(self.test_data, menu_version=version))
+        self.assertEqual(sorted(self.restaurant_manager.menus), [6, 7, 8, 9])
+
     @patch('restaurant.read_json')
     @patch('restaurant.write_json')
     @patch('builtins.input')
     @patch('rich.console.Console.print')
     def test_edit_menu_add_existing_item(self, mock_print, mock_input, mock_write_json, mock_read_json):
         mock_read_json.return_value = self.test_data
-        mock_input.side_effect = ["1", "burger", "160", "4"]
+        mock_input.side_effect = ["1", "burger", "160", "5"]
         self.restaurant_manager.edit_menu()
         # Should show an error because burger already exists
         self.assertTrue(mock_print.called)
@@ -72,7 +146,7 @@ class TestRestaurantManager(unittest.TestCase):
     @patch('rich.console.Console.print')
     def test_edit_menu_remove_item(self, mock_print, mock_input, mock_write_json, mock_read_json):
         mock_read_json.return_value = self.test_data
-        mock_input.side_effect = ["2", "burger", "4"]
+        mock_input.side_effect = ["2", "burger", "5"]
         self.restaurant_manager.edit_menu()
         updated_data = mock_write_json.call_args[0][0]
         self.assertNotIn("burger", updated_data["menu"])
@@ -83,31 +157,98 @@ class TestRestaurantManager(unittest.TestCase):
     @patch('rich.console.Console.print')
     def test_edit_menu_remove_nonexistent_item(self, mock_print, mock_input, mock_write_json, mock_read_json):
         mock_read_json.return_value = self.test_data
-        mock_input.side_effect = ["2", "nonexistent", "4"]
+        mock_input.side_effect = ["2", "nonexistent", "5"]
         self.restaurant_manager.edit_menu()
         # Should show an error because the item doesn't exist
         self.assertTrue(mock_print.called)
         # write_json should not be called because no changes were made
         mock_write_json.assert_not_called()
 
-    @patch('restaurant.read_json')
+    @patch('restaurant.read_snapshot')
     @patch('rich.console.Console.print')
-    def test_view_orders(self, mock_print, mock_read_json):
-        mock_read_json.return_value = self.test_data
+    def test_view_orders(self, mock_print, mock_read_snapshot):
+        mock_read_snapshot.return_value = self.test_data
         self.restaurant_manager.view_orders()
-        mock_read_json.assert_called_once()
+        mock_read_snapshot.assert_called_once()
         self.assertTrue(mock_print.called)
 
-    @patch('restaurant.read_json')
+    @patch('restaurant.read_snapshot')
+    @patch('rich.console.Console.print')
+    def test_view_orders_by_status(self, mock_print, mock_read_snapshot):
+        mock_read_snapshot.return_value = self.test_data
+        self.restaurant_manager.view_orders("Pending")
+        table = mock_print.call_args[0][0]
+        self.assertEqual(table.title, "Pending Orders")
+        self.assertEqual(table.row_count, 1)
+
+    @patch('restaurant.read_snapshot')
     @patch('rich.console.Console.print')
-    def test_view_orders_empty(self, mock_print, mock_read_json):
+    def test_view_orders_by_status_none_match(self, mock_print, mock_read_snapshot):
+        mock_read_snapshot.return_value = self.test_data
+        self.restaurant_manager.view_orders("Delivered")
+        mock_print.assert_called_with("[bold red]No orders available.[/bold red]")
+
+    @patch('restaurant.read_snapshot')
+    @patch('rich.console.Console.print')
+    def test_view_orders_empty(self, mock_print, mock_read_snapshot):
         empty_data = self.test_data.copy()
         empty_data["orders"] = []
-        mock_read_json.return_value = empty_data
+        mock_read_snapshot.return_value = empty_data
         self.restaurant_manager.view_orders()
-        mock_read_json.assert_called_once()
+        mock_read_snapshot.assert_called_once()
         # Should print a message about no orders
         mock_print.assert_called_with("[bold red]No orders available.[/bold red]")
 
+    @patch('restaurant.read_snapshot')
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_search_orders(self, mock_print, mock_input, mock_read_snapshot):
+        mock_read_snapshot.return_value = self.test_data
+        mock_input.side_effect = ["test bur", "pizza"]
+        self.restaurant_manager.search_orders()
+        table = mock_print.call_args[0][0]
+        self.assertEqual(table.title, "Orders matching 'test bur'")
+        self.assertEqual(list(table.columns[0].cells), ["1001"])
+
+        self.restaurant_manager.search_orders()
+        mock_print.assert_called_with("[bold red]No matching orders.[/bold red]")
+
+    def test_menu_snapshot_matches_misspelt_items(self):
+        snapshot = self.restaurant_manager.menu_snapshot(self.test_data)
+        self.assertEqual(snapshot.match_item("burger"), "burger")
+        self.assertEqual(snapshot.match_item("piza"), "pizza")
+        self.assertEqual(snapshot.match_item("bu"), "burger")
+        self.assertIsNone(snapshot.match_item("sushi"))
+
+    @patch('rich.console.Console.print')
+    def test_view_ratings(self, mock_print):
+        self.restaurant_manager.view_ratings()
+        mock_print.assert_called_with("[bold yellow]No ratings yet.[/bold yellow]")
+
+        order = {"id": 1001, "customer": "test", "items": ["burger", "pizza"], "delivery_agent": "bob"}
+        self.restaurant_manager.feedback.record(order, {"food": 4, "delivery": 5, "comment": "hot", "time": "t1"})
+        self.restaurant_manager.feedback.record(dict(order, id=1002, items=["pizza"]),
+                                                {"food": 2, "delivery": None, "comment": "", "time": "t2"})
+        self.restaurant_manager.view_ratings()
+
+        food, delivery, latest = (call[0][0] for call in mock_print.call_args_list[-3:])
+        self.assertEqual(list(food.columns[0].cells), ["Burger", "Pizza"])
+        self.assertEqual(list(food.columns[2].cells), ["4.00", "3.00"])
+        self.assertEqual(list(food.columns[4].cells), ["0 0 0 1 0", "0 1 0 1 0"])
+        self.assertEqual(list(delivery.columns[1].cells), ["1"])
+        self.assertEqual(list(latest.columns[0].cells), ["1002", "1001"])
+        self.assertEqual(list(latest.columns[3].cells), ["-", "5"])
+
+    def test_orders_table_formats_lines_and_missing_fields(self):
+        orders = [
+            {"id": 1, "items": ["burger"], "lines": [{"item": "pizza", "quantity": 2, "modifiers": ["large"]},
+                                                     {"item": "coke", "quantity": 1, "modifiers": []}]},
+            {"id": 2, "items": ["coke"], "order_time": "2023-01-01 12:00:00"}
+        ]
+        table = orders_table(orders, "Orders")
+        self.assertEqual([column.header for column in table.columns], ["id", "items", "lines", "order_time"])
+        self.assertEqual(list(table.columns[2].cells), ["2 x pizza + large, coke", "-"])
+        self.assertEqual(list(table.columns[3].cells), ["-", "2023-01-01 12:00:00"])
+
 if __name__ == '__main__':
     unittest.main()
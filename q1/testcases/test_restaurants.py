@@ -0,0 +1,81 @@
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Add the src directory to path for importing modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from restaurants import list_restaurants, onboard_restaurant, select_restaurant
+from order import OrderManager
+from restaurant import RestaurantManager
+from storage import MemoryStorage
+from utils import DEFAULT_DATA, data_file, read_json
+
+class TestRestaurants(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        json_file = patch('utils.JSON_FILE', os.path.join(self.tmp_dir, "data.json"))
+        json_file.start()
+        self.addCleanup(json_file.stop)
+
+    def test_default_restaurant_only(self):
+        self.assertEqual(list_restaurants(), ["main"])
+        self.assertEqual(data_file("main"), os.path.join(self.tmp_dir, "data.json"))
+
+    def test_onboard_creates_separate_file(self):
+        self.assertTrue(onboard_restaurant("pizzeria"))
+        self.assertEqual(list_restaurants(), ["main", "pizzeria"])
+        path = os.path.join(self.tmp_dir, "restaurants", "pizzeria.json")
+        with open(path) as f:
+            self.assertEqual(json.load(f)["orders"], [])
+
+    def test_onboard_rejects_invalid_or_duplicate_id(self):
+        self.assertFalse(onboard_restaurant("main"))
+        self.assertFalse(onboard_restaurant("Bad Name"))
+        self.assertTrue(onboard_restaurant("cafe"))
+        self.assertFalse(onboard_restaurant("cafe"))
+
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_menus_are_partitioned(self, mock_print, mock_input):
+        onboard_restaurant("cafe")
+        mock_input.side_effect = ["1", "bagel", "90", "5"]
+        RestaurantManager("cafe").edit_menu()
+        self.assertIn("bagel", read_json("cafe")["menu"])
+        self.assertNotIn("bagel", read_json()["menu"])
+        self.assertFalse(os.path.exists(os.path.join(self.tmp_dir, "data.json.menu")))
+
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_new_restaurant_starts_without_orders(self, mock_print, mock_input):
+        storage = MemoryStorage()
+        order_manager = OrderManager(storage=storage)
+        self.addCleanup(order_manager.payments.shutdown)
+        mock_input.side_effect = ["jane", "takeaway", "pizza", "cod"]
+        order_manager.place_order()
+        self.assertEqual(len(read_json(storage=storage)["orders"]), 1)
+        self.assertTrue(onboard_restaurant("cafe", storage))
+        self.assertEqual(read_json("cafe", storage)["orders"], [])
+        self.assertEqual(DEFAULT_DATA["orders"], [])
+
+    @patch('builtins.input')
+    @patch('rich.console.Console.print')
+    def test_select_restaurant(self, mock_print, mock_input):
+        onboard_restaurant("cafe")
+        mock_input.return_value = "2"
+        self.assertEqual(select_restaurant(), "cafe")
+        mock_input.return_value = "9"
+        self.assertIsNone(select_restaurant())
+
+    @patch('builtins.input')
+    def test_select_single_restaurant_skips_prompt(self, mock_input):
+        self.assertEqual(select_restaurant(), "main")
+        mock_input.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,10 @@
+import argparse
+import io
 import unittest
 import sys
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 
 # Add the src directory to path for importing modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
@@ -10,8 +14,51 @@ from test_utils import TestUtils
 from test_restaurant import TestRestaurantManager
 from test_delivery import TestDeliveryManager
 from test_order import TestOrderManager
+from test_ids import TestIdAllocator
+from test_query import TestOrderIndex
+from test_dashboard import TestDashboard
+from test_sweeper import TestDeadlineSweeper
+from test_eta import TestEtaEstimator
+from test_pricing import TestPricing
+from test_restaurants import TestRestaurants
+from test_admission import TestAdmissionController
+from test_replay import TestScriptedInput, TestReplay
+from test_location import TestPingBuffer, TestLocationTracker
+from test_snapshot import TestFreeze, TestSnapshotStore
+from test_output import TestPlainOutput, TestRichOutput
+from test_startup import TestStartup
+from test_recovery import TestJournal, TestCrashRecovery
+from test_stock import TestStockLedger
+from test_payments import TestStubGateway, TestPaymentProcessor, TestPaymentBenchmark
+from test_notifications import TestOutbox, TestNotificationDispatcher
+from test_ratings import TestRatingAggregate, TestFeedbackStore
+from test_search import TestPrefixTrie, TestSearchIndex
+from test_transfer import TestTransfer
+from test_storage import TestFileStorage, TestMemoryStorage
+from test_migrations import TestMigrations, TestWriteBack
+from test_oplog import TestOperationsLog
 
-def run_tests():
+def run_class(name):
+    """Run one test class in a worker process; returns (tests run, passed, report)"""
+    stream = io.StringIO()
+    result = unittest.TextTestRunner(stream=stream, verbosity=2).run(unittest.makeSuite(globals()[name]))
+    return result.testsRun, result.wasSuccessful(), stream.getvalue()
+
+def run_parallel(test_suite, workers):
+    """Run each test class in its own process; tests keep their data in memory or temp dirs, so none collide"""
+    names = [next(iter(suite)).__class__.__name__ for suite in test_suite if suite.countTestCases()]
+    started = time.perf_counter()
+    total, passed = 0, True
+    with ProcessPoolExecutor(workers) as pool:
+        for tests_run, ok, report in pool.map(run_class, names):
+            sys.stderr.write(report)
+            total += tests_run
+            passed = passed and ok
+    print(f"\nRan {total} tests in {time.perf_counter() - started:.3f}s across {workers} workers: "
+          f"{'OK' if passed else 'FAILED'}", file=sys.stderr)
+    return 0 if passed else 1
+
+def run_tests(workers=1):
     # Create test suite
     test_suite = unittest.TestSuite()
     
@@ -20,7 +67,45 @@ def run_tests():
     test_suite.addTest(unittest.makeSuite(TestRestaurantManager))
     test_suite.addTest(unittest.makeSuite(TestDeliveryManager))
     test_suite.addTest(unittest.makeSuite(TestOrderManager))
+    test_suite.addTest(unittest.makeSuite(TestIdAllocator))
+    test_suite.addTest(unittest.makeSuite(TestOrderIndex))
+    test_suite.addTest(unittest.makeSuite(TestDashboard))
+    test_suite.addTest(unittest.makeSuite(TestDeadlineSweeper))
+    test_suite.addTest(unittest.makeSuite(TestEtaEstimator))
+    test_suite.addTest(unittest.makeSuite(TestPricing))
+    test_suite.addTest(unittest.makeSuite(TestRestaurants))
+    test_suite.addTest(unittest.makeSuite(TestAdmissionController))
+    test_suite.addTest(unittest.makeSuite(TestScriptedInput))
+    test_suite.addTest(unittest.makeSuite(TestReplay))
+    test_suite.addTest(unittest.makeSuite(TestPingBuffer))
+    test_suite.addTest(unittest.makeSuite(TestLocationTracker))
+    test_suite.addTest(unittest.makeSuite(TestFreeze))
+    test_suite.addTest(unittest.makeSuite(TestSnapshotStore))
+    test_suite.addTest(unittest.makeSuite(TestPlainOutput))
+    test_suite.addTest(unittest.makeSuite(TestRichOutput))
+    test_suite.addTest(unittest.makeSuite(TestStartup))
+    test_suite.addTest(unittest.makeSuite(TestJournal))
+    test_suite.addTest(unittest.makeSuite(TestCrashRecovery))
+    test_suite.addTest(unittest.makeSuite(TestStockLedger))
+    test_suite.addTest(unittest.makeSuite(TestStubGateway))
+    test_suite.addTest(unittest.makeSuite(TestPaymentProcessor))
+    test_suite.addTest(unittest.makeSuite(TestPaymentBenchmark))
+    test_suite.addTest(unittest.makeSuite(TestOutbox))
+    test_suite.addTest(unittest.makeSuite(TestNotificationDispatcher))
+    test_suite.addTest(unittest.makeSuite(TestRatingAggregate))
+    test_suite.addTest(unittest.makeSuite(TestFeedbackStore))
+    test_suite.addTest(unittest.makeSuite(TestPrefixTrie))
+    test_suite.addTest(unittest.makeSuite(TestSearchIndex))
+    test_suite.addTest(unittest.makeSuite(TestTransfer))
+    test_suite.addTest(unittest.makeSuite(TestFileStorage))
+    test_suite.addTest(unittest.makeSuite(TestMemoryStorage))
+    test_suite.addTest(unittest.makeSuite(TestMigrations))
+    test_suite.addTest(unittest.makeSuite(TestWriteBack))
+    test_suite.addTest(unittest.makeSuite(TestOperationsLog))
     
+    if workers > 1:
+        return run_parallel(test_suite, workers)
+
     # Run the test suite
     runner = unittest.TextTestRunner(verbosity=2)
     result = runner.run(test_suite)
@@ -29,4 +114,6 @@ def run_tests():
     return 0 if result.wasSuccessful() else 1
 
 if __name__ == '__main__':
-    sys.exit(run_tests())
+    parser = argparse.ArgumentParser(description="Run the test suite.")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="run test classes in this many processes")
+    sys.exit(run_tests(parser.parse_args().workers))
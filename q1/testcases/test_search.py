@@ -0,0 +1,121 @@
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add the src directory to path for importing modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import search
+from search import PrefixTrie, SearchIndex, words
+
+def order(order_id, customer, *items):
+    return {"id": order_id, "customer": customer, "items": list(items)}
+
+class TestPrefixTrie(unittest.TestCase):
+    def setUp(self):
+        self.trie = PrefixTrie(["pizza", "pasta", "paneer tikka", "burger", "pizza"])
+
+    def test_insert_and_contains(self):
+        self.assertEqual(len(self.trie), 4)
+        self.assertIn("pasta", self.trie)
+        self.assertNotIn("past", self.trie)
+
+    def test_complete_shortest_first(self):
+        self.assertEqual(self.trie.complete("pa"), ["pasta", "paneer tikka"])
+        self.assertEqual(self.trie.complete("p", limit=2), ["pizza", "pasta"])
+        self.assertEqual(self.trie.complete("x"), [])
+
+    def test_match(self):
+        self.assertEqual(self.trie.match("pizza"), "pizza")
+        self.assertEqual(self.trie.match("bur"), "burger")  # the only completion
+        self.assertEqual(self.trie.match("piza"), "pizza")  # closest spelling
+        self.assertEqual(self.trie.match("burgre"), "burger")
+        self.assertIsNone(self.trie.match("sushi"))
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.orders = [
+            order(1001, "Alice Sharma", "pizza", "coke"),
+            order(1002, "Bob", "chicken wings"),
+            order(1003, "alice patel", "pasta"),
+            order(1004, "Carol", "pizza", "pizza"),
+        ]
+        self.index = SearchIndex()
+        self.index.sync(self.orders)
+
+    def ids(self, query, limit=search.SEARCH_LIMIT):
+        return [order["id"] for order in self.index.search(query, limit)]
+
+    def test_words(self):
+        self.assertEqual(words("Bob's 2 x Chicken-Wings"), ["bob", "s", "2", "x", "chicken", "wings"])
+
+    def test_search_newest_first(self):
+        self.assertEqual(self.ids("pizza"), [1004, 1001])
+        self.assertEqual(self.ids("ALICE"), [1003, 1001])
+        self.assertEqual(self.ids("pizza", limit=1), [1004])
+
+    def test_last_word_is_a_prefix(self):
+        self.assertEqual(self.ids("p"), [1004, 1003, 1001])
+        self.assertEqual(self.ids("alice p"), [1003, 1001])
+        self.assertEqual(self.ids("chicken w"), [1002])
+        self.assertEqual(self.ids("alice pas"), [1003])
+
+    def test_every_word_must_match(self):
+        self.assertEqual(self.ids("alice coke"), [1001])
+        self.assertEqual(self.ids("bob pizza"), [])
+        self.assertEqual(self.ids("nobody p"), [])
+        self.assertEqual(self.ids(""), [])
+
+    def test_sync_indexes_only_new_orders(self):
+        self.orders.append(order(1005, "Dave", "pizza"))
+        self.index.sync(self.orders)
+        self.assertEqual(self.ids("pizza"), [1005, 1004, 1001])
+        self.assertEqual(len(self.index), 5)
+
+    def test_sync_starts_over_for_another_history(self):
+        self.index.sync([order(2001, "Erin", "pizza")])
+        self.assertEqual(self.ids("pizza"), [2001])
+        self.assertEqual(self.ids("alice"), [])
+
+    def test_rare_combination_in_an_old_block(self):
+        # Alice ordered pizza once, long before Bob's pizza orders
+        orders = [order(n, "alice" if n < 60 else "bob", "pizza" if n >= 60 or n == 5 else "coke")
+                  for n in range(120)]
+        with patch.object(search, "BLOCK_SIZE", 16), patch.object(search, "DENSE", 4):
+            index = SearchIndex()
+            index.sync(orders)
+            self.assertEqual([o["id"] for o in index.search("pizza alice")], [5])
+            self.assertEqual([o["id"] for o in index.search("pizza bob a")], [])
+            self.assertEqual([o["id"] for o in index.search("coke al", limit=2)], [59, 58])
+
+    def test_blocks_match_a_full_scan(self):
+        customers = ["alice sharma", "bob patel", "alice patel", "carol"]
+        items = ["pizza", "pasta", "coke", "paneer tikka"]
+        orders = [order(n, customers[n % 4], items[n % 3], items[(n * 5) % 4]) for n in range(200)]
+        queries = ["alice pizza", "alice patel pa", "bob pizza coke", "carol p", "bob alice", "patel pan",
+                   "tikka sharma pi", "pizza"]
+
+        def scan(query, orders=orders):
+            *exact, prefix = words(query)
+            found = [o["id"] for o in reversed(orders) if set(exact) <= SearchIndex.order_words(o)
+                     and any(word.startswith(prefix) for word in SearchIndex.order_words(o))]
+            return found[:search.SEARCH_LIMIT]
+
+        with patch.object(search, "BLOCK_SIZE", 16), patch.object(search, "DENSE", 4):
+            self.index = SearchIndex()
+            # 150 and 159 end in the same block, so its bitmaps are extended; 200 fills it up
+            for synced in (150, 159, 200):
+                self.index.sync(orders[:synced])
+                for query in queries:
+                    self.assertEqual(self.ids(query), scan(query, orders[:synced]), query)
+                with patch.object(search, "MAX_PREFIX_CHECKS", 0):
+                    for query in queries:
+                        self.assertEqual(self.ids(query), scan(query, orders[:synced]), query)
+
+    def test_sub_millisecond_at_scale(self):
+        built, median, worst = search.benchmark(orders=100_000, queries=100)
+        self.assertLess(median, 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import sys
+import os
+import gc
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Add the src directory to path for importing modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import utils
+from migrations import SCHEMA_KEY, SCHEMA_VERSION
+from snapshot import FrozenDict, SnapshotStore, freeze
+from utils import read_json, write_json
+
+class TestFreeze(unittest.TestCase):
+    def test_freeze_is_read_only(self):
+        data = freeze({"orders": [{"id": 1, "items": ["burger"]}]})
+        self.assertIsInstance(data, FrozenDict)
+        self.assertEqual(data["orders"], ({"id": 1, "items": ("burger",)},))
+        with self.assertRaises(TypeError):
+            data["orders"] = []
+        with self.assertRaises(TypeError):
+            data["orders"][0].update(status="Delivered")
+        self.assertEqual(dict(data["orders"][0], eta=5)["eta"], 5)
+
+class TestSnapshotStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        patcher = patch('utils.JSON_FILE', os.path.join(self.temp_dir, "data.json"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.store = SnapshotStore()
+        write_json({"orders": [{"id": 1, "status": "Pending"}], SCHEMA_KEY: SCHEMA_VERSION})
+
+    def test_same_version_is_shared_without_rereading(self):
+        first = self.store.read()
+        with patch('snapshot.read_json') as mock_read_json:
+            self.assertIs(self.store.read(), first)
+            mock_read_json.assert_not_called()
+
+    def test_write_publishes_new_version(self):
+        first = self.store.read()
+        data = read_json()
+        data["orders"].append({"id": 2, "status": "Pending"})
+        write_json(data)
+
+        second = self.store.read()
+        self.assertIsNot(second, first)
+        self.assertEqual(len(first["orders"]), 1)  # readers of the old version are unaffected
+        self.assertEqual(len(second["orders"]), 2)
+        self.assertEqual(len(self.store.live_versions()), 2)
+
+    def test_old_versions_are_collected_once_released(self):
+        first = self.store.read()
+        write_json({"orders": [], SCHEMA_KEY: SCHEMA_VERSION})
+        self.store.read()
+        del first
+        gc.collect()
+        self.assertEqual(self.store.live_versions(), {utils.data_version()})
+
+    def test_write_leaves_no_temporary_files(self):
+        write_json({"orders": [], SCHEMA_KEY: SCHEMA_VERSION})
+        self.assertEqual([name for name in os.listdir(self.temp_dir) if name.endswith(".tmp")], [])
+
+if __name__ == '__main__':
+    unittest.main()
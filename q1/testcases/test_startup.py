@@ -0,0 +1,21 @@
+import unittest
+import sys
+import os
+
+# Add the src directory to path for importing modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from startup import STARTUP_BUDGET_SECONDS, imported_modules, measure_startup
+
+class TestStartup(unittest.TestCase):
+    def test_rendering_libraries_are_not_imported_at_startup(self):
+        modules = imported_modules("main")
+        self.assertIn("order", modules)
+        self.assertNotIn("rich", modules)
+
+    @unittest.skipUnless(os.environ.get("Q1_TIMING"), "wall-clock check; set Q1_TIMING=1 to run it")
+    def test_plain_startup_within_budget(self):
+        self.assertLessEqual(measure_startup(runs=3), STARTUP_BUDGET_SECONDS)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from multiprocessing import Pool
+
+# Add the src directory to path for importing modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from pricing import OrderLine
+from stock import StockLedger
+
+def reserve_one(path):
+    return not StockLedger(path=path).reserve([OrderLine("pizza", 1, ())])
+
+class TestStockLedger(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.stock = StockLedger(path=os.path.join(self.temp_dir, "stock"))
+
+    def test_unlimited_by_default(self):
+        self.assertEqual(self.stock.levels(), {})
+        self.assertEqual(self.stock.reserve([OrderLine("pizza", 5, ())]), {})
+        self.assertFalse(os.path.exists(self.stock.path))
+
+    def test_set_count(self):
+        self.stock.set_count("pizza", 3)
+        self.stock.set_count("burger", 0)
+        self.assertEqual(self.stock.levels(), {"pizza": 3, "burger": 0})
+        self.stock.set_count("burger", None)
+        self.assertEqual(self.stock.levels(), {"pizza": 3})
+
+    def test_reserve_whole_cart(self):
+        self.stock.set_count("pizza", 3)
+        lines = [OrderLine("pizza", 1, ()), OrderLine("pizza", 1, ("large",)), OrderLine("coke", 4, ())]
+        self.assertEqual(self.stock.reserve(lines), {})
+        self.assertEqual(self.stock.levels(), {"pizza": 1})
+
+    def test_reserve_is_all_or_nothing(self):
+        self.stock.set_count("pizza", 3)
+        self.stock.set_count("burger", 1)
+        shortages = self.stock.reserve([OrderLine("pizza", 2, ()), OrderLine("burger", 2, ())])
+        self.assertEqual(shortages, {"burger": 1})
+        self.assertEqual(self.stock.levels(), {"pizza": 3, "burger": 1})
+
+    def test_release(self):
+        self.stock.set_count("pizza", 3)
+        lines = [OrderLine("pizza", 2, ()), OrderLine("coke", 1, ())]
+        self.stock.reserve(lines)
+        self.stock.release(lines)
+        self.assertEqual(self.stock.levels(), {"pizza": 3})
+
+    def test_concurrent_reservations_never_oversell(self):
+        self.stock.set_count("pizza", 10)
+        with Pool(4) as pool:
+            results = pool.map(reserve_one, [self.stock.path] * 25)
+        self.assertEqual(sum(results), 10)
+        self.assertEqual(self.stock.levels(), {"pizza": 0})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Add the src directory to path for importing modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import recovery
+from migrations import SCHEMA_KEY, SCHEMA_VERSION
+from restaurants import list_restaurants, onboard_restaurant
+from storage import FileStorage, MemoryStorage
+from utils import DEFAULT_DATA, data_version, read_json, write_json
+
+class StorageContract:
+    """Behaviour every storage backend must share; mixed into one TestCase per backend"""
+
+    def test_save_and_load(self):
+        self.assertFalse(self.storage.exists("data.json"))
+        self.assertIsNone(self.storage.version("data.json"))
+        self.assertTrue(self.storage.save("data.json", {"orders": [{"id": 1}]}))
+        self.assertTrue(self.storage.exists("data.json"))
+        loaded = self.storage.load("data.json")
+        loaded["orders"].append({"id": 2})  # a copy; the stored document is unchanged
+        self.assertEqual(self.storage.load("data.json"), {"orders": [{"id": 1}]})
+
+    def test_load_missing(self):
+        with self.assertRaises(FileNotFoundError):
+            self.storage.load("data.json")
+
+    def test_expected_version(self):
+        self.storage.save("data.json", {"n": 1})
+        version = self.storage.version("data.json")
+        self.assertTrue(self.storage.save("data.json", {"n": 2}, expected_version=version))
+        self.assertNotEqual(self.storage.version("data.json"), version)
+        self.assertFalse(self.storage.save("data.json", {"n": 3}, expected_version=version))
+        self.assertEqual(self.storage.load("data.json"), {"n": 2})
+
+    def test_read_and_update(self):
+        self.assertEqual(self.storage.read("data.json.ids", 0), 0)
+        for _ in range(3):
+            result = self.storage.update("data.json.ids", lambda count: (count + 1, count), 0)
+        self.assertEqual(result, 2)
+        self.assertEqual(self.storage.read("data.json.ids", locked=True), 3)
+
+    def test_restaurants(self):
+        self.assertEqual(list_restaurants(self.storage), ["main"])
+        self.assertTrue(onboard_restaurant("pizzeria", self.storage))
+        self.assertEqual(list_restaurants(self.storage), ["main", "pizzeria"])
+        write_json(dict(DEFAULT_DATA, orders=[{"id": 1}]), "pizzeria", storage=self.storage)
+        self.assertEqual(read_json("pizzeria", self.storage)["orders"], [{"id": 1}])
+        self.assertEqual(read_json(storage=self.storage), DEFAULT_DATA)
+
+class TestFileStorage(StorageContract, unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        patcher = patch.dict(recovery._journals, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.storage = FileStorage(self.temp_dir)
+
+    def test_files_live_under_the_directory(self):
+        write_json({"orders": []}, storage=self.storage)
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, "data.json")))
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, "data.json.checkpoint")))
+        self.assertEqual(data_version(storage=self.storage), self.storage.version("data.json"))
+
+    def test_recover(self):
+        data = {"orders": [{"id": 1}], SCHEMA_KEY: SCHEMA_VERSION}
+        write_json(data, storage=self.storage)
+        os.remove(os.path.join(self.temp_dir, "data.json"))
+        with patch('builtins.print'):
+            self.assertEqual(read_json(storage=self.storage), data)
+
+class TestMemoryStorage(StorageContract, unittest.TestCase):
+    def setUp(self):
+        self.storage = MemoryStorage()
+
+    def test_instances_are_separate(self):
+        other = MemoryStorage()
+        write_json({"orders": [{"id": 1}]}, storage=self.storage)
+        self.assertEqual(read_json(storage=other), DEFAULT_DATA)
+        self.assertEqual(len(read_json(storage=self.storage)["orders"]), 1)
+
+    def test_nothing_recovered(self):
+        self.assertIsNone(self.storage.recover("data.json"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import sys
+import os
+import time
+from datetime import datetime
+
+# Add the src directory to path for importing modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from sweeper import DeadlineSweeper, deadline_of
+
+class TestDeadlineSweeper(unittest.TestCase):
+    def setUp(self):
+        self.sweeper = DeadlineSweeper()
+        self.events = []
+        self.sweeper.subscribe(lambda order_id, deadline: self.events.append(order_id))
+        self.orders = [
+            {"id": 1001, "type": "Delivery", "status": "Pending",
+             "expected_delivery_time": 30, "order_time": "2023-01-01 12:00:00"},
+            {"id": 1002, "type": "Takeaway", "status": "Completed"},
+            {"id": 1003, "type": "Delivery", "status": "Picked Up",
+             "expected_delivery_time": 45, "order_time": "2023-01-01 12:00:00"},
+            {"id": 1004, "type": "Delivery", "status": "Delivered",
+             "expected_delivery_time": 10, "order_time": "2023-01-01 11:00:00"}
+        ]
+
+    def test_deadline_of(self):
+        self.assertEqual(deadline_of(self.orders[0]), datetime(2023, 1, 1, 12, 30))
+
+    def test_sync_tracks_only_in_flight_deliveries(self):
+        self.sweeper.sync(self.orders)
+        self.assertEqual(len(self.sweeper), 2)
+
+    def test_tick_emits_each_breach_once(self):
+        self.sweeper.sync(self.orders)
+        self.assertEqual(self.sweeper.tick(datetime(2023, 1, 1, 12, 20)), [])
+        self.sweeper.tick(datetime(2023, 1, 1, 12, 31))
+        self.sweeper.tick(datetime(2023, 1, 1, 12, 40))
+        self.assertEqual(self.events, [1001])
+        self.sweeper.tick(datetime(2023, 1, 1, 12, 50))
+        self.assertEqual(self.events, [1001, 1003])
+        self.assertEqual(self.sweeper.late, {1001, 1003})
+
+    def test_cancelled_order_never_breaches(self):
+        self.sweeper.sync(self.orders)
+        self.sweeper.cancel(1001)
+        self.sweeper.tick(datetime(2023, 1, 1, 13, 0))
+        self.assertEqual(self.events, [1003])
+
+    def test_sync_drops_finished_orders(self):
+        self.sweeper.sync(self.orders)
+        self.sweeper.tick(datetime(2023, 1, 1, 12, 31))
+        self.orders[0]["status"] = "Delivered"
+        self.sweeper.sync(self.orders)
+        self.assertNotIn(1001, self.sweeper.late)
+        self.assertEqual(len(self.sweeper), 1)
+
+    def test_background_thread_flags_overdue_orders(self):
+        self.sweeper.tick_seconds = 0.01
+        self.sweeper.sync(self.orders)
+        self.sweeper.start()
+        try:
+            deadline = time.time() + 2
+            while len(self.events) < 2 and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            self.sweeper.stop()
+        self.assertEqual(sorted(self.events), [1001, 1003])
+
+if __name__ == '__main__':
+    unittest.main()
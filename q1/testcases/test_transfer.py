@@ -0,0 +1,212 @@
+import unittest
+import sys
+import os
+import copy
+import io
+import json
+import shutil
+import tempfile
+from datetime import datetime
+from unittest.mock import patch
+
+# Add the src directory to path for importing modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import recovery
+import transfer
+from migrations import migrate_order
+from transfer import export_records, format_for, import_records, main
+from utils import DEFAULT_DATA, read_json, read_sidecar, write_json
+
+ORDERS = [
+    {"id": 1001, "customer": "Alice, Jr.", "type": "Delivery", "status": "Delivered", "items": ["pizza", "coke"],
+     "lines": [{"item": "pizza", "quantity": 2, "modifiers": ["large"]}, {"item": "coke", "quantity": 1, "modifiers": []}],
+     "total_price": 745.5, "delivery_agent": "bob", "expected_delivery_time": 30, "order_time": "2025-03-01 12:00:00",
+     "feedback": {"food": 5, "delivery": 4, "comment": "hot \"and\" fresh", "time": "2025-03-01 13:00:00"}},
+    {"id": 1002, "customer": "bob", "type": "Takeaway", "status": "Completed", "items": ["burger"],
+     "total_price": 157.5, "delivery_agent": "-"},
+    {"id": 1003, "customer": "carol", "type": "Delivery", "status": "Pending", "items": ["pasta"],
+     "total_price": 302.5, "delivery_agent": "bob", "expected_delivery_time": 20, "order_time": "2025-03-02 09:30:00"},
+]
+
+MIGRATED = [migrate_order(order) for order in copy.deepcopy(ORDERS)]  # as stored by current code
+
+class TestTransfer(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        for patcher in (patch('utils.JSON_FILE', os.path.join(self.temp_dir, "data.json")),
+                        patch.dict(recovery._journals, clear=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        data = copy.deepcopy(DEFAULT_DATA)
+        data["orders"] = copy.deepcopy(MIGRATED)
+        data["next_order_id"] = 1004
+        write_json(data)
+
+    def export(self, kind, fmt, **filters):
+        out = io.StringIO()
+        count = export_records(kind, out, fmt, **filters)
+        return count, out.getvalue()
+
+    def reset(self):
+        write_json(copy.deepcopy(DEFAULT_DATA))
+
+    def test_format_for(self):
+        self.assertEqual(format_for("orders.CSV"), "csv")
+        self.assertEqual(format_for("-", "jsonl"), "jsonl")
+        with self.assertRaises(ValueError):
+            format_for("orders.xml")
+
+    def test_orders_round_trip(self):
+        for fmt in ("jsonl", "csv"):
+            with self.subTest(fmt=fmt):
+                count, text = self.export("orders", fmt)
+                self.assertEqual(count, 3)
+                self.reset()
+                self.assertEqual(import_records("orders", io.StringIO(text), fmt), (3, 0))
+                self.assertEqual(read_json()["orders"], MIGRATED)
+
+    def test_csv_columns(self):
+        _, text = self.export("orders", "csv")
+        header, first = text.splitlines()[:2]
+        self.assertEqual(header.split(","), transfer.ORDER_COLUMNS)
+        self.assertTrue(first.startswith('1001,"Alice, Jr.",Delivery,Delivered,"[""pizza"",""coke""]"'))
+
+    def test_filters(self):
+        self.assertEqual(self.export("orders", "jsonl", status="Pending")[0], 1)
+        # Takeaway orders have no order time, so a time range leaves them out
+        count, text = self.export("orders", "jsonl", since=datetime(2025, 3, 1), until=datetime(2025, 3, 2))
+        self.assertEqual(count, 1)
+        self.assertIn('"id":1001', text)
+        self.assertEqual(self.export("orders", "jsonl", since=datetime(2025, 3, 1, 12))[0], 2)
+
+    def test_import_skips_known_orders_and_moves_ids_on(self):
+        text = '{"id": 1003, "customer": "x", "type": "Takeaway", "items": [], "status": "Completed", ' \
+               '"delivery_agent": "-"}\n\n' \
+               '{"id": 5000, "customer": "dave", "type": "Takeaway", "items": ["coke"], "status": "completed", ' \
+               '"delivery_agent": "-"}\n'
+        self.assertEqual(import_records("orders", io.StringIO(text), "jsonl"), (1, 1))
+        data = read_json()
+        self.assertEqual([order["id"] for order in data["orders"]], [1001, 1002, 1003, 5000])
+        self.assertEqual(data["next_order_id"], 5001)
+        # Imported orders are stored in the current schema
+        self.assertEqual(data["orders"][-1], migrate_order({"id": 5000, "customer": "dave", "type": "Takeaway",
+                                                            "items": ["coke"], "status": "Completed",
+                                                            "delivery_agent": "-"}))
+        self.assertIsNone(data["orders"][-1]["order_time"])
+        self.assertEqual(read_sidecar("ids"), 5001)
+
+    def test_import_writes_once_per_batch(self):
+        _, text = self.export("orders", "jsonl")
+        self.reset()
+        with patch('utils.write_json', wraps=write_json) as mock_write:
+            self.assertEqual(import_records("orders", io.StringIO(text), "jsonl", batch_size=2), (3, 0))
+        self.assertEqual(mock_write.call_count, 2)
+
+    def test_import_retries_when_another_write_wins(self):
+        _, text = self.export("orders", "jsonl")
+        self.reset()
+        lost = [True]
+
+        def write_once_lost(data, *args, **kwargs):
+            if lost and lost.pop():
+                write_json(read_json())  # another process saves first; this write's version check fails
+                return False
+            return write_json(data, *args, **kwargs)
+
+        with patch('utils.write_json', side_effect=write_once_lost) as mock_write:
+            self.assertEqual(import_records("orders", io.StringIO(text), "jsonl"), (3, 0))
+        self.assertEqual(mock_write.call_count, 2)
+        self.assertEqual(len(read_json()["orders"]), 3)
+
+    def test_failed_write_is_not_retried(self):
+        _, text = self.export("orders", "jsonl")
+        self.reset()
+        with patch('utils.write_json', return_value=False) as mock_write:
+            with self.assertRaisesRegex(OSError, "could not write"):
+                import_records("orders", io.StringIO(text), "jsonl")
+            with self.assertRaisesRegex(OSError, "could not write"):
+                import_records("agents", io.StringIO('{"agent": "carol"}\n'), "jsonl")
+        self.assertEqual(mock_write.call_count, 2)
+
+    def test_import_gives_up_when_every_write_loses(self):
+        _, text = self.export("orders", "jsonl")
+        self.reset()
+
+        def always_lost(data, *args, **kwargs):
+            write_json(read_json())
+            return False
+
+        with patch('utils.write_json', side_effect=always_lost) as mock_write:
+            with self.assertRaisesRegex(OSError, "gave up"):
+                import_records("orders", io.StringIO(text), "jsonl")
+        self.assertEqual(mock_write.call_count, transfer.MAX_ATTEMPTS)
+
+    def test_menu_version_bumped_once_across_retries(self):
+        lost = [True]
+
+        def write_once_lost(data, *args, **kwargs):
+            if lost and lost.pop():
+                write_json(read_json())
+                return False
+            return write_json(data, *args, **kwargs)
+
+        with patch('utils.write_json', side_effect=write_once_lost):
+            self.assertEqual(import_records("menu", io.StringIO("item,price\ndosa,90\n"), "csv"), (1, 0))
+        self.assertEqual(read_json()["menu_version"], 1)
+        self.assertEqual(read_sidecar("menu"), 1)
+
+    def test_invalid_rows(self):
+        with self.assertRaisesRegex(ValueError, "line 2: missing status"):
+            import_records("orders", io.StringIO('{"id": 1, "customer": "a", "type": "Takeaway", "items": [], '
+                                                 '"status": "Completed", "delivery_agent": "-"}\n'
+                                                 '{"id": 2, "customer": "a", "type": "Takeaway", "items": [], '
+                                                 '"delivery_agent": "-"}\n'), "jsonl")
+        with self.assertRaisesRegex(ValueError, "line 1: missing type, delivery_agent"):
+            import_records("orders", io.StringIO('{"id": 1, "customer": "a", "items": [], "status": "Completed"}\n'),
+                           "jsonl")
+        takeaway = {"id": 1, "customer": "a", "type": "Takeaway", "items": [], "status": "Completed",
+                    "delivery_agent": "-"}
+        for change, error in (({"id": "1"}, "id '1' is not a whole number"), ({"id": 1.5}, "not a whole number"),
+                              ({"status": "Lost"}, "unknown status 'Lost'"), ({"type": "Dine-in"}, "type must be"),
+                              ({"items": "pizza"}, "items must be a list"),
+                              ({"status": "Awaiting Payment"}, "needs its payment"),
+                              ({"type": "Delivery", "status": "Pending"}, "needs an order_time"),
+                              ({"type": "Delivery", "status": "Pending", "order_time": "2025-03-02 09:30:00"},
+                               "needs its expected_delivery_time")):
+            with self.subTest(change=change), self.assertRaisesRegex(ValueError, f"line 1: .*{error}"):
+                import_records("orders", io.StringIO(json.dumps(dict(takeaway, **change)) + "\n"), "jsonl")
+        with self.assertRaisesRegex(ValueError, "invalid JSON"):
+            import_records("orders", io.StringIO("{not json\n"), "jsonl")
+        self.assertEqual(len(read_json()["orders"]), 3)
+
+    def test_menu_import_bumps_version(self):
+        count, text = self.export("menu", "csv")
+        self.assertEqual(count, len(DEFAULT_DATA["menu"]))
+        self.assertIn("chicken wings,200.0", text)
+
+        imported = import_records("menu", io.StringIO("item,price\nPaneer Tikka,220\npizza,300\nburger,175.5\n"), "csv")
+        self.assertEqual(imported, (2, 1))
+        data = read_json()
+        self.assertEqual((data["menu"]["paneer tikka"], data["menu"]["burger"]), (220.0, 175.5))
+        self.assertEqual(data["menu_version"], 1)
+        self.assertEqual(read_sidecar("menu"), 1)
+
+    def test_agents_import(self):
+        self.assertEqual(import_records("agents", io.StringIO('{"agent": "Carol"}\n{"agent": "bob"}\n'), "jsonl"), (1, 1))
+        self.assertEqual(read_json()["delivery_agents"], ["bob", "carol"])
+        self.assertEqual(self.export("agents", "csv")[1].splitlines(), ["agent", "bob", "carol"])
+
+    def test_command_line(self):
+        path = os.path.join(self.temp_dir, "pending.csv")
+        with patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            self.assertEqual(main(["export", "orders", path, "--status", "Pending"]), 0)
+            self.assertEqual(stderr.getvalue(), "orders: 1 exported\n")
+            self.reset()
+            self.assertEqual(main(["import", "orders", path]), 0)
+            self.assertEqual(main(["import", "orders", path + ".xml"]), 1)
+        self.assertEqual([order["id"] for order in read_json()["orders"]], [1003])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,12 +2,15 @@ import unittest
 import sys
 import os
 import json
+import shutil
+import tempfile
 from unittest.mock import patch, mock_open
 
 # Add the src directory to path for importing modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
-from utils import read_json, write_json, DEFAULT_DATA
+import recovery
+from utils import data_version, read_json, write_json, DEFAULT_DATA
 
 class TestUtils(unittest.TestCase):
     @patch('os.path.exists')
@@ -25,20 +28,42 @@ class TestUtils(unittest.TestCase):
         mock_exists.return_value = False
         data = read_json()
         mock_exists.assert_called_once()
-        mock_write.assert_called_once_with(DEFAULT_DATA)
+        mock_write.assert_called_once_with(DEFAULT_DATA, None, storage=None)
         self.assertEqual(data, DEFAULT_DATA)
 
+    @patch('storage.journal_for')
+    @patch('storage.file_lock')
+    @patch('os.replace')
+    @patch('os.fsync')
     @patch('builtins.open', new_callable=mock_open)
-    def test_write_json(self, mock_file):
+    def test_write_json(self, mock_file, mock_fsync, mock_replace, mock_lock, mock_journal_for):
         test_data = {"test": "data"}
         write_json(test_data)
         mock_file.assert_called_once()
+        # The data is written to a temporary file that then replaces the data file
+        temp_path = mock_file.call_args[0][0]
+        mock_replace.assert_called_once_with(temp_path, "data.json")
+        mock_lock.assert_called_once_with("data.json.lock")
+        self.assertIs(mock_journal_for.return_value.record.call_args[0][0], test_data)
         # Instead of asserting the write was called once, check that it was called at least once
         # and that the written data contains our expected content
         self.assertTrue(mock_file().write.called)
         written_data = ''.join(call[0][0] for call in mock_file().write.call_args_list)
         self.assertIn('"test": "data"', written_data)
 
+    def test_write_json_expected_version(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        path = os.path.join(temp_dir, "data.json")
+        with patch('utils.JSON_FILE', path), patch.dict(recovery._journals, clear=True):
+            write_json({"version": 1})
+            version = data_version()
+            self.assertTrue(write_json({"version": 2}, expected_version=version))
+            # Someone else wrote since version was taken: nothing is written
+            self.assertFalse(write_json({"version": 3}, expected_version=version))
+            self.assertEqual(read_json(), {"version": 2})
+            self.assertEqual([name for name in os.listdir(temp_dir) if name.endswith(".tmp")], [])
+
     @patch('builtins.open')
     def test_write_json_exception(self, mock_file):
         mock_file.side_effect = Exception("Test exception")